@@ -498,7 +498,7 @@ def _handleFunctionCall(codeSource, code, argCount, indexOffset=0,
 
 def _classHasAttribute(c, attr) :
     return (c.methods.has_key(attr) or c.members.has_key(attr) or
-            hasattr(c.classObject, attr))
+            attr in pcmodules.getClassAttributes(c.classObject))
 
 def _checkClassAttribute(attr, c, code) :
     if _classHasAttribute(c, attr) :
@@ -613,9 +613,11 @@ def _handleDeprecated(code, name):
         return False
     else:
         if cfg().deprecated:
-            msg = msgs.USING_DEPRECATED_MODULE % name
             if undeprecated:
-                msg.data = msg.data + msgs.USE_INSTEAD % undeprecated
+                msg = msgs.USING_DEPRECATED_MODULE_INSTEAD % (name,
+                                                               undeprecated)
+            else:
+                msg = msgs.USING_DEPRECATED_MODULE % name
             code.addWarning(msg)
         return True
 
@@ -775,9 +777,7 @@ def _getFormatInfo(formatString, code) :
     for section in sections[1:] :
         orig_section = section
         if not section:
-            w = msgs.INVALID_FORMAT % orig_section
-            w.data = w.data + ' (end of format string)'
-            code.addWarning(w)
+            code.addWarning(msgs.INVALID_FORMAT_END % orig_section)
             continue
 
         # handle dictionary formats
@@ -900,7 +900,7 @@ def _checkAttributeType(code, stackValue, attr) :
         if python.METHODLESS_OBJECTS.has_key(varType):
             continue
 
-        attrs = python.BUILTIN_ATTRS.get(varType, None)
+        attrs = python.getBuiltinAttrs(varType)
         if attrs is not None:
             if attr in attrs:
                 return
@@ -929,15 +929,7 @@ def _getTypeStr(t):
 
 
 def _getLineNum(co, instr_index):
-    co_lnotab = co.co_lnotab
-    lineno = co.co_firstlineno
-    addr = 0
-    for lnotab_index in range(0, len(co_lnotab), 2):
-        addr = addr + ord(co_lnotab[lnotab_index])
-        if addr > instr_index:
-            return lineno
-        lineno = lineno + ord(co_lnotab[lnotab_index+1])
-    return lineno
+    return OP.getInstructions(co).getLineNum(instr_index)
 
 
 class Code :
@@ -954,6 +946,10 @@ class Code :
     @type extended_arg: int
     @ivar maxCode:      length of bytes
     @type maxCode:      int
+    @ivar instructions: the decoded instructions of the code object
+    @type instructions: L{OP.Instructions}
+    @ivar position:     position in instructions of the next instruction
+    @type position:     int
     @ivar stack:        
     @type stack:        list of L{Stack.Item}
     @ivar warnings:     list of warnings
@@ -987,6 +983,8 @@ class Code :
         self.extended_arg = 0
         self.lastLineNum = 0
         self.maxCode = 0
+        self.instructions = None
+        self.position = 0
         self.has_except = 0
         self.try_finally_first = 0
         self.starts_and_ends_with_finally = 0
@@ -1018,6 +1016,8 @@ class Code :
         self.func = func
         self.func_code, self.bytes, self.index, self.maxCode, self.extended_arg = \
                         OP.initFuncCode(func.function)
+        self.instructions = OP.getInstructions(self.func_code)
+        self.position = 0
         self.lastLineNum = self.func_code.co_firstlineno
         self.returnValues = []
 
@@ -1030,8 +1030,7 @@ class Code :
         line = self.lastLineNum
         # if we don't have linenum info, calc it from co_lntab & index
         if line == self.func_code.co_firstlineno:
-            # FIXME: this could be optimized, if we kept last line info
-            line = _getLineNum(self.func_code, self.index - 1)
+            line = self.instructions.getLineNum(self.index - 1)
         return line
 
     def getWarning(self, err, line = None) :
@@ -1050,7 +1049,8 @@ class Code :
         w = err
         if not isinstance(w, Warning.Warning):
             w = self.getWarning(err, line)
-        utils.debug('adding warning: %s', w.format())
+        if cfg().debug:
+            utils.debug('adding warning: %s', w.format())
         self.warnings.append(w)
 
     def popNextOp(self) :
@@ -1062,21 +1062,27 @@ class Code :
         The operand is the object referenced by the oparg, from the
         respective array (co_consts, co_names, co_varnames)
 
-        Changes L{index} and L{extended_arg} to point to the next operation.
+        Changes L{index} and L{position} to point to the next operation.
 
         @returns: tuple of (opcode, oparg, operand)
         @rtype:   tuple of (int, int, object)
         """
+        instructions = self.instructions
+        position = self.position
         self.indexList.append(self.index)
-        info = OP.getInfo(self.bytes, self.index, self.extended_arg)
-        op, oparg, self.index, self.extended_arg = info
+        op = instructions.ops[position]
+        oparg = instructions.opargs[position]
+        operand = instructions.operands[position]
+        self.index = instructions.nexts[position]
+        self.position = position + 1
         if op < OP.HAVE_ARGUMENT :
-            utils.debug("DIS  %d %s" % (self.indexList[-1], OP.name[op]))
-            operand = None
+            if cfg().debug :
+                utils.debug("DIS  %d %s" % (self.indexList[-1], OP.name[op]))
         else :
-            operand = OP.getOperand(op, self.func_code, oparg)
-            self.label = label = OP.getLabel(op, oparg, self.index)
-            utils.debug("DIS  %d %s" % (self.indexList[-1], OP.name[op]), oparg, operand)
+            self.label = label = instructions.label(position)
+            if cfg().debug :
+                utils.debug("DIS  %d %s" % (self.indexList[-1], OP.name[op]),
+                            oparg, operand)
             if label != None :
                 self.addBranch(label)
 
@@ -1090,15 +1096,13 @@ class Code :
         @rtype:   tuple of (int, int, int)
         """
         try :
-            return OP.getInfo(self.bytes, self.index + offset, 0)[0:3]
+            return self.instructions.getInfo(self.index + offset)
         except IndexError :
             return -1, 0, -1
 
     def getFirstOp(self) :
         # find the first real op, maybe we should not check if params are used
-        i = extended_arg = 0
-        while i < self.maxCode :
-            op, oparg, i, extended_arg = OP.getInfo(self.bytes, i, extended_arg)
+        for op in self.instructions.ops :
             if not OP.LINE_NUM(op) :
                 if not (OP.LOAD_CONST(op) or OP.LOAD_GLOBAL(op)) :
                     return op
@@ -1197,12 +1201,12 @@ class Code :
     def remove_unreachable_code(self, label) :
         if len(self.indexList) >= 2 :
             index = self.indexList[-2]
-            if index >= 0 and OP.POP_BLOCK(ord(self.bytes[index])) :
+            if index >= 0 and OP.POP_BLOCK(self.instructions.opAt(index)) :
                 index = self.indexList[-3]
             if index >= 0 :
-                op = ord(self.bytes[index])
+                op = self.instructions.opAt(index)
                 if OP.RETURN_VALUE(op) or OP.RAISE_VARARGS(op) or \
-                   OP.END_FINALLY(ord(self.bytes[label-1])) :
+                   OP.END_FINALLY(self.instructions.opAt(label-1)) :
                     self.removeBranch(label)
 
     def updateCheckerArgs(self, operand) :
@@ -1458,7 +1462,8 @@ def _checkLocalShadow(code, module, varname) :
         line = module.moduleLineNums.get(varname, ('<unknown>', 0))
         w = code.getWarning(msgs.LOCAL_SHADOWS_GLOBAL % (varname, line[1]))
         if line[0] != w.file:
-            w.err = '%s in file %s' % (w.err, line[0])
+            w = code.getWarning(msgs.LOCAL_SHADOWS_GLOBAL_IN_FILE %
+                                (varname, line[1], line[0]))
         code.addWarning(w)
 
 def _checkShadowBuiltin(code, varname) :
@@ -1554,9 +1559,10 @@ def _checkDeprecated(code, identifierTuple):
     except (KeyError, TypeError):
         pass
     else:
-        msg = msgs.USING_DEPRECATED_ATTR % name
         if undeprecated:
-            msg.data = msg.data + msgs.USE_INSTEAD % undeprecated
+            msg = msgs.USING_DEPRECATED_ATTR_INSTEAD % (name, undeprecated)
+        else:
+            msg = msgs.USING_DEPRECATED_ATTR % name
         code.addWarning(msg)
 
 def _LOAD_ATTR(oparg, operand, codeSource, code) :
@@ -2303,11 +2309,10 @@ def _jump(oparg, operand, codeSource, code):
                 code.addWarning(msgs.USING_METHOD_AS_ATTR % name)
 _JUMP_ABSOLUTE = _jump
 
-def _skip_loops(bytes, i, lastLineNum, max) :
-    extended_arg = 0
+def _skip_loops(instructions, i, lastLineNum, max) :
     blockCount = 1
     while i < max :
-        op, oparg, i, extended_arg = OP.getInfo(bytes, i, extended_arg)
+        op, oparg, i = instructions.getInfo(i)
         if OP.LINE_NUM(op) :
             lastLineNum = oparg
         elif OP.FOR_LOOP(op) or OP.FOR_ITER(op) or OP.SETUP_LOOP(op) :
@@ -2331,7 +2336,7 @@ def _is_unreachable(code, topOfStack, branch, ifFalse) :
         return 0
 
     # get the op just before the branch (ie, -3)
-    op, oparg, i, extended_arg = OP.getInfo(code.bytes, branch - 3, 0)
+    op, oparg, i = code.instructions.getInfo(branch - 3)
     # are we are jumping to before the while 1: (LOAD_CONST, JUMP_IF_FALSE)
     if not (OP.JUMP_ABSOLUTE(op) and oparg == (code.index - 3*3)) :
         return 0
@@ -2340,16 +2345,17 @@ def _is_unreachable(code, topOfStack, branch, ifFalse) :
     i = code.index
     lastLineNum = code.getLineNum()
     while i < branch :
-        op, oparg, i, extended_arg = OP.getInfo(code.bytes, i, extended_arg)
+        op, oparg, i = code.instructions.getInfo(i)
         if OP.LINE_NUM(op) :
             lastLineNum = oparg
         elif OP.BREAK_LOOP(op) :
             return 0
         elif OP.FOR_LOOP(op) or OP.FOR_ITER(op) or OP.SETUP_LOOP(op) :
-            lastLineNum, i = _skip_loops(code.bytes, i, lastLineNum, branch)
+            lastLineNum, i = _skip_loops(code.instructions, i, lastLineNum,
+                                         branch)
 
     i = code.index - 3*4
-    op, oparg, i, extended_arg = OP.getInfo(code.bytes, i, 0)
+    op, oparg, i = code.instructions.getInfo(i)
     if OP.SETUP_LOOP(op) :
         # a little lie to pretend we have a raise after a while 1:
         code.removeBranch(i + oparg)
@@ -29,7 +29,13 @@ def get_warning_levels():
             result[name.capitalize()] = obj
     return result
 
-_WARNING_LEVELS = get_warning_levels()
+# name -> warning class, found in msgs when a level is first given
+_warningLevels = {}
+
+def _getWarningLevels():
+    if not _warningLevels:
+        _warningLevels.update(get_warning_levels())
+    return _warningLevels
 
 _RC_FILE = ".pycheckrc"
 CHECKER_VAR = '__pychecker__'
@@ -57,10 +63,18 @@ _OPTIONS = (
  ('',  0, 'only', 'only', 'only warn about files passed on the command line'),
  ('e', 1, 'level', None, 'the maximum error level of warnings to be displayed'),
  ('#', 1, 'limit', 'limit', 'the maximum number of warnings to be displayed'),
+ ('',  0, 'stream', 'stream', 'print the warnings of each module as soon as it is checked (--limit keeps the first warnings, not the most severe)'),
  ('F', 1, 'config', None, 'specify .pycheckrc file to use'),
  ('',  0, 'quixote', None, 'support Quixote\'s PTL modules'),
  ('',  1, 'evil', 'evil', 'list of evil C extensions that crash the interpreter'),
  ('',  0, 'keepgoing', 'ignoreImportErrors', 'ignore import errors'),
+ ('',  0, 'sourceonly', 'sourceOnly', 'check modules without importing (running) them'),
+ ('',  1, 'signatures', 'signatures', 'file of library signatures to use instead of importing them'),
+ ('',  1, 'cache', 'cacheDir', 'directory to cache warnings in between runs'),
+ ('',  0, 'cachereport', 'cacheReport', 'print why cached modules were checked again'),
+ ('',  1, 'jobs', 'jobs', 'number of processes to check modules in'),
+ ('',  1, 'daemon', 'daemonSocket', 'serve check requests on this unix socket'),
+ ('',  0, 'profile-phases', 'profilePhases', 'print where the time was spent checking'),
      ]),
     ('Error Control', [
  ('i', 0, 'import', 'importUsed', 'unused imports'),
@@ -170,7 +184,14 @@ def init() :
 
     return shortArgs, longArgs, options
 
-_SHORT_ARGS, _LONG_ARGS, _OPTIONS_DICT = init()
+# the short and long getopt arguments and the options by argument,
+# built when the arguments are first parsed
+_optionTables = []
+
+def _getOptionTables():
+    if not _optionTables:
+        _optionTables.extend(init())
+    return _optionTables
 
 def _getRCfiles(filename) :
     """Return a list of .rc filenames, on Windows use the current directory
@@ -239,13 +260,21 @@ class Config :
         self.only = 0
         self.level = 0
         self.limit = 10
+        self.stream = 0
 
         self.ignoreImportErrors = 0
+        self.sourceOnly = 0
+        self.signatures = ''
         self.onlyCheckInitForMembers = 0
         self.printParse = 0
         self.quixote = 0
         self.evil = []
         self.findEvil = 0
+        self.cacheDir = ''
+        self.cacheReport = 0
+        self.jobs = 1
+        self.daemonSocket = ''
+        self.profilePhases = 0
 
         self.noDocModule = 0
         self.noDocClass = 0
@@ -391,8 +420,9 @@ class Config :
         return suppressions, suppressionRegexs
 
     def processArgs(self, argList, otherConfigFiles = None) :
+        shortArgs, longArgs, optionsDict = _getOptionTables()
         try :
-            args, files = getopt.getopt(argList, _SHORT_ARGS, _LONG_ARGS)
+            args, files = getopt.getopt(argList, shortArgs, longArgs)
         except getopt.error, detail :
             raise UsageError, detail
 
@@ -403,7 +433,7 @@ class Config :
         if otherConfigFiles is None:
             otherConfigFiles = []
         for arg, value in args :
-            shortArg, useValue, longArg, member, description = _OPTIONS_DICT[arg]
+            shortArg, useValue, longArg, member, description = optionsDict[arg]
             if member == None :
                 # FIXME: this whole block is a hack
                 if longArg == 'rcfile' :
@@ -423,13 +453,14 @@ class Config :
                     sys.exit(0)
                 elif longArg == 'level':
                     normalizedValue = value.capitalize()
-                    if not _WARNING_LEVELS.has_key(normalizedValue):
+                    levels = _getWarningLevels()
+                    if not levels.has_key(normalizedValue):
                         sys.stderr.write('Invalid warning level (%s).  '
                                          'Must be one of: %s\n' %
-                                         (value, _WARNING_LEVELS.keys()))
+                                         (value, levels.keys()))
                         sys.exit(1)
 
-                    self.level = _WARNING_LEVELS[normalizedValue].level
+                    self.level = levels[normalizedValue].level
                     continue
             elif value  :
                 newValue = value
@@ -458,6 +489,25 @@ class Config :
 
         return files
 
+class Layer(Config) :
+    """
+    Configuration overriding some of the values of another one.
+
+    Setting a value only stores it in the layer; values not set are read
+    from the configuration below.  Values read through are remembered,
+    since the configuration below does not change while it is covered.
+    """
+
+    def __init__(self, parent) :
+        self._parent = parent
+
+    def __getattr__(self, name) :
+        if name[:2] == '__' :
+            raise AttributeError, name
+        value = getattr(self._parent, name)
+        self.__dict__[name] = value
+        return value
+
 def printArg(shortArg, longArg, description, defaultValue, useValue) :
     defStr = ''
     shortArgStr = '   '
@@ -11,6 +11,9 @@ Very similar to the dis and opcode module, but dis does not exist in Jython,
 so recreate the small portion we need here.
 """
 
+import array
+import bisect
+
 from pychecker import utils
 
 def LINE_NUM(op):              return op == 127
@@ -134,6 +137,199 @@ def getInfo(code, index, extended_arg) :
         oparg, extended_arg = 0, 0
     return op, oparg, index, extended_arg
 
+class LineNumbers:
+    """
+    Index from bytecode offset to source line number for a code object,
+    built from co_lnotab once so each lookup is a bisection.
+
+    @ivar addresses: the offsets at which the line number changes
+    @type addresses: array of int
+    @ivar lines:     lines[i] is the line number for offsets before
+                     addresses[i]; the last one is for all offsets after
+    @type lines:     array of int
+    """
+
+    def __init__(self, func_code):
+        """
+        @type  func_code: L{types.CodeType} or L{pychecker.function.FakeCode}
+        """
+        co_lnotab = func_code.co_lnotab
+        self.addresses = array.array('l')
+        self.lines = array.array('l')
+
+        lineno = func_code.co_firstlineno
+        addr = 0
+        for lnotab_index in range(0, len(co_lnotab), 2):
+            addr = addr + ord(co_lnotab[lnotab_index])
+            self.addresses.append(addr)
+            self.lines.append(lineno)
+            lineno = lineno + ord(co_lnotab[lnotab_index+1])
+        self.lines.append(lineno)
+
+    def getLineNum(self, index):
+        """
+        @returns: the line number of the instruction at the given offset
+        @rtype:   int
+        """
+        return self.lines[bisect.bisect_right(self.addresses, index)]
+
+class Instructions:
+    """
+    The decoded instructions of a code object.
+
+    The bytecode is decoded once, and each field of an instruction is
+    stored at the same position in a set of parallel arrays.
+
+    @ivar func_code: the code object the instructions were decoded from
+    @type func_code: L{types.CodeType} or L{pychecker.function.FakeCode}
+    @ivar code:      the raw bytecode
+    @type code:      str
+    @ivar offsets:   byte offset of each instruction
+    @type offsets:   array of int
+    @ivar ops:       opcode of each instruction
+    @type ops:       array of int
+    @ivar opargs:    argument of each instruction, 0 if it has none
+    @type opargs:    array of int
+    @ivar nexts:     byte offset of the instruction following each one
+    @type nexts:     array of int
+    @ivar labels:    jump target of each instruction, -1 if it has none
+    @type labels:    array of int
+    @ivar operands:  the object the oparg of each instruction references
+    @type operands:  list of object
+    @ivar positions: dict of byte offset -> position in the arrays
+    @type positions: dict of int -> int
+    @ivar lineNumbers: the line number index, built when first used
+    @type lineNumbers: L{LineNumbers} or None
+    """
+
+    def __init__(self, func_code):
+        """
+        @type  func_code: L{types.CodeType} or L{pychecker.function.FakeCode}
+        """
+        self.func_code = func_code
+        self.code = code = func_code.co_code
+        self.offsets = array.array('l')
+        self.ops = array.array('l')
+        self.opargs = array.array('l')
+        self.nexts = array.array('l')
+        self.labels = array.array('l')
+        self.operands = []
+        self.positions = {}
+        self.lineNumbers = None
+
+        i, maxCode, extended_arg = 0, len(code), 0
+        while i < maxCode:
+            self.positions[i] = len(self.offsets)
+            self.offsets.append(i)
+            op, oparg, i, extended_arg = getInfo(code, i, extended_arg)
+            self.ops.append(op)
+            self.opargs.append(oparg)
+            self.nexts.append(i)
+            operand = label = None
+            if op >= HAVE_ARGUMENT:
+                operand = getOperand(op, func_code, oparg)
+                label = getLabel(op, oparg, i)
+            if label is None:
+                label = -1
+            self.labels.append(label)
+            self.operands.append(operand)
+
+    def __len__(self):
+        return len(self.ops)
+
+    def getLineNum(self, index):
+        """
+        @returns: the line number of the instruction at the given offset
+        @rtype:   int
+        """
+        if self.lineNumbers is None:
+            self.lineNumbers = LineNumbers(self.func_code)
+        return self.lineNumbers.getLineNum(index)
+
+    def label(self, position):
+        """
+        @returns: the jump target of the instruction, or None
+        @rtype:   int or None
+        """
+        label = self.labels[position]
+        if label < 0:
+            return None
+        return label
+
+    def opAt(self, index):
+        """
+        @returns: the opcode at the given byte offset
+        @rtype:   int
+        """
+        position = self.positions.get(index)
+        if position is None:
+            return ord(self.code[index])
+        return self.ops[position]
+
+    def getInfo(self, index):
+        """
+        Like L{getInfo} without an extended arg, but uses the decoded
+        instruction if index is the start of one.
+
+        @returns: tuple of (op, oparg, index of next instruction)
+        @rtype:   tuple of (int, int, int)
+        """
+        position = self.positions.get(index)
+        if position is None:
+            return getInfo(self.code, index, 0)[0:3]
+        return (self.ops[position], self.opargs[position],
+                self.nexts[position])
+
+# dict of id(code object) -> L{Instructions}; the instructions keep
+# their code object alive, so its id can not be reused
+_instructions = {}
+# the ids in _instructions, oldest first
+_instructionOrder = []
+# how many code objects to keep the instructions of; the oldest half is
+# forgotten when there are more, so a long-running process does not keep
+# every code object it ever checked
+_MAX_INSTRUCTIONS = 20000
+
+def getInstructions(func_code):
+    """
+    Return the decoded instructions for the given code object, decoding
+    them only the first time they are asked for.
+
+    @type  func_code: L{types.CodeType} or L{pychecker.function.FakeCode}
+
+    @rtype: L{Instructions}
+    """
+    # FakeCode instances can have their own co_varnames, so keep their
+    # instructions on the instance instead of sharing them; the check on
+    # func_code guards against a FakeCode copied from another one
+    instructions = getattr(func_code, '_pychecker_instructions', None)
+    if instructions is not None and instructions.func_code is func_code:
+        return instructions
+    instructions = _instructions.get(id(func_code))
+    if instructions is not None:
+        return instructions
+
+    instructions = Instructions(func_code)
+    try:
+        func_code._pychecker_instructions = instructions
+    except (AttributeError, TypeError):
+        if len(_instructionOrder) >= _MAX_INSTRUCTIONS:
+            half = _MAX_INSTRUCTIONS / 2
+            for key in _instructionOrder[:half]:
+                del _instructions[key]
+            del _instructionOrder[:half]
+        _instructions[id(func_code)] = instructions
+        _instructionOrder.append(id(func_code))
+    return instructions
+
+def clearInstructions():
+    """
+    Forget the instructions decoded for code objects that can not hold
+    them themselves, so the code objects can be freed.
+    """
+    _instructions.clear()
+    del _instructionOrder[:]
+
 def initFuncCode(func) :
     """Returns (func_code, code, i, maxCode, extended_arg) based on func,
        this is a helper function to setup looping through byte code"""
@@ -8,6 +8,38 @@
 Warning class to hold info about each warning.
 """
 
+import sys
+
+# the sys.path the prefixes below were computed from
+_sysPath = None
+# number of times the prefixes were computed
+_generation = 0
+# list of (length, dict of sys.path entries of that length), longest first
+_prefixes = []
+
+def _systemPathLength(file):
+    """
+    @returns: the length of the longest sys.path entry file starts with,
+              or 0
+    @rtype:   int
+    """
+    for length, paths in _prefixes:
+        if paths.has_key(file[:length]):
+            return length
+    return 0
+
+def _updatePrefixes():
+    global _sysPath, _generation, _prefixes
+    _sysPath = sys.path[:]
+    _generation = _generation + 1
+    byLength = {}
+    for path in _sysPath:
+        if not path or path == '.':
+            continue
+        byLength.setdefault(len(path), {})[path] = 1
+    _prefixes = byLength.items()
+    _prefixes.sort()
+    _prefixes.reverse()
 
 class Warning :
     """
@@ -18,8 +50,13 @@ class Warning :
     @ivar line: line number where the warning was found.
     @type line: int
     @type err:  L{msgs.WarningClass}
+    @ivar _formatted: the last result of format, with the arguments and
+                      the sys.path it was computed for
+    @type _formatted: tuple of (int, int, str)
     """
 
+    _formatted = None
+
     def __init__(self, file, line, err) :
         """
         @param file: an object from which the file where the warning
@@ -51,6 +88,13 @@ class Warning :
         self.err = err
         self.level = err.level
 
+    def __getstate__(self) :
+        # the generation in the memo only means something in this process
+        state = self.__dict__.copy()
+        if state.has_key('_formatted') :
+            del state['_formatted']
+        return state
+
     def __cmp__(self, warn) :
         if warn == None :
             return 1
@@ -65,16 +109,22 @@ class Warning :
     def format(self, removeSysPath=True) :
         if not self.file and not self.line:
             return str(self.err)
+        if sys.path != _sysPath:
+            _updatePrefixes()
+        formatted = self._formatted
+        if formatted is not None and formatted[0] == removeSysPath and \
+           formatted[1] == _generation:
+            return formatted[2]
+
         file = self.file
         if removeSysPath:
-            import sys
-            for path in sys.path:
-                if not path or path == '.':
-                    continue
-                if file.startswith(path):
-                    file = '[system path]' + file[len(path):]
-        
-        return "%s:%d: %s" % (file, self.line, self.err)
+            length = _systemPathLength(file)
+            if length:
+                file = '[system path]' + file[length:]
+
+        result = "%s:%d: %s" % (file, self.line, self.err)
+        self._formatted = (removeSysPath, _generation, result)
+        return result
 
     def output(self, stream, removeSysPath=True) :
         stream.write(self.format(removeSysPath) + "\n")
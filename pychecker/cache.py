@@ -0,0 +1,293 @@
+# -*- Mode: Python -*-
+# vi:si:et:sw=4:sts=4:ts=4
+
+"""
+Persistent cache of the warnings found for each module.
+
+A cached entry is keyed on the module's name and directory, and is only
+reused when the module's source, the source of the modules it depends on,
+the effective configuration and suppressions, the PyChecker version and
+the Python version are all unchanged since the entry was written, and the
+objects it left to the other modules checked are still checked with them.
+"""
+
+import os
+import sys
+import tempfile
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+try:
+    from hashlib import md5 as _md5
+except ImportError:
+    from md5 import new as _md5
+
+from pychecker import Config
+from pychecker import utils
+from pychecker import signatures
+
+# bump this when the format of the cached entries changes
+_CACHE_FORMAT = 5
+
+# configuration members that do not influence which warnings are found
+_IGNORED_CONFIG_MEMBERS = ('files', 'debug', 'quiet', 'printParse',
+                           'cacheDir', 'cacheReport', 'jobs',
+                           'daemonSocket', 'profilePhases', 'stream', )
+
+def _hashString(s):
+    return _md5(s).hexdigest()
+
+def configFingerprint(cfg, suppressions=None):
+    """
+    Return a fingerprint of the configuration and suppressions in effect.
+
+    @type  cfg:          L{Config.Config}
+    @type  suppressions: tuple of (dict of str -> str,
+                                   dict of _sre.SRE_Pattern -> str)
+
+    @rtype: str
+    """
+    items = []
+    for key, value in cfg.__dict__.items():
+        if key not in _IGNORED_CONFIG_MEMBERS:
+            if key == 'signatures' and value:
+                # the warnings change when the signatures are written again
+                value = (value, signatures.stamp(value))
+            items.append((key, value))
+    items.sort()
+
+    exact, regexs = {}, {}
+    if suppressions is not None:
+        exact, regexs = suppressions
+    exact = exact.items()
+    exact.sort()
+    regexs = [(regex.pattern, value) for regex, value in regexs.items()]
+    regexs.sort()
+
+    return _hashString(repr((items, exact, regexs)))
+
+
+class WarningCache:
+    """
+    I store the warnings found for each module in a directory, one file
+    per module, and can replay them for modules that did not change.
+
+    @ivar directory:   the directory the cache entries are stored in
+    @type directory:   str
+    @ivar fingerprint: fingerprint of the configuration in effect
+    @type fingerprint: str
+    @ivar reasons:     list of (module name, reason) for every module that
+                       could not be served from the cache
+    @type reasons:     list of (str, str)
+    @ivar hits:        number of modules served from the cache
+    @type hits:        int
+    """
+
+    def __init__(self, directory, cfg, suppressions=None):
+        """
+        @type  directory:    str
+        @type  cfg:          L{Config.Config}
+        @type  suppressions: tuple of (dict, dict)
+        """
+        self.directory = directory
+        self.fingerprint = configFingerprint(cfg, suppressions)
+        self.reasons = []
+        self.hits = 0
+        self._fileHashes = {}
+
+    def _entryPath(self, module):
+        key = '%s|%s' % (module.moduleName, module.moduleDir)
+        return os.path.join(self.directory, _hashString(key) + '.cache')
+
+    def _fileHash(self, filename):
+        """
+        @returns: the hash of the contents of the given file, or None if
+                  it can't be read
+        @rtype:   str or None
+        """
+        try:
+            return self._fileHashes[filename]
+        except KeyError:
+            pass
+
+        result = None
+        try:
+            handle = open(filename, 'rb')
+            try:
+                result = _hashString(handle.read())
+            finally:
+                handle.close()
+        except (IOError, OSError):
+            pass
+        self._fileHashes[filename] = result
+        return result
+
+    def _dependencies(self, module):
+        """
+        Return a dict of filename -> hash for every file, other than the
+        module's own, that the warnings for the given module depend on.
+
+        @type  module: L{pcmodules.PyCheckerModule}
+
+        @rtype: dict of str -> str or None
+        """
+        from pychecker import pcmodules
+
+        filenames = {}
+        for m in module.modules.values():
+            filename = getattr(m.module, '__file__', None)
+            if filename:
+                filenames[pcmodules._getPyFile(filename)] = 1
+        for func in module.functions.values():
+            filenames[func.function.func_code.co_filename] = 1
+        for c in module.classes.values():
+            for method in c.methods.values():
+                if method is not None:
+                    filenames[method.function.func_code.co_filename] = 1
+            for base in c.allBaseClasses():
+                baseModule = sys.modules.get(getattr(base, '__module__', None))
+                filename = getattr(baseModule, '__file__', None)
+                if filename:
+                    filenames[pcmodules._getPyFile(filename)] = 1
+
+        own = module.filename()
+        result = {}
+        for filename in filenames.keys():
+            if filename != own:
+                result[filename] = self._fileHash(filename)
+        return result
+
+    def _invalidReason(self, entry, module, elsewhere):
+        """
+        @returns: why the given entry can't be used for the module, or None
+                  if it can be used
+        @rtype:   str or None
+        """
+        if entry.get('format') != _CACHE_FORMAT:
+            return 'cache format changed'
+        if entry['version'] != Config._VERSION:
+            return 'pychecker version changed'
+        if entry['python'] != sys.version:
+            return 'python version changed'
+        if entry['config'] != self.fingerprint:
+            return 'configuration or suppressions changed'
+        if entry['source'] != self._fileHash(module.filename()):
+            return 'source changed'
+        if entry['elsewhere'] != elsewhere:
+            # the warnings of what it imports from them are not in the entry
+            return 'other modules checked'
+
+        dependencies = self._dependencies(module)
+        names = dependencies.keys() + entry['dependencies'].keys()
+        names.sort()
+        for filename in names:
+            if dependencies.get(filename) != \
+               entry['dependencies'].get(filename):
+                return 'dependency %s changed' % filename
+        return None
+
+    def lookup(self, module, elsewhere=None):
+        """
+        Return the cached warnings for the given module, or None if the
+        module needs to be checked again.
+
+        @type  module:    L{pcmodules.PyCheckerModule}
+        @param elsewhere: the files of the functions and classes in the
+                          module that are checked with other modules
+        @type  elsewhere: dict of str -> 1
+
+        @rtype: list of L{pychecker.Warning.Warning} or None
+        """
+        try:
+            handle = open(self._entryPath(module), 'rb')
+        except IOError:
+            self.reasons.append((module.moduleName, 'not cached'))
+            return None
+
+        try:
+            try:
+                entry = pickle.load(handle)
+            finally:
+                handle.close()
+        except (SystemExit, KeyboardInterrupt):
+            raise
+        except Exception:
+            self.reasons.append((module.moduleName, 'cache entry unreadable'))
+            return None
+
+        reason = self._invalidReason(entry, module, elsewhere or {})
+        if reason is not None:
+            self.reasons.append((module.moduleName, reason))
+            return None
+
+        utils.debug('cache: replaying %d warnings for module %s',
+            len(entry['warnings']), module.moduleName)
+        self.hits = self.hits + 1
+        return entry['warnings']
+
+    def store(self, module, warnings, elsewhere=None):
+        """
+        Store the warnings found for the given module.
+
+        @type  module:    L{pcmodules.PyCheckerModule}
+        @type  warnings:  list of L{pychecker.Warning.Warning}
+        @param elsewhere: the files of the functions and classes in the
+                          module that were checked with other modules
+        @type  elsewhere: dict of str -> 1
+        """
+        source = self._fileHash(module.filename())
+        if source is None:
+            # no source means nothing to compare against next time
+            return
+
+        entry = {
+            'format': _CACHE_FORMAT,
+            'version': Config._VERSION,
+            'python': sys.version,
+            'config': self.fingerprint,
+            'source': source,
+            'dependencies': self._dependencies(module),
+            'elsewhere': elsewhere or {},
+            'warnings': warnings,
+        }
+
+        if not os.path.isdir(self.directory):
+            try:
+                os.makedirs(self.directory)
+            except OSError:
+                # another process may have created it in the meantime
+                if not os.path.isdir(self.directory):
+                    raise
+
+        # write to a temporary file and rename, so concurrent runs
+        # never see a partially written entry
+        fd, tmpPath = tempfile.mkstemp(dir=self.directory)
+        handle = os.fdopen(fd, 'wb')
+        try:
+            try:
+                pickle.dump(entry, handle, 1)
+            finally:
+                handle.close()
+            if os.name != 'posix' and os.path.exists(self._entryPath(module)):
+                os.remove(self._entryPath(module))
+            os.rename(tmpPath, self._entryPath(module))
+        except (pickle.PicklingError, TypeError), e:
+            utils.debug('cache: could not store module %s: %s',
+                module.moduleName, e)
+            os.remove(tmpPath)
+
+    def report(self, stream=None):
+        """
+        Write out why modules were checked again instead of being served
+        from the cache.
+        """
+        if stream is None:
+            stream = sys.stderr
+
+        stream.write("Cache: %d modules reused, %d checked\n" % (
+            self.hits, len(self.reasons)))
+        for moduleName, reason in self.reasons:
+            stream.write("  %s: %s\n" % (moduleName, reason))
@@ -25,6 +25,8 @@ from pychecker import Config
 from pychecker import function
 from pychecker import msgs
 from pychecker import pcmodules
+from pychecker import signatures
+from pychecker import phases
 from pychecker.Warning import Warning
 
 _cfg = None
@@ -117,6 +119,34 @@ _BUILTIN_MODULE_ATTRS = { 'sys': [ 'ps1', 'ps2', 'tracebacklimit',
                                  ],
                         }
 
+# dict of (signatures file, builtin module name) -> attribute index of the module
+_builtinAttributes = {}
+
+def _getBuiltinAttributes(moduleName):
+    """
+    @rtype: dict of str -> int, or None if the module can not be loaded
+    """
+    key = (utils.cfg().signatures, moduleName)
+    try:
+        return _builtinAttributes[key]
+    except KeyError:
+        pass
+
+    m = signatures.getModule(moduleName)
+    if m is None:
+        try :
+            m = imp.init_builtin(moduleName)
+        except ImportError :
+            m = None
+    if m is None:
+        attributes = None
+    else :
+        extra_attrs = _BUILTIN_MODULE_ATTRS.get(moduleName, [])
+        attributes = pcmodules.attributeIndex(
+            [ '__dict__' ] + dir(m) + extra_attrs)
+    _builtinAttributes[key] = attributes
+    return attributes
+
 def fixupBuiltinModules(needs_init=0):
     for moduleName in sys.builtin_module_names :
         # Skip sys since it will reset sys.stdout in IDLE and cause
@@ -130,34 +160,88 @@ def fixupBuiltinModules(needs_init=0):
         # builtin modules don't have a moduleDir
         module = pcmodules.getPCModule(moduleName)
         if module is not None :
-            try :
-                m = imp.init_builtin(moduleName)
-            except ImportError :
-                pass
-            else :
-                extra_attrs = _BUILTIN_MODULE_ATTRS.get(moduleName, [])
-                module.attributes = [ '__dict__' ] + dir(m) + extra_attrs
+            attributes = _getBuiltinAttributes(moduleName)
+            if attributes is not None :
+                module.attributes = attributes
 
 
 def _printWarnings(warnings, stream=None):
     if stream is None:
         stream = sys.stdout
     
+    warnings = warn.uniqueWarnings(warnings)
     warnings.sort()
     lastWarning = None
     for warning in warnings :
-        if lastWarning is not None:
-            # ignore duplicate warnings
-            if cmp(lastWarning, warning) == 0:
-                continue
-            # print blank line between files
-            if lastWarning.file != warning.file:
-                stream.write("\n")
+        # print blank line between files
+        if lastWarning is not None and lastWarning.file != warning.file:
+            stream.write("\n")
 
         lastWarning = warning
         warning.output(stream, removeSysPath=True)
 
 
+class StreamPrinter:
+    """
+    I print warnings as they are found, a module at a time.
+
+    The warnings of each module are sorted, duplicates of warnings printed
+    before are dropped, and once limit warnings were printed the others
+    are only counted.  Unlike L{warn.limitWarnings}, the limit keeps the
+    first warnings found rather than the most severe ones.
+
+    @ivar printed:    the number of warnings printed
+    @type printed:    int
+    @ivar suppressed: the number of warnings not printed because of the limit
+    @type suppressed: int
+    """
+
+    def __init__(self, stream=None, limit=0, header=None):
+        """
+        @param header: written before the first warning
+        @type  header: str
+        """
+        if stream is None:
+            stream = sys.stdout
+        self.stream = stream
+        self.limit = limit
+        self.header = header
+        self.printed = 0
+        self.suppressed = 0
+        self._seen = {}
+        self._lastFile = None
+
+    def __call__(self, warnings):
+        warnings.sort()
+        for warning in warnings:
+            key = warn._warningKey(warning)
+            if self._seen.has_key(key):
+                continue
+            self._seen[key] = 1
+
+            if self.limit and self.printed >= self.limit:
+                self.suppressed = self.suppressed + 1
+                continue
+            if self.header is not None:
+                self.stream.write(self.header)
+                self.header = None
+            # print blank line between files
+            if self._lastFile is not None and self._lastFile != warning.file:
+                self.stream.write("\n")
+            self._lastFile = warning.file
+            warning.output(self.stream, removeSysPath=True)
+            self.printed = self.printed + 1
+        self.stream.flush()
+
+    def finish(self):
+        "Print how many warnings were not printed because of the limit."
+        if self.suppressed:
+            self.stream.write("\n")
+            Warning('', 0, msgs.TOO_MANY_WARNINGS % self.suppressed).output(
+                self.stream)
+            self.stream.flush()
+
+
 class NullModule:
     def __getattr__(self, unused_attr):
         return None
@@ -221,12 +305,18 @@ def processFiles(files, cfg=None, pre_process_cb=None):
             pre_process_cb("module %s (%s)" % (moduleName, file))
 
         # create and load the PyCheckerModule, tricking sys.path temporarily
+        if phases.enabled:
+            started = phases.clock()
+        phases.start('load')
         oldsyspath = sys.path[:]
         if moduleDir is not None:
             sys.path.insert(0, moduleDir)
         pcmodule = pcmodules.PyCheckerModule(moduleName, moduleDir=moduleDir)
         loaded = pcmodule.load()
         sys.path = oldsyspath
+        phases.stop('load')
+        if phases.enabled:
+            phases.addModule(moduleName, phases.clock() - started)
 
         if not loaded:
             w = Warning(pcmodule.filename(), 1,
@@ -273,7 +363,15 @@ def _mightBeSiblingModule(module):
     return True
 
 # grooming this to be public API to use pychecker as a module
-def _check(files, cfg=None, suppressions=None, printProcessing=False):
+def _check(files, cfg=None, suppressions=None, printProcessing=False,
+           report=None):
+    """
+    @param report: if given, called with the warnings of each module as
+                   they are found, instead of returning them all at the end
+    @type  report: callable taking list of L{Warning}, like L{StreamPrinter}
+
+    @rtype: list of L{Warning}
+    """
     # snapshot modules before and after processing, so that we only warn
     # about the modules loaded because of these files.
     # preferable to clearing the loaded modules because we don't have to
@@ -281,6 +379,12 @@ def _check(files, cfg=None, suppressions=None, printProcessing=False):
     beforePCModules = getAllPCModules()
     beforeModules = dict(sys.modules.items())
     utils.initConfig(cfg)
+    # modules checked by the runs before are loaded again, so the tables
+    # of pcmodules would keep the objects of their old copies alive
+    if beforePCModules:
+        pcmodules.clearTables()
+    if cfg.profilePhases:
+        phases.enable()
 
     utils.debug('main: Checking %d files', len(files))
     utils.debug('main: Finding import warnings')
@@ -317,6 +421,14 @@ def _check(files, cfg=None, suppressions=None, printProcessing=False):
             del sys.modules[k]
 
     utils.debug('main: Finding warnings')
+    if report is not None:
+        report(importWarnings)
+        for moduleWarnings in warn.findByModule(newPCModules, cfg,
+                                                suppressions):
+            report(moduleWarnings)
+        utils.popConfig()
+        return []
+
     # suppressions is a tuple of suppressions, suppressionRegexs dicts
     warnings = warn.find(newPCModules, cfg, suppressions)
 
@@ -61,15 +61,11 @@ if __name__ == '__main__' :
     setupNamespace(sys.argv[0])
     setupSysPathForDevelopment()
 
+# only what parsing the arguments needs is imported here, so printing
+# the usage or running without files starts fast; the modules checking
+# needs are imported when there is something to check
 from pychecker import utils
-from pychecker import printer
-from pychecker import warn
-from pychecker import OP
 from pychecker import Config
-from pychecker import function
-from pychecker import msgs
-from pychecker import pcmodules
-from pychecker.Warning import Warning
 
 _cfg = None
 
@@ -82,19 +78,17 @@ by doing python setup.py install.
 '''
 
 def _printWarnings(warnings, stream=None):
+    from pychecker import warn
     if stream is None:
         stream = sys.stdout
     
+    warnings = warn.uniqueWarnings(warnings)
     warnings.sort()
     lastWarning = None
     for warning in warnings :
-        if lastWarning is not None:
-            # ignore duplicate warnings
-            if cmp(lastWarning, warning) == 0:
-                continue
-            # print blank line between files
-            if lastWarning.file != warning.file:
-                stream.write("\n")
+        # print blank line between files
+        if lastWarning is not None and lastWarning.file != warning.file:
+            stream.write("\n")
 
         lastWarning = warning
         warning.output(stream, removeSysPath=True)
@@ -130,21 +124,32 @@ def main(argv) :
     global _cfg
     _cfg, files, suppressions = Config.setupFromArgs(argv[1:])
     utils.initConfig(_cfg)
-    if not files :
+    if not files and not _cfg.daemonSocket :
         return 0
 
     # Now that we've got the args, update the list of evil C objects
+    from pychecker import pcmodules
     for evil_doer in _cfg.evil:
         pcmodules.EVIL_C_OBJECTS[evil_doer] = None
 
     # insert this here, so we find files in the local dir before std library
     sys.path.insert(0, '')
 
+    if _cfg.daemonSocket :
+        from pychecker import daemon
+        return daemon.serve(_cfg.daemonSocket, _cfg, suppressions)
+
     # import here, because sys.path is not set up at the top for pychecker dir
     from pychecker import check
+    if _cfg.stream :
+        return _streamWarnings(check, files, suppressions)
+
     warnings = check._check(files,
         cfg=_cfg,
         suppressions=suppressions, printProcessing=True)
+    if _cfg.profilePhases :
+        from pychecker import phases
+        phases.report()
     if not _cfg.quiet :
         print "\nWarnings...\n"
     if warnings:
@@ -155,6 +160,24 @@ def main(argv) :
         print "None"
     return 0
 
+def _streamWarnings(check, files, suppressions):
+    header = None
+    if not _cfg.quiet :
+        header = "\nWarnings...\n\n"
+    printer = check.StreamPrinter(limit=_cfg.limit, header=header)
+    check._check(files, cfg=_cfg, suppressions=suppressions,
+        printProcessing=True, report=printer)
+    printer.finish()
+    if _cfg.profilePhases :
+        from pychecker import phases
+        phases.report()
+    if printer.printed or printer.suppressed:
+        return 1
+
+    if not _cfg.quiet :
+        print "\nWarnings...\n\nNone"
+    return 0
+
 # FIXME: this is a nasty side effect for import checker
 if __name__ == '__main__' :
     try :
@@ -165,6 +188,7 @@ if __name__ == '__main__' :
 else :
     _orig__import__ = None
     _suppressions = None
+    pcmodules = warn = None
     _warnings_cache = {}
 
     def _get_unique_warnings(warnings):
@@ -186,7 +210,9 @@ else :
 
         check = not sys.modules.has_key(name) and name[:10] != 'pychecker.'
         pymodule = _orig__import__(name, globals, locals, fromlist)
-        if check :
+        # builtin modules have no source to check
+        if check and hasattr(pymodule, '__file__'):
+            _setupChecking()
             try :
                 # FIXME: can we find a good moduleDir ?
                 # based on possible module.__file__, check if it's from
@@ -213,13 +239,33 @@ else :
 
         return pymodule
 
+    def _setupChecking():
+        """
+        Import the modules checking needs, the first time a module is
+        imported, so importing this module stays fast.
+        """
+        global pcmodules, warn
+        if warn is not None:
+            return
+
+        # the modules imported here should not be checked themselves
+        import __builtin__
+        __builtin__.__import__ = _orig__import__
+        try:
+            from pychecker import check, pcmodules, warn
+            if _cfg.cacheDir:
+                # warn.find imports it, so import it before it is checked
+                from pychecker import cache
+            check.fixupBuiltinModules(1)
+        finally:
+            __builtin__.__import__ = __import__
+
     def _init() :
         global _cfg, _suppressions, _orig__import__
 
         args = string.split(os.environ.get('PYCHECKER', ''))
         _cfg, files, _suppressions = Config.setupFromArgs(args)
         utils.initConfig(_cfg)
-        check.fixupBuiltinModules(1)
 
         # keep the orig __import__ around so we can call it
         import __builtin__
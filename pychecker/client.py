@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- Mode: Python -*-
+# vi:si:et:sw=4:sts=4:ts=4
+
+"""
+Send files to check to a PyChecker daemon and print its answer.
+
+Start the daemon with checker.py --daemon SOCKET [options], then run
+client.py [--socket SOCKET] files...  The socket can also be given in the
+PYCHECKER_SOCKET environment variable.
+
+This module only imports from the standard library, so it starts quickly.
+"""
+
+import os
+import sys
+import socket
+import getopt
+
+def check(path, files, directory=None):
+    """
+    Ask the daemon listening on the given socket to check files.
+
+    @type  path:      str
+    @type  files:     list of str
+    @param directory: the directory the files are relative to; defaults
+                      to the current directory
+    @type  directory: str
+
+    @returns: the exit status and the output of the check
+    @rtype:   tuple of (int, str)
+    """
+    if directory is None:
+        directory = os.getcwd()
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(path)
+        connection.sendall('%s\n%s\n\n' % (directory, '\n'.join(files)))
+        chunks = []
+        while 1:
+            chunk = connection.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        connection.close()
+
+    status, output = ''.join(chunks).split('\n', 1)
+    return int(status), output
+
+def main(argv):
+    try:
+        args, files = getopt.getopt(argv[1:], 's:', ['socket='])
+    except getopt.error, detail:
+        sys.stderr.write('%s\n' % detail)
+        return 127
+
+    path = os.environ.get('PYCHECKER_SOCKET')
+    for unused, value in args:
+        path = value
+    if not path:
+        sys.stderr.write('usage: %s [--socket SOCKET] files...\n' % argv[0])
+        return 127
+    if not files:
+        return 0
+
+    try:
+        status, output = check(path, files)
+    except socket.error, detail:
+        sys.stderr.write('Unable to talk to daemon at %s: %s\n' % (
+            path, detail))
+        return 127
+
+    sys.stdout.write(output)
+    return status
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
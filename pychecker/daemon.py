@@ -0,0 +1,387 @@
+# -*- Mode: Python -*-
+# vi:si:et:sw=4:sts=4:ts=4
+
+"""
+Long-running check server.
+
+The server keeps the PyChecker module registry and the modules loaded while
+checking warm between requests, and listens for requests on a local Unix
+socket.  A file is only checked again when it, or a module it depends on,
+changed since it was last checked; the warnings for the other files are
+replayed from memory.
+
+The protocol is line based: the client sends the directory to check from,
+then one file per line, then an empty line.  The server answers with the
+exit status on the first line, followed by the output.
+"""
+
+import os
+import sys
+import stat
+import errno
+import socket
+import traceback
+
+try:
+    from cStringIO import StringIO
+except ImportError:
+    from StringIO import StringIO
+
+from pychecker import warn
+from pychecker import utils
+from pychecker import pcmodules
+
+def _stamp(filename):
+    """
+    @returns: what changes when the given file is edited, or None if the
+              file does not exist
+    @rtype:   tuple of (float, int) or None
+    """
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return None
+    return (st.st_mtime, st.st_size)
+
+
+def _imports(module):
+    """
+    @returns: the modules the given module imports, with import or from
+    @rtype:   list of L{pcmodules.PyCheckerModule}
+    """
+    imports = module.modules.values()
+    imports.extend([other for line, other in module.imported.values()])
+    return imports
+
+def _sourceFiles(module):
+    """
+    @returns: the absolute names of the files the functions and classes
+              found in the given module were defined in
+    @rtype:   dict of str -> 1
+    """
+    filenames = {}
+    for func in module.functions.values():
+        filenames[func.function.func_code.co_filename] = 1
+    for c in module.classes.values():
+        for method in c.methods.values():
+            if method is not None:
+                filenames[method.function.func_code.co_filename] = 1
+    for other in _imports(module):
+        if other.module is not None and hasattr(other.module, '__file__'):
+            filenames[other.filename()] = 1
+
+    result = {}
+    for filename in filenames.keys():
+        result[os.path.abspath(filename)] = 1
+    return result
+
+
+class _Entry:
+    """
+    What the server remembers about a file it checked.
+
+    @ivar key:      the registry key of the module checked for the file
+    @type key:      tuple of (str, str)
+    @ivar stamp:    the stamp of the file when it was checked
+    @ivar warnings: the warnings found for the file, and for what it
+                    imports from files not asked for
+    @type warnings: list of L{pychecker.Warning.Warning}
+    """
+
+    def __init__(self, key, stamp, warnings):
+        self.key = key
+        self.stamp = stamp
+        self.warnings = warnings
+
+
+class Server:
+    """
+    I answer check requests, checking again only what changed.
+
+    @ivar path:         the path of the Unix socket to listen on
+    @type path:         str
+    @ivar cfg:          the configuration to check with
+    @type cfg:          L{pychecker.Config.Config}
+    @ivar suppressions: the suppressions to check with
+    @type suppressions: tuple of (dict, dict)
+    @ivar checked:      the files checked again for the last request
+    @type checked:      list of str
+    """
+
+    def __init__(self, path, cfg, suppressions=None):
+        self.path = path
+        self.cfg = cfg
+        self.suppressions = suppressions
+        self.checked = []
+        # absolute filename -> L{_Entry}
+        self._entries = {}
+        # registry key -> (absolute filename, stamp, absolute names of the
+        # files its functions and classes come from) of every loaded module
+        self._sources = {}
+
+    def _recordSources(self):
+        """
+        Remember the source file of every module in the registry that is
+        not yet known.  Must be called from the directory the modules
+        were loaded from, since their filenames can be relative.
+        """
+        for module in pcmodules.getPCModules():
+            key = (module.moduleName, module.moduleDir)
+            if key in self._sources or module.module is None:
+                continue
+            if not hasattr(module.module, '__file__'):
+                continue
+            filename = os.path.abspath(module.filename())
+            self._sources[key] = (filename, _stamp(filename),
+                                  _sourceFiles(module))
+
+    def _invalidate(self):
+        """
+        Drop every loaded module whose source changed, and every module
+        that imports one of those, so they get loaded again.
+        """
+        modules = {}
+        for module in pcmodules.getPCModules():
+            modules[(module.moduleName, module.moduleDir)] = module
+
+        stale = {}
+        staleFiles = {}
+        for key, (filename, stamp, sources) in self._sources.items():
+            if _stamp(filename) != stamp:
+                stale[key] = 1
+                staleFiles[filename] = 1
+
+        # the dependents of a changed module hold on to its old contents,
+        # whether they import the module or names from it
+        changed = 1
+        while changed:
+            changed = 0
+            for key, (filename, stamp, sources) in self._sources.items():
+                if key in stale:
+                    continue
+                for source in sources.keys():
+                    if source in staleFiles:
+                        stale[key] = 1
+                        staleFiles[filename] = 1
+                        changed = 1
+                        break
+            for key, module in modules.items():
+                if key in stale:
+                    continue
+                for imported in _imports(module):
+                    if (imported.moduleName, imported.moduleDir) in stale:
+                        stale[key] = 1
+                        if key in self._sources:
+                            staleFiles[self._sources[key][0]] = 1
+                        changed = 1
+                        break
+
+        for key in stale.keys():
+            utils.debug('daemon: unloading module %s', key[0])
+            module = modules.get(key)
+            if module is not None:
+                pcmodules.removePCModule(module)
+                if module.module is not None and \
+                   sys.modules.get(key[0]) is module.module:
+                    del sys.modules[key[0]]
+            if key in self._sources:
+                del self._sources[key]
+
+    def _isCurrent(self, filename):
+        entry = self._entries.get(filename)
+        if entry is None or entry.stamp != _stamp(filename):
+            return 0
+        module = pcmodules.getPCModule(*entry.key)
+        return module is not None and module.module is not None
+
+    def check(self, directory, files):
+        """
+        Check the given files, relative to the given directory.
+
+        @type  directory: str
+        @type  files:     list of str
+
+        @returns: the exit status and the output for the request
+        @rtype:   tuple of (int, str)
+        """
+        # what is printed while checking goes back to the client, like
+        # it would be shown when checking from the command line
+        stream = StringIO()
+        stdout, stderr = sys.stdout, sys.stderr
+        sys.stdout = sys.stderr = stream
+        utils.initConfig(self.cfg)
+        try:
+            status = self._check(directory, files, stream)
+        finally:
+            utils.popConfig()
+            sys.stdout, sys.stderr = stdout, stderr
+        return status, stream.getvalue()
+
+    def _check(self, directory, files, stream):
+        from pychecker import check
+
+        self._invalidate()
+
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            filenames = map(os.path.abspath, files)
+            self.cfg.files = {}
+            for filename in filenames:
+                self.cfg.files[filename] = 1
+
+            self.checked = []
+            for file, filename in zip(files, filenames):
+                if not self._isCurrent(filename):
+                    self.checked.append(file)
+
+            if self.checked:
+                utils.debug('daemon: checking %d of %d files',
+                    len(self.checked), len(files))
+                # the limit applies to the whole answer, which can include
+                # replayed warnings, so apply it below instead
+                limit = self.cfg.limit
+                self.cfg.limit = 0
+                try:
+                    warnings = check._check(self.checked, cfg=self.cfg,
+                        suppressions=self.suppressions, printProcessing=True)
+                finally:
+                    self.cfg.limit = limit
+                self._recordSources()
+
+                byFile = {}
+                for warning in warnings:
+                    byFile.setdefault(os.path.abspath(warning.file),
+                                      []).append(warning)
+
+                entries = []
+                for key, filename in zip(check.getModules(self.checked),
+                                         map(os.path.abspath, self.checked)):
+                    entry = _Entry(key, _stamp(filename),
+                                   byFile.pop(filename, []))
+                    self._entries[filename] = entry
+                    entries.append(entry)
+
+                # the warnings for files not asked for are found for what
+                # is imported from them, so they are replayed with the
+                # files importing it
+                for filename, others in byFile.items():
+                    if filename in self.cfg.files:
+                        continue
+                    importers = []
+                    for entry in entries:
+                        module = pcmodules.getPCModule(*entry.key)
+                        if module is not None and \
+                           filename in _sourceFiles(module):
+                            importers.append(entry)
+                    for entry in importers or entries:
+                        entry.warnings.extend(others)
+
+            warnings = []
+            for filename in filenames:
+                entry = self._entries.get(filename)
+                if entry is not None:
+                    warnings.extend(entry.warnings)
+            warnings = warn.uniqueWarnings(warnings)
+            if self.cfg.limit:
+                warn.limitWarnings(warnings, self.cfg.limit)
+
+            if not self.cfg.quiet:
+                stream.write("\nWarnings...\n\n")
+            if warnings:
+                check._printWarnings(warnings, stream)
+                status = 1
+            else:
+                if not self.cfg.quiet:
+                    stream.write("None\n")
+                status = 0
+        finally:
+            os.chdir(cwd)
+
+        return status
+
+    def _handle(self, connection):
+        handle = connection.makefile('rb')
+        try:
+            directory = handle.readline().rstrip('\n')
+            files = []
+            while 1:
+                line = handle.readline().rstrip('\n')
+                if not line:
+                    break
+                files.append(line)
+        finally:
+            handle.close()
+
+        try:
+            status, output = self.check(directory, files)
+        except (SystemExit, KeyboardInterrupt):
+            raise
+        except Exception:
+            status, output = 2, traceback.format_exc()
+        connection.sendall('%d\n%s' % (status, output))
+
+    def serve(self):
+        """
+        Answer requests until interrupted.
+        """
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            listener.bind(self.path)
+            listener.listen(5)
+            utils.debug('daemon: listening on %s', self.path)
+            while 1:
+                connection, unused = listener.accept()
+                try:
+                    self._handle(connection)
+                finally:
+                    connection.close()
+        finally:
+            listener.close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+def _clearPath(path):
+    """
+    Remove the socket at the given path if it was left behind by a daemon
+    that is gone.  Anything else there is left alone.
+
+    @returns: why the path cannot be listened on, or None if it can
+    @rtype:   str or None
+    """
+    try:
+        mode = os.stat(path)[stat.ST_MODE]
+    except OSError:
+        return None
+    if not stat.S_ISSOCK(mode):
+        return 'it exists and is not a socket'
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            probe.connect(path)
+        except socket.error, detail:
+            if detail.args[0] != errno.ECONNREFUSED:
+                return str(detail)
+            os.remove(path)
+            return None
+    finally:
+        probe.close()
+    return 'a daemon is already listening on it'
+
+def serve(path, cfg, suppressions=None):
+    """
+    Answer check requests on the Unix socket at the given path.
+
+    @rtype: int
+    """
+    reason = _clearPath(path)
+    if reason:
+        sys.stderr.write('Unable to listen on %s: %s\n' % (path, reason))
+        return 1
+    try:
+        Server(path, cfg, suppressions).serve()
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -0,0 +1,122 @@
+# -*- Mode: Python -*-
+# vi:si:et:sw=4:sts=4:ts=4
+
+"""
+Find modules like imp.find_module, from an index of the directories
+searched.
+
+Each directory is listed once, and listed again only when its
+modification time changes, so looking up many modules in the same
+directories does not try every suffix of every name in each of them.
+"""
+
+import imp
+import os
+import sys
+
+# the suffixes imp knows about, in the order it tries them
+_SUFFIXES = imp.get_suffixes()
+_INIT_SUFFIXES = [suffix for suffix, mode, kind in _SUFFIXES
+                  if kind in (imp.PY_SOURCE, imp.PY_COMPILED)]
+
+_STRING_TYPES = (type(''), type(u''))
+
+# dict of absolute directory -> (modification time, dict of entries)
+_directories = {}
+
+def reset():
+    _directories.clear()
+
+def _listing(directory):
+    """
+    @returns: the names in the directory, or None if it is not one
+    @rtype:   dict of str -> int, or None
+    """
+    directory = os.path.abspath(directory or os.curdir)
+    try:
+        mtime = os.stat(directory).st_mtime
+    except OSError:
+        return None
+    cached = _directories.get(directory)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        entries = None
+    else:
+        entries = {}
+        for name in names:
+            entries[name] = 1
+    _directories[directory] = (mtime, entries)
+    return entries
+
+def _isPackage(directory):
+    entries = _listing(directory)
+    if entries is None:
+        return 0
+    for suffix in _INIT_SUFFIXES:
+        if entries.has_key('__init__' + suffix):
+            return 1
+    return 0
+
+def findIn(name, directory, suffixes=_SUFFIXES):
+    """
+    Find a module in the given directory.
+
+    @param suffixes: the (suffix, mode, type) tuples to try, in order
+    @type  suffixes: list of tuple
+
+    @returns: the file name and its (suffix, mode, type), or None
+    @rtype:   tuple of (str, tuple) or None
+    """
+    entries = _listing(directory)
+    if entries is None:
+        return None
+
+    if entries.has_key(name):
+        filename = os.path.join(directory, name)
+        if _isPackage(filename):
+            return filename, ('', '', imp.PKG_DIRECTORY)
+    for description in suffixes:
+        if entries.has_key(name + description[0]):
+            return os.path.join(directory, name + description[0]), description
+    return None
+
+def find(name, path=None):
+    """
+    Find a module like imp.find_module does.
+
+    @type  name: str
+    @param path: the directories to search; if None, builtin and frozen
+                 modules and sys.path are searched
+    @type  path: list of str or None
+
+    @returns: an open file or None, the file name and its
+              (suffix, mode, type)
+    @rtype:   tuple of (file or None, str, tuple)
+    """
+    if path is None:
+        if imp.is_builtin(name):
+            return None, name, ('', '', imp.C_BUILTIN)
+        if imp.is_frozen(name):
+            return None, name, ('', '', imp.PY_FROZEN)
+        path = sys.path
+
+    for directory in path:
+        # path can hold other objects, which imp skips too
+        if type(directory) not in _STRING_TYPES:
+            continue
+        found = findIn(name, directory)
+        if found is None:
+            continue
+        filename, description = found
+        if description[-1] == imp.PKG_DIRECTORY:
+            return None, filename, description
+        try:
+            handle = open(filename, description[1])
+        except IOError:
+            continue
+        return handle, filename, description
+    raise ImportError, "No module named %s" % name
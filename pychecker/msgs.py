@@ -8,8 +8,6 @@
 Warning Messages for PyChecker
 """
 
-import UserString
-
 class WarningClass:
   level = 0
 
@@ -19,13 +17,63 @@ class WarningClass:
       self.level += level_offset
 
   def __mod__(self, args):
-    result = UserString.UserString(self.msg % args)
-    result.level = self.level
-    return result
+    return Message(self, args)
 
   def __str__(self):
     return self.msg
 
+_IMMUTABLE_TYPES = (type(''), type(u''), type(0), type(0L), type(0.0),
+                    type(0 == 0), type(None))
+
+def _freeze(arg):
+  if type(arg) in _IMMUTABLE_TYPES:
+    return arg
+  return str(arg)
+
+class Message:
+  """
+  A warning message, only rendered from its template when it is printed
+  or compared.
+
+  Messages compare and hash by their text, like the strings they replace,
+  so they sort as before and are equal to the same text, whether that is
+  another message, a string or a bare L{WarningClass}.  Arguments other
+  than strings and numbers are rendered when the message is created, since
+  they may change afterwards.
+
+  @ivar template: the template of the message
+  @type template: str
+  @ivar args:     the arguments for the template
+  @type args:     tuple
+  @ivar level:    the level of the warning
+  @type level:    int
+  """
+
+  def __init__(self, warning, args):
+    if type(args) is not type(()):
+      args = (args,)
+    for arg in args:
+      if type(arg) not in _IMMUTABLE_TYPES:
+        args = tuple(map(_freeze, args))
+        break
+    self.template = warning.msg
+    self.args = args
+    self.level = warning.level
+    self._text = None
+
+  def __str__(self):
+    if self._text is None:
+      self._text = self.template % self.args
+    return self._text
+
+  def __cmp__(self, other):
+    if type(other) is not type(''):
+      other = str(other)
+    return cmp(str(self), other)
+
+  def __hash__(self):
+    return hash(str(self))
+
 class Internal(WarningClass):
   level = 100
 
@@ -85,6 +133,7 @@ INVALID_SET_CLASS_ATTR = Warning("Setting class attribute (%s) not set in __init
 INVALID_MODULE_ATTR = Error("No module attribute (%s) found")
 
 LOCAL_SHADOWS_GLOBAL = Warning("Local variable (%s) shadows global defined on line %d")
+LOCAL_SHADOWS_GLOBAL_IN_FILE = Warning("Local variable (%s) shadows global defined on line %d in file %s")
 VARIABLE_SHADOWS_BUILTIN = Warning("(%s) shadows builtin")
 CLASS_SHADOWS_IMPORT = Warning("Class (%s) shadows import on line %d from module (%s)")
 USING_METHOD_AS_ATTR = Warning("Using method (%s) as an attribute (not invoked)")
@@ -118,6 +167,7 @@ STRING_ITERATION = Warning("Iterating over a string (%s)")
 DONT_RETURN_NONE = Error("%s should not return None, raise an exception if not found")
 IS_LITERAL = Warning("Using is%s %s, may not always work")
 INVALID_FORMAT = Error("Invalid format string, problem starts near: '%s'")
+INVALID_FORMAT_END = Error("Invalid format string, problem starts near: '%s' (end of format string)")
 INVALID_FORMAT_COUNT = Error("Format string argument count (%d) doesn't match arguments (%d)")
 TOO_MANY_STARS_IN_FORMAT = Error("Too many *s in format flags")
 USING_STAR_IN_FORMAT_MAPPING = Error("Can't use * in formats when using a mapping (dictionary), near: '%s'")
@@ -169,8 +219,9 @@ USES_INPUT = Security("Using input() is a security problem, consider using raw_i
 
 USING_DEPRECATED_MODULE = Deprecated("%s module is deprecated")
 USING_DEPRECATED_ATTR = Deprecated("%s is deprecated")
+USING_DEPRECATED_MODULE_INSTEAD = Deprecated("%s module is deprecated, consider using %s")
+USING_DEPRECATED_ATTR_INSTEAD = Deprecated("%s is deprecated, consider using %s")
 USING_INSECURE_FUNC = Security("%s() is a security problem")
-USE_INSTEAD = ", consider using %s"
 
 USES_CONST_ATTR = Warning("Passing a constant string to %s, consider direct reference")
 
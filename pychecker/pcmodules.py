@@ -13,7 +13,8 @@ import imp
 import types
 import string
 
-from pychecker import utils, function, Config, OP
+from pychecker import utils, function, Config, OP, phases, static
+from pychecker import signatures
 
 # Constants
 _DEFAULT_MODULE_TOKENS = ('__builtins__', '__doc__', '__file__', '__name__',
@@ -79,6 +80,56 @@ def _getPyFile(filename):
 def _getModuleTokens(m):
     return _filterDir(m, _DEFAULT_MODULE_TOKENS)
 
+def attributeIndex(names):
+    """
+    Return an index of the given attribute names, to look them up by hash.
+    The index is shared, so it should not be changed.
+
+    @type  names: list of str
+
+    @rtype: dict of str -> int
+    """
+    index = {}
+    for name in names:
+        index[name] = 1
+    return index
+
+# attributes the interpreter gives every classic class
+_CLASSIC_CLASS_ATTRS = ('__name__', '__bases__', '__dict__', '__module__',
+                        '__doc__')
+
+# dict of id(class object) -> (class object, attribute index)
+_classAttributes = {}
+
+def getClassAttributes(classObject):
+    """
+    Return an index of the attributes of a class, including the ones
+    inherited from its bases and its metaclass, without getting any of
+    them.  The index is built once per class object.
+
+    @rtype: dict of str -> int, or L{static.AllNames} if the class may
+            have any attribute
+    """
+    try:
+        return _classAttributes[id(classObject)][1]
+    except KeyError:
+        pass
+
+    metaclass = type(classObject)
+    try:
+        # a __getattr__ on the metaclass can make up class attributes
+        if hasattr(metaclass, '__getattr__'):
+            raise TypeError
+        names = dir(classObject) + dir(metaclass)
+    except Exception:
+        index = static.AllNames()
+    else:
+        if metaclass is types.ClassType:
+            names.extend(_CLASSIC_CLASS_ATTRS)
+        index = attributeIndex(names)
+    _classAttributes[id(classObject)] = (classObject, index)
+    return index
+
 class Variable:
     "Class to hold all information about a variable"
 
@@ -98,7 +149,225 @@ class Variable:
 
     __repr__ = utils.std_repr
 
-class Class:
+# dict of (id(class object), config the tables depend on)
+# -> (class object, L{_ClassTables})
+_classTables = {}
+
+# dict of (code object, method argument name) -> members the method sets
+_methodMembers = {}
+
+# dict of id(function) -> (function, L{function.Function})
+_functions = {}
+
+def getFunction(func):
+    """
+    Return the L{function.Function} for a function, shared by all modules
+    the function is found in, so what checking it finds is known to all
+    of them.
+
+    @type  func: callable
+
+    @rtype: L{function.Function}
+    """
+    try:
+        return _functions[id(func)][1]
+    except KeyError:
+        pass
+    result = function.Function(func)
+    _functions[id(func)] = (func, result)
+    return result
+
+# dict of id(class object) -> (class object, list of base classes)
+_baseClasses = {}
+
+def _allBaseClasses(classObject):
+    try:
+        return _baseClasses[id(classObject)][1]
+    except KeyError:
+        pass
+
+    baseClasses = []
+    for base in getattr(classObject, '__bases__', None) or ():
+        baseClasses.append(base)
+        baseClasses.extend(_allBaseClasses(base))
+    _baseClasses[id(classObject)] = (classObject, baseClasses)
+    return baseClasses
+
+def clearTables():
+    """
+    Forget the tables built for class objects, functions and code objects,
+    which keep them alive.  To be called when modules are loaded again,
+    since the objects of the modules loaded before are then left unused.
+    """
+    _classAttributes.clear()
+    _classTables.clear()
+    _methodMembers.clear()
+    _functions.clear()
+    _baseClasses.clear()
+
+def _findMembers(func_code):
+    """
+    Find the members a method sets on the instance it is called on.
+
+    @rtype: list of (str, type or None)
+    """
+    members = []
+    instructions = OP.getInstructions(func_code)
+    stack = []
+    for position in range(len(instructions)) :
+        op = instructions.ops[position]
+        if op >= OP.HAVE_ARGUMENT :
+            oparg = instructions.opargs[position]
+            operand = instructions.operands[position]
+            if OP.LOAD_CONST(op) or OP.LOAD_FAST(op) or OP.LOAD_GLOBAL(op):
+                stack.append(operand)
+            elif OP.LOAD_DEREF(op):
+                try:
+                    operand = func_code.co_cellvars[oparg]
+                except IndexError:
+                    index = oparg - len(func_code.co_cellvars)
+                    operand = func_code.co_freevars[index]
+                stack.append(operand)
+            elif OP.STORE_ATTR(op) :
+                if len(stack) > 0 :
+                    if stack[-1] == utils.cfg().methodArgName:
+                        value = None
+                        if len(stack) > 1 :
+                            value = type(stack[-2])
+                        members.append((operand, value))
+                    stack = []
+    return members
+
+def getClassTables(classObject):
+    """
+    Return the methods and members of a class object, including the ones
+    of its base classes.  They are found once per class object and shared,
+    so they should not be changed.
+
+    @rtype: L{_ClassTables}
+    """
+    cfg = utils.cfg()
+    key = (id(classObject), cfg.onlyCheckInitForMembers, cfg.methodArgName)
+    try:
+        return _classTables[key][1]
+    except KeyError:
+        pass
+
+    tables = _ClassTables()
+    # the entries of the bases come first, so the class overrides them
+    for base in getattr(classObject, '__bases__', None) or ():
+        tables.update(getClassTables(base))
+    tables.addMethods(classObject)
+    tables.addMembers(classObject)
+    _classTables[key] = (classObject, tables)
+    return tables
+
+class _ClassTables:
+    """
+    I hold the methods and members found on a class.
+
+    @type methods:    dict of str -> None or L{Function}
+    @type members:    dict of str -> type
+    @type memberRefs: dict
+    """
+
+    def __init__(self):
+        self.methods = {}
+        self.members = {}
+        self.memberRefs = {}
+
+    def update(self, tables):
+        """
+        Add the methods and members of the given tables, replacing the ones
+        with the same name.
+
+        @type tables: L{_ClassTables}
+        """
+        self.methods.update(tables.methods)
+        self.members.update(tables.members)
+        self.memberRefs.update(tables.memberRefs)
+
+    def addMethod(self, methodName, method=None):
+        """
+        Add the given method to this class by name.
+        The name is the real name of the method, not an alias; ie the name of
+        the method as defined in the code.
+
+        @type methodName: str
+        @type method:     method or None
+        """
+        if not method:
+            self.methods[methodName] = None
+        else :
+            assert method.func_name == methodName
+            self.methods[methodName] = function.Function(method, 1)
+                 
+    def addMethods(self, classObject):
+        """
+        Add all methods for this class object to the class.
+
+        @param classObject: the class object to add methods from.
+        @type  classObject: types.ClassType (classobj)
+        """
+        for classToken in _getClassTokens(classObject):
+            token = getattr(classObject, classToken, None)
+            if token is None:
+                continue
+
+            # Looks like a method.  Need to code it this way to
+            # accommodate ExtensionClass and Python 2.2.  Yecchh.
+            if (hasattr(token, "func_code") and
+                hasattr(token.func_code, "co_argcount")): 
+                self.addMethod(token.__name__, method=token)
+
+            elif hasattr(token, '__get__') and \
+                 not hasattr(token, '__set__') and \
+                 type(token) is not types.ClassType:
+                self.addMethod(getattr(token, '__name__', classToken))
+            else:
+                self.members[classToken] = type(token)
+                self.memberRefs[classToken] = None
+
+        self.cleanupMemberRefs()
+        # add standard methods
+        for methodName in ('__class__', ):
+            self.addMethod(methodName)
+
+    def addMembers(self, classObject) :
+        if not utils.cfg().onlyCheckInitForMembers :
+            for classToken in _getClassTokens(classObject) :
+                method = getattr(classObject, classToken, None)
+                if type(method) == types.MethodType :
+                    self.addMembersFromMethod(method.im_func)
+        else:
+            try:
+                self.addMembersFromMethod(classObject.__init__.im_func)
+            except AttributeError:
+                pass
+
+    def addMembersFromMethod(self, method) :
+        if not hasattr(method, 'func_code') :
+            return
+
+        func_code = method.func_code
+        key = (func_code, utils.cfg().methodArgName)
+        members = _methodMembers.get(key)
+        if members is None:
+            members = _methodMembers[key] = _findMembers(func_code)
+        for operand, value in members:
+            self.members[operand] = value
+            self.memberRefs[operand] = None
+
+        self.cleanupMemberRefs()
+
+    def cleanupMemberRefs(self) :
+        try :
+            del self.memberRefs[Config.CHECKER_VAR]
+        except KeyError :
+            pass
+
+
+class Class(_ClassTables):
     """
     Class to hold all information about a class.
 
@@ -154,6 +423,10 @@ class Class:
         self.classObject__name__ = self.classObject.__name__
 
         self.module = sys.modules.get(modname)
+        if not self.module and utils.cfg().sourceOnly:
+            self.module = static.getModule(modname)
+        if not self.module:
+            self.module = signatures.getModule(modname)
         # if the pcmodule has moduleDir, it means we processed it before,
         # and deleted it from sys.modules
         if not self.module and pcmodule.moduleDir is None:
@@ -192,12 +465,9 @@ class Class:
     def allBaseClasses(self, c = None) :
         "Return a list of all base classes for this class and its subclasses"
 
-        baseClasses = []
         if c == None :
             c = self.classObject
-        for base in getattr(c, '__bases__', None) or ():
-            baseClasses = baseClasses + [ base ] + self.allBaseClasses(base)
-        return baseClasses
+        return _allBaseClasses(c)
 
     def __getMethodName(self, func_name, className = None) :
         if func_name[0:2] == '__' and func_name[-2:] != '__' :
@@ -208,116 +478,20 @@ class Class:
             func_name = className + func_name
         return func_name
 
-    def addMethod(self, methodName, method=None):
-        """
-        Add the given method to this class by name.
-        The name is the real name of the method, not an alias; ie the name of
-        the method as defined in the code.
-
-        @type methodName: str
-        @type method:     method or None
-        """
-        if not method:
-            self.methods[methodName] = None
-        else :
-            assert method.func_name == methodName
-            self.methods[methodName] = function.Function(method, 1)
-                 
-    def addMethods(self, classObject):
-        """
-        Add all methods for this class object to the class.
-
-        @param classObject: the class object to add methods from.
-        @type  classObject: types.ClassType (classobj)
-        """
-        for classToken in _getClassTokens(classObject):
-            token = getattr(classObject, classToken, None)
-            if token is None:
-                continue
-
-            # Looks like a method.  Need to code it this way to
-            # accommodate ExtensionClass and Python 2.2.  Yecchh.
-            if (hasattr(token, "func_code") and
-                hasattr(token.func_code, "co_argcount")): 
-                self.addMethod(token.__name__, method=token)
-
-            elif hasattr(token, '__get__') and \
-                 not hasattr(token, '__set__') and \
-                 type(token) is not types.ClassType:
-                self.addMethod(getattr(token, '__name__', classToken))
-            else:
-                self.members[classToken] = type(token)
-                self.memberRefs[classToken] = None
-
-        self.cleanupMemberRefs()
-        # add standard methods
-        for methodName in ('__class__', ):
-            self.addMethod(methodName)
-
-    def addMembers(self, classObject) :
-        if not utils.cfg().onlyCheckInitForMembers :
-            for classToken in _getClassTokens(classObject) :
-                method = getattr(classObject, classToken, None)
-                if type(method) == types.MethodType :
-                    self.addMembersFromMethod(method.im_func)
-        else:
-            try:
-                self.addMembersFromMethod(classObject.__init__.im_func)
-            except AttributeError:
-                pass
-
-    def addMembersFromMethod(self, method) :
-        if not hasattr(method, 'func_code') :
-            return
-
-        func_code, code, i, maxCode, extended_arg = OP.initFuncCode(method)
-        stack = []
-        while i < maxCode :
-            op, oparg, i, extended_arg = OP.getInfo(code, i, extended_arg)
-            if op >= OP.HAVE_ARGUMENT :
-                operand = OP.getOperand(op, func_code, oparg)
-                if OP.LOAD_CONST(op) or OP.LOAD_FAST(op) or OP.LOAD_GLOBAL(op):
-                    stack.append(operand)
-                elif OP.LOAD_DEREF(op):
-                    try:
-                        operand = func_code.co_cellvars[oparg]
-                    except IndexError:
-                        index = oparg - len(func_code.co_cellvars)
-                        operand = func_code.co_freevars[index]
-                    stack.append(operand)
-                elif OP.STORE_ATTR(op) :
-                    if len(stack) > 0 :
-                        if stack[-1] == utils.cfg().methodArgName:
-                            value = None
-                            if len(stack) > 1 :
-                                value = type(stack[-2])
-                            self.members[operand] = value
-                            self.memberRefs[operand] = None
-                        stack = []
-
-        self.cleanupMemberRefs()
-
-    def cleanupMemberRefs(self) :
-        try :
-            del self.memberRefs[Config.CHECKER_VAR]
-        except KeyError :
-            pass
-
     def abstractMethod(self, m):
         """Return 1 if method is abstract, None if not
            An abstract method always raises an exception.
         """
         if not self.methods.get(m, None):
             return None
-        funcCode, codeBytes, i, maxCode, extended_arg = \
-                   OP.initFuncCode(self.methods[m].function)
+        instructions = OP.getInstructions(self.methods[m].function.func_code)
         # abstract if the first opcode is RAISE_VARARGS and it raises
         # NotImplementedError
         arg = ""
-        while i < maxCode:
-            op, oparg, i, extended_arg = OP.getInfo(codeBytes, i, extended_arg)
+        for position in range(len(instructions)):
+            op = instructions.ops[position]
             if OP.LOAD_GLOBAL(op):
-                arg = funcCode.co_names[oparg]
+                arg = instructions.operands[position]
             elif OP.RAISE_VARARGS(op):
                 # if we saw NotImplementedError sometime before the raise
                 # assume it's related to this raise stmt
@@ -397,7 +571,7 @@ class PyCheckerModule:
         self.modules = {}
         self.imported = {}
         self.moduleLineNums = {}
-        self.attributes = [ '__dict__' ]
+        self.attributes = attributeIndex(['__dict__'])
         self.mainCode = None
         self.check = check
         # key on a combination of moduleName and moduleDir so we have separate
@@ -428,15 +602,10 @@ class PyCheckerModule:
                       for example _ = gettext.gettext will have alias _
         @type  alias: str
         """
-        self.functions[alias] = function.Function(func)
-
-    def __addAttributes(self, c, classObject) :
-        for base in getattr(classObject, '__bases__', None) or ():
-            self.__addAttributes(c, base)
-        c.addMethods(classObject)
-        c.addMembers(classObject)
+        self.functions[alias] = getFunction(func)
 
     def addClass(self, name):
+        phases.start('class setup')
         self.classes[name] = c = Class(name, self)
         try:
             objName = utils.safestr(c.classObject)
@@ -447,7 +616,8 @@ class PyCheckerModule:
             packages = string.split(objName, '.')
             c.ignoreAttrs = packages[0] in utils.cfg().blacklist
         if not c.ignoreAttrs :
-            self.__addAttributes(c, c.classObject)
+            c.update(getClassTables(c.classObject))
+        phases.stop('class setup')
 
     def addModule(self, name, alias, moduleDir=None) :
         """
@@ -460,13 +630,17 @@ class PyCheckerModule:
         if module is None :
             # not yet loaded, so load
             self.modules[alias] = module = PyCheckerModule(name, 0)
-            if imp.is_builtin(name) == 0:
+            described = signatures.getModule(name)
+            if described is not None:
+                module._initModule(described)
+            elif imp.is_builtin(name) == 0:
                 module.load()
             else :
                 # FIXME: probably should be alias ?
                 globalModule = globals().get(name)
                 if globalModule :
-                    module.attributes.extend(dir(globalModule))
+                    module.attributes = attributeIndex(
+                        module.attributes.keys() + dir(globalModule))
         else :
             self.modules[alias] = module
 
@@ -545,7 +719,11 @@ class PyCheckerModule:
 
     def _initModule(self, module):
         self.module = module
-        self.attributes = dir(self.module)
+        if static.isStub(module):
+            # nothing is known about it, so it may have any attribute
+            self.attributes = static.AllNames()
+        else:
+            self.attributes = attributeIndex(dir(self.module))
 
         # interpret module-specific suppressions
         pychecker_attr = getattr(module, Config.CHECKER_VAR, None)
@@ -583,6 +761,9 @@ class PyCheckerModule:
         return 1
 
     def setupMainCode(self):
+        if utils.cfg().sourceOnly:
+            return self._setupStaticMainCode()
+
         # FIXME: imp.find_module does not work if self.moduleName contains
         # . like when checking flumotion.twisted.credentials
         #(handle, filename, (suffix, mode, type)) = imp.find_module(self.moduleName)
@@ -613,6 +794,19 @@ class PyCheckerModule:
         self._setupMainCode(handle, filename, module)
         return module
 
+    def _setupStaticMainCode(self):
+        module = static.loadModule(self.moduleName, self.moduleDir)
+        filename = getattr(module, '__file__', None)
+        if filename is None or static.isStub(module) or \
+           _getPyFile(filename)[-3:] != '.py':
+            self.python = 0
+            return module
+
+        self.python = 1
+        filename = _getPyFile(filename)
+        self._setupMainCode(open(filename), filename, module)
+        return module
+
     def _setupMainCode(self, handle, filename, module):
         try:
             self.mainCode = function.create_from_file(handle, filename, module)
@@ -688,6 +882,18 @@ def addPCModule(pcmodule):
     global __pcmodules
     __pcmodules[(pcmodule.moduleName, pcmodule.moduleDir)] = pcmodule
 
+def removePCModule(pcmodule):
+    """
+    Forget the given module, so it gets loaded again the next time it is
+    needed.
+
+    @type  pcmodule: L{pychecker.checker.PyCheckerModule}
+    """
+    global __pcmodules
+    key = (pcmodule.moduleName, pcmodule.moduleDir)
+    if __pcmodules.get(key) is pcmodule:
+        del __pcmodules[key]
+
 def _getPCModulesDict():
     """
     Only to be used for testing.
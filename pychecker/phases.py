@@ -0,0 +1,125 @@
+# -*- Mode: Python -*-
+# vi:si:et:sw=4:sts=4:ts=4
+
+"""
+Keep track of where the time goes while checking, for --profile-phases.
+
+Time is recorded per phase (loading, checking main code, functions,
+classes, ...), per module and per bytecode dispatch handler.  A phase
+started while another one is running pauses it, so the time of each phase
+only includes the time spent in that phase itself.
+
+Nothing is recorded unless L{enable} is called.
+"""
+
+import sys
+import time
+
+from pychecker import OP
+
+enabled = 0
+
+# name -> [calls, seconds] for phases, modules and opcodes
+_phases = {}
+_modules = {}
+_opcodes = {}
+
+# stack of [phase, time the phase was started or resumed]
+_stack = []
+
+clock = time.time
+
+def enable():
+    global enabled
+    enabled = 1
+
+def disable():
+    global enabled
+    enabled = 0
+
+def reset():
+    _phases.clear()
+    _modules.clear()
+    _opcodes.clear()
+    del _stack[:]
+
+def _add(table, key, calls, seconds):
+    entry = table.get(key)
+    if entry is None:
+        table[key] = [calls, seconds]
+    else:
+        entry[0] = entry[0] + calls
+        entry[1] = entry[1] + seconds
+
+def start(phase):
+    """
+    Start timing the given phase, pausing the one currently running.
+
+    @type  phase: str
+    """
+    if not enabled:
+        return
+    now = clock()
+    if _stack:
+        running = _stack[-1]
+        _add(_phases, running[0], 0, now - running[1])
+    _add(_phases, phase, 1, 0.0)
+    _stack.append([phase, now])
+
+def stop(phase):
+    """
+    Stop timing the given phase, and resume the one it paused.
+
+    @type  phase: str
+    """
+    if not enabled:
+        return
+    now = clock()
+    # phases that were not stopped because of an exception end here too
+    while _stack:
+        running = _stack.pop()
+        _add(_phases, running[0], 0, now - running[1])
+        if running[0] == phase:
+            break
+    if _stack:
+        _stack[-1][1] = now
+
+def addModule(moduleName, seconds):
+    """
+    Record time spent on the given module.
+
+    @type  moduleName: str
+    @type  seconds:    float
+    """
+    _add(_modules, moduleName, 1, seconds)
+
+def addOpcode(op, seconds):
+    """
+    Record a call to the dispatch handler of the given opcode.
+
+    @type  op:      int
+    @type  seconds: float
+    """
+    _add(_opcodes, op, 1, seconds)
+
+def _writeTable(stream, title, table, names=None):
+    if not table:
+        return
+    items = table.items()
+    items.sort(lambda a, b: cmp(b[1][1], a[1][1]) or cmp(a[0], b[0]))
+    stream.write('\n%s:\n' % title)
+    for key, (calls, seconds) in items:
+        if names is not None:
+            key = names[key]
+        stream.write('  %-30s %10.4fs %10d calls\n' % (key, seconds, calls))
+
+def report(stream=None):
+    """
+    Write out the time recorded, most expensive first.
+    """
+    if stream is None:
+        stream = sys.stderr
+
+    _writeTable(stream, 'Time per phase', _phases)
+    _writeTable(stream, 'Time per opcode dispatch', _opcodes, OP.name)
+    _writeTable(stream, 'Time per module', _modules)
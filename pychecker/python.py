@@ -271,6 +271,19 @@ METHODLESS_OBJECTS = { types.NoneType : None, types.IntType : None,
                      }
 
 def _setupBuiltinAttrs() :
+    BUILTIN_ATTRS.update({ types.StringType : dir(''),
+                           types.TypeType : dir(type(type)),
+                           types.ListType : dir([]),
+                           types.DictType : dir({}),
+                           types.FunctionType : dir(_setupBuiltinAttrs),
+                           types.BuiltinFunctionType : dir(len),
+                           types.BuiltinMethodType : dir([].append),
+                           types.ClassType : dir(Stack.Item),
+                           types.UnboundMethodType : dir(Stack.Item.__init__),
+                           types.LambdaType : dir(lambda: None),
+                           types.SliceType : dir(slice(0)),
+                         })
+
     item = Stack.Item(None, None)
     BUILTIN_ATTRS[types.MethodType] = dir(item.__init__)
     del item
@@ -313,21 +326,25 @@ def _setupBuiltinAttrs() :
             pass
         tb = None
 
-BUILTIN_ATTRS = { types.StringType : dir(''),
-                  types.TypeType : dir(type(type)),
-                  types.ListType : dir([]),
-                  types.DictType : dir({}),
-                  types.FunctionType : dir(_setupBuiltinAttrs),
-                  types.BuiltinFunctionType : dir(len),
-                  types.BuiltinMethodType : dir([].append),
-                  types.ClassType : dir(Stack.Item),
-                  types.UnboundMethodType : dir(Stack.Item.__init__),
-                  types.LambdaType : dir(lambda: None),
-                  types.SliceType : dir(slice(0)),
-                }
-
-# have to setup the rest this way to support different versions of Python
-_setupBuiltinAttrs()
+    # look the attributes up by hash
+    for attrType, attrs in BUILTIN_ATTRS.items():
+        index = {}
+        for attr in attrs:
+            index[attr] = 1
+        BUILTIN_ATTRS[attrType] = index
+
+# type -> attribute index of builtin types, set up when first needed
+BUILTIN_ATTRS = {}
+
+def getBuiltinAttrs(attrType):
+    """
+    @returns: the attributes of a builtin type, or None if it is not one
+    @rtype:   dict of str -> int, or None
+    """
+    if not BUILTIN_ATTRS:
+        # set up this way to support different versions of Python
+        _setupBuiltinAttrs()
+    return BUILTIN_ATTRS.get(attrType)
 
 PENDING_DEPRECATED_MODULES = { 'string': None, 'types': None,
                              }
@@ -0,0 +1,515 @@
+# -*- Mode: Python -*-
+# vi:si:et:sw=4:sts=4:ts=4
+
+"""
+A database of the signatures of library modules, so the modules a checked
+module depends on can be described without importing them.
+
+For each module the database holds its attributes, the arguments of its
+functions and the methods and members of its classes.  It is written by
+L{generate} (see scripts/signatures.py) and read when the signatures
+option names it.  A module found in it is served by L{getModule} as a
+namespace of stand-ins: functions with the real arguments and an empty
+body, and classes with the real attribute names, so pychecker can check
+calls and attribute accesses against them as it does against the real
+module.
+"""
+
+import os
+import sys
+import imp
+import types
+import marshal
+import __builtin__
+import exceptions
+
+from pychecker import utils
+from pychecker import static
+
+# bump this when the format of the database changes
+_FORMAT = 1
+
+_CO_OPTIMIZED = 0x1
+_CO_NEWLOCALS = 0x2
+_CO_VARARGS = 0x4
+_CO_VARKEYWORDS = 0x8
+
+# LOAD_CONST None; RETURN_VALUE, with the opcodes of OP.LOAD_CONST and
+# OP.RETURN_VALUE
+_STUB_CODE = chr(100) + '\0\0' + chr(83)
+
+# kinds of methods
+_METHOD, _STATIC, _CLASS, _BUILTIN = range(4)
+
+# modules whose classes are always there, so they are never described
+_BUILTIN_MODULES = { '__builtin__': __builtin__, 'exceptions': exceptions }
+
+# names the class statement sets, or that can not be set in a class body
+_SKIPPED_CLASS_NAMES = { '__dict__': 1, '__weakref__': 1, '__module__': 1,
+                         '__doc__': 1, '__slots__': 1, '__metaclass__': 1,
+                         '__class__': 1, '__bases__': 1, '__name__': 1,
+                         '__mro__': 1, }
+
+# modules that do something when imported, and packages of tests
+_SKIPPED_MODULES = { 'this': 1, 'antigravity': 1, '__main__': 1,
+                     '__phello__': 1, 'test': 1, 'tests': 1, 'idlelib': 1,
+                     'site-packages': 1, 'dist-packages': 1, }
+
+# type name -> value of that type, for the variables of a module
+_SAMPLES = {}
+for _value in (0, 0L, 0.0, 0j, '', u'', (), [], {}, len, 1 == 1):
+    _SAMPLES[type(_value).__name__] = _value
+del _value
+
+# filename -> (stamp, database) of the databases read
+_databases = {}
+# (filename, module name) -> description read from the database
+_descriptions = {}
+# (filename, module name) -> module built from the database
+_namespaces = {}
+# (filename, (module name, class name)) -> class built from the database,
+# or None while it is built
+_classes = {}
+# id -> code object of the functions built
+_stubCodes = {}
+
+def reset():
+    _databases.clear()
+    _descriptions.clear()
+    _namespaces.clear()
+    _classes.clear()
+    _stubCodes.clear()
+
+def isStub(function):
+    """
+    @returns: whether the function was built from the database, so it has
+              the real arguments but not the real code
+    @rtype:   int (used as bool)
+    """
+    code = getattr(function, 'func_code', None)
+    return code is not None and _stubCodes.get(id(code)) is code
+
+def stamp(filename):
+    """
+    @returns: what changes when the database is written again
+    """
+    try:
+        info = os.stat(filename)
+    except OSError:
+        return None
+    return info.st_mtime, info.st_size
+
+
+def _constant(value):
+    "the value if it can be stored in the database, otherwise None"
+    if type(value) is types.TupleType:
+        return tuple(map(_constant, value))
+    if type(value) in (types.NoneType, types.IntType, types.LongType,
+                       types.FloatType, types.ComplexType, types.StringType,
+                       types.UnicodeType, type(1 == 1)):
+        return value
+    return None
+
+def _describeFunction(function):
+    """
+    @returns: (name, argument count, argument names, flags, defaults,
+               filename, first line, whether it has a doc string)
+    @rtype:   tuple
+    """
+    code = function.func_code
+    flags = code.co_flags & (_CO_VARARGS | _CO_VARKEYWORDS)
+    count = code.co_argcount
+    if flags & _CO_VARARGS:
+        count = count + 1
+    if flags & _CO_VARKEYWORDS:
+        count = count + 1
+    defaults = tuple(map(_constant, function.func_defaults or ()))
+    return (function.func_name, code.co_argcount, code.co_varnames[:count],
+            flags, defaults, intern(code.co_filename), code.co_firstlineno,
+            int(function.__doc__ is not None))
+
+def _classRef(classObject):
+    return (getattr(classObject, '__module__', None), classObject.__name__)
+
+def _describeClass(classObject):
+    """
+    @returns: (module and name, module and name of the bases, whether it
+               is a new-style class, whether it is an exception, whether it
+               has every attribute, whether it has a doc string, methods,
+               members)
+    @rtype:   tuple
+    """
+    from pychecker import pcmodules
+
+    methods = {}
+    members = {}
+    # walk the bases in the order their attributes are found; the
+    # attributes of builtin bases are found on the real bases
+    for klass in [classObject] + pcmodules._allBaseClasses(classObject):
+        if _BUILTIN_MODULES.has_key(getattr(klass, '__module__', None)):
+            continue
+        for name, value in klass.__dict__.items():
+            if _SKIPPED_CLASS_NAMES.has_key(name) or \
+               methods.has_key(name) or members.has_key(name):
+                continue
+            if isinstance(value, staticmethod):
+                value = value.__get__(None, classObject)
+                if isinstance(value, types.FunctionType):
+                    methods[name] = (_STATIC, _describeFunction(value))
+                    continue
+            elif isinstance(value, classmethod):
+                value = value.__get__(None, classObject).im_func
+                if isinstance(value, types.FunctionType):
+                    methods[name] = (_CLASS, _describeFunction(value))
+                    continue
+            elif isinstance(value, types.FunctionType):
+                methods[name] = (_METHOD, _describeFunction(value))
+                continue
+
+            if hasattr(value, '__get__') and not hasattr(value, '__set__') \
+               and callable(value) and not isinstance(value, types.ClassType) \
+               and not isinstance(value, type):
+                methods[name] = (_BUILTIN, None)
+            else:
+                members[name] = type(value).__name__
+
+    # members set on instances
+    tables = pcmodules.getClassTables(classObject)
+    for name, memberType in tables.members.items():
+        if not methods.has_key(name) and not members.has_key(name) and \
+           not _SKIPPED_CLASS_NAMES.has_key(name):
+            members[name] = getattr(memberType, '__name__', '')
+
+    try:
+        isException = issubclass(classObject, Exception)
+    except TypeError:
+        isException = 0
+    anyAttribute = isinstance(pcmodules.getClassAttributes(classObject),
+                              static.AllNames)
+    return (_classRef(classObject),
+            tuple(map(_classRef, getattr(classObject, '__bases__', ()))),
+            int(isinstance(classObject, type)), int(isException),
+            int(anyAttribute), int(classObject.__doc__ is not None),
+            methods, members)
+
+def describe(module, names=None):
+    """
+    Describe a module, like the PyCheckerModule for it does.
+
+    @param names: the names of all modules described; classes defined in
+                  one of them are only described there
+    @type  names: dict of str -> int
+
+    @rtype: dict
+    """
+    from pychecker import pcmodules
+
+    if names is None:
+        names = {}
+    name = module.__name__
+    description = { 'file': getattr(module, '__file__', None),
+                    'path': getattr(module, '__path__', None),
+                    'modules': {}, 'functions': {}, 'classes': {},
+                    'variables': {} }
+    if description['path'] is not None:
+        description['path'] = tuple(description['path'])
+    for tokenName in pcmodules._getModuleTokens(module):
+        if pcmodules.EVIL_C_OBJECTS.has_key('%s.%s' % (name, tokenName)):
+            continue
+        token = getattr(module, tokenName)
+        if isinstance(token, types.ModuleType):
+            description['modules'][tokenName] = token.__name__
+        elif isinstance(token, types.FunctionType):
+            description['functions'][tokenName] = _describeFunction(token)
+        elif isinstance(token, types.ClassType) or \
+             hasattr(token, '__bases__') and issubclass(type(token), type):
+            home, className = ref = _classRef(token)
+            if home != name and (names.has_key(home) or
+                                 _BUILTIN_MODULES.has_key(home)) and \
+               getattr(sys.modules.get(home), className, None) is token:
+                description['classes'][tokenName] = ref
+            else:
+                description['classes'][tokenName] = _describeClass(token)
+        else:
+            description['variables'][tokenName] = type(token).__name__
+    return description
+
+def stdlibModules():
+    """
+    @returns: the names of the builtin modules and of the modules and
+              packages in the standard library
+    @rtype:   list of str
+    """
+    names = {}
+    for name in sys.builtin_module_names:
+        names[name] = 1
+    suffixes = {}
+    for suffix, mode, kind in imp.get_suffixes():
+        suffixes[suffix] = 1
+
+    def walk(directory, prefix):
+        try:
+            entries = os.listdir(directory)
+        except OSError:
+            return
+        for entry in entries:
+            base, suffix = os.path.splitext(entry)
+            path = os.path.join(directory, entry)
+            if _SKIPPED_MODULES.has_key(base) or '-' in base or '.' in base:
+                continue
+            if suffixes.has_key(suffix):
+                if base != '__init__':
+                    names[prefix + base] = 1
+            elif not suffix and \
+                 os.path.exists(os.path.join(path, '__init__.py')):
+                names[prefix + base] = 1
+                walk(path, prefix + base + '.')
+
+    for directory in sys.path:
+        if directory and static._isStandard(os.path.join(directory, 'x')):
+            walk(directory, '')
+    names = names.keys()
+    names.sort()
+    return names
+
+def generate(names, filename):
+    """
+    Import the given modules and write the database describing them.
+
+    @type  names: list of str
+
+    @returns: the names of the modules that could not be imported
+    @rtype:   list of str
+    """
+    from pychecker import Config
+
+    index = {}
+    for name in names:
+        index[name] = 1
+
+    failed = []
+    modules = {}
+    utils.initConfig(Config.Config())
+    try:
+        for name in names:
+            try:
+                __import__(name)
+                module = sys.modules[name]
+                # each module is read only when it is used
+                modules[name] = marshal.dumps(describe(module, index))
+            except KeyboardInterrupt:
+                raise
+            except (Exception, SystemExit):
+                # some modules exit when they can't be used here
+                failed.append(name)
+    finally:
+        utils.popConfig()
+
+    handle = open(filename, 'wb')
+    try:
+        marshal.dump({ 'format': _FORMAT, 'python': sys.hexversion >> 16,
+                       'modules': modules }, handle)
+    finally:
+        handle.close()
+    return failed
+
+
+def _database(filename):
+    """
+    @returns: the modules described in the database, each still
+              marshalled, or an empty dict if it can not be used
+    @rtype:   dict of str -> str
+    """
+    current = stamp(filename)
+    entry = _databases.get(filename)
+    if entry is not None and entry[0] == current:
+        return entry[1]
+
+    modules = {}
+    try:
+        handle = open(filename, 'rb')
+        try:
+            database = marshal.load(handle)
+        finally:
+            handle.close()
+    except (IOError, EOFError, ValueError, TypeError), e:
+        sys.stderr.write("warning: couldn't read signatures from %s: %s\n"
+                         % (filename, e))
+    else:
+        if database.get('format') != _FORMAT or \
+           database.get('python') != sys.hexversion >> 16:
+            sys.stderr.write("warning: signatures in %s were not written "
+                             "by this version of python and pychecker\n"
+                             % filename)
+        else:
+            modules = database['modules']
+    # the modules built from an older database are stale
+    for registry in (_descriptions, _namespaces, _classes):
+        for key in registry.keys():
+            if key[0] == filename:
+                del registry[key]
+    _databases[filename] = (current, modules)
+    return modules
+
+def _description(filename, modules, name):
+    key = (filename, name)
+    try:
+        return _descriptions[key]
+    except KeyError:
+        pass
+    description = modules.get(name)
+    if description is not None:
+        description = marshal.loads(description)
+    _descriptions[key] = description
+    return description
+
+def getModule(name):
+    """
+    @returns: the module with the given name built from the database
+              configured, or None
+    @rtype:   module
+    """
+    filename = utils.cfg().signatures
+    if not filename:
+        return None
+    return _module(filename, _database(filename), name)
+
+def _function(description, namespace):
+    (name, argcount, varnames, flags, defaults, filename, firstlineno,
+     hasDoc) = description
+    code = types.CodeType(argcount, len(varnames), 1,
+                          flags | _CO_OPTIMIZED | _CO_NEWLOCALS, _STUB_CODE,
+                          (None, ), (), varnames, filename, name,
+                          firstlineno, '')
+    _stubCodes[id(code)] = code
+    function = types.FunctionType(code, namespace, name, defaults or None)
+    if hasDoc:
+        function.__doc__ = ''
+    return function
+
+class _BuiltinMethod(object):
+    "stands in for the methods of builtin classes"
+
+    def __init__(self, name):
+        self.__name__ = name
+
+    def __get__(self, obj, type=None):
+        return self
+
+    def __call__(self, *args, **kwargs):
+        return None
+
+def _module(filename, modules, name):
+    try:
+        return _namespaces[(filename, name)]
+    except KeyError:
+        pass
+    description = _description(filename, modules, name)
+    if description is None:
+        return None
+
+    module = imp.new_module(name)
+    if description['file'] is not None:
+        module.__file__ = description['file']
+        module.__builtins__ = __builtin__.__dict__
+    if description['path'] is not None:
+        module.__path__ = list(description['path'])
+    # register it before filling it, so modules importing each other work
+    _namespaces[(filename, name)] = module
+
+    namespace = module.__dict__
+    for alias, realName in description['modules'].items():
+        namespace[alias] = _module(filename, modules, realName) or \
+                           static.UNKNOWN
+    for alias, function in description['functions'].items():
+        namespace[alias] = _function(function, namespace)
+    for alias, classDescription in description['classes'].items():
+        if len(classDescription) == 2:
+            classObject = _classByRef(filename, modules, classDescription)
+        else:
+            classObject = _class(filename, modules, classDescription)
+        namespace[alias] = classObject or static.UNKNOWN
+    for alias, typeName in description['variables'].items():
+        if typeName == 'NoneType':
+            namespace[alias] = None
+        else:
+            namespace[alias] = _SAMPLES.get(typeName, static.UNKNOWN)
+    return module
+
+def _classByRef(filename, modules, ref):
+    home, className = ref
+    if _BUILTIN_MODULES.has_key(home):
+        return getattr(_BUILTIN_MODULES[home], className, None)
+    try:
+        return _classes[(filename, ref)]
+    except KeyError:
+        pass
+    description = _description(filename, modules, home)
+    if description is None:
+        return None
+    classDescription = description['classes'].get(className)
+    if classDescription is None or len(classDescription) == 2:
+        return None
+    return _class(filename, modules, classDescription)
+
+def _class(filename, modules, description):
+    (ref, baseRefs, newStyle, isException, anyAttribute, hasDoc,
+     methods, members) = description
+    try:
+        return _classes[(filename, ref)]
+    except KeyError:
+        pass
+
+    # a class can have a base with the same name, so while its bases are
+    # built it stands for itself as None
+    _classes[(filename, ref)] = None
+    bases = []
+    for baseRef in baseRefs:
+        base = _classByRef(filename, modules, baseRef)
+        if base is not None:
+            bases.append(base)
+            if isinstance(base, type):
+                newStyle = 1
+    if isException:
+        for base in bases:
+            if issubclass(base, Exception):
+                break
+        else:
+            bases.append(Exception)
+            newStyle = isinstance(Exception, type)
+
+    namespace = { '__module__': ref[0] }
+    if hasDoc:
+        namespace['__doc__'] = ''
+    for name, typeName in members.items():
+        if typeName == 'NoneType':
+            namespace[name] = static.UNKNOWN
+        else:
+            namespace[name] = _SAMPLES.get(typeName, static.UNKNOWN)
+    for name, (kind, function) in methods.items():
+        if kind == _BUILTIN:
+            namespace[name] = _BuiltinMethod(name)
+            continue
+        function = _function(function, {})
+        if kind == _STATIC:
+            function = staticmethod(function)
+        elif kind == _CLASS:
+            function = classmethod(function)
+        namespace[name] = function
+
+    if anyAttribute:
+        metaclass = static._AnyAttribute
+        newStyle = 1
+    elif newStyle:
+        metaclass = type
+    else:
+        metaclass = types.ClassType
+    if newStyle and not bases:
+        bases = [object]
+    try:
+        classObject = metaclass(ref[1], tuple(bases), namespace)
+    except TypeError:
+        # the builtin bases can not be combined without their real layout
+        classObject = metaclass(ref[1], tuple(bases[:1]), namespace)
+    _classes[(filename, ref)] = classObject
+    return classObject
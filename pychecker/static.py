@@ -0,0 +1,656 @@
+# -*- Mode: Python -*-
+# vi:si:et:sw=4:sts=4:ts=4
+
+"""
+Load modules without running them, for --sourceonly.
+
+The source of a module is compiled, and the bytecode at module and class
+level is walked to find out what the names in the module are bound to.
+Nothing is executed: functions are created from their code objects,
+classes are created from the names bound in their bodies, and modules
+that are imported are loaded the same way.  Values that can only be known
+by running the code (results of calls, arithmetic, ...) are represented
+by L{UNKNOWN}.
+
+Modules from the standard library and builtin modules are imported for
+real.  Extension modules and modules that can not be found are replaced
+by stubs, which are assumed to have every attribute.
+"""
+
+import os
+import sys
+import imp
+import types
+import string
+import __builtin__
+
+from pychecker import OP
+from pychecker import moduleindex
+
+class _Unknown:
+    "a value that is only known when the code is run"
+
+    def __repr__(self):
+        return '<unknown>'
+
+UNKNOWN = _Unknown()
+
+class _AnyAttribute(type):
+    "metaclass of classes which have every attribute"
+
+    def __getattr__(cls, name):
+        if name[:2] == '__' and name[-2:] == '__':
+            raise AttributeError, name
+        return UNKNOWN
+
+class UnknownBase(object):
+    """
+    Stands in for base classes that are not known without running the code,
+    so their subclasses are not reported to lack attributes.
+    """
+    __metaclass__ = _AnyAttribute
+
+class AllNames(list):
+    "the attributes of a module nothing is known about: all of them"
+
+    def __contains__(self, name):
+        return 1
+
+class _Call:
+    "the result of calling something; resolved when it is bound to a name"
+
+    def __init__(self, function, args, kwargs):
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+
+# filename of the source -> (name, stamp, module) of modules loaded
+_modules = {}
+# module name -> module, for all modules loaded or stubbed
+_byName = {}
+# id -> object of stub modules and of the classes created
+_stubs = {}
+_created = {}
+
+_STANDARD = os.path.normcase(os.path.dirname(os.path.abspath(os.__file__)))
+
+def reset():
+    _modules.clear()
+    _byName.clear()
+    _stubs.clear()
+    _created.clear()
+
+def isStub(module):
+    """
+    @returns: whether the module is a stub for a module that was not loaded
+    @rtype:   int (used as bool)
+    """
+    return _stubs.get(id(module)) is module
+
+def getModule(name):
+    """
+    @returns: the module loaded with the given name, or None
+    @rtype:   module
+    """
+    return _byName.get(name)
+
+def _isStandard(filename):
+    filename = os.path.normcase(os.path.abspath(filename))
+    if filename[:len(_STANDARD) + 1] != _STANDARD + os.sep:
+        return 0
+    return filename.find('site-packages') < 0 and \
+           filename.find('dist-packages') < 0
+
+def _stamp(filename):
+    try:
+        info = os.stat(filename)
+    except OSError:
+        return None
+    return info.st_mtime, info.st_size
+
+def _stub(name, filename):
+    module = _byName.get(name)
+    if module is not None and isStub(module):
+        return module
+    module = imp.new_module(name)
+    if filename is not None:
+        module.__file__ = filename
+    _stubs[id(module)] = module
+    _byName[name] = module
+    return module
+
+def _importReal(name):
+    try:
+        __import__(name)
+        return sys.modules[name]
+    except (KeyboardInterrupt, SystemExit):
+        raise
+    except Exception:
+        return _stub(name, None)
+
+def loadModule(name, moduleDir=None):
+    """
+    Load the given module, and the packages it is in, without running them.
+
+    @param moduleDir: the directory to look in before sys.path; if given,
+                      the module is loaded from its source even if a module
+                      with the same name was imported already, and
+                      ImportError is raised if it can't be found or compiled
+    @type  moduleDir: str
+
+    @rtype: module
+    """
+    if moduleDir is None and sys.modules.has_key(name):
+        return sys.modules[name]
+
+    path = sys.path[:]
+    if moduleDir is not None:
+        path.insert(0, moduleDir)
+    parts = string.split(name, '.')
+    module = None
+    for index in range(len(parts)):
+        fullname = string.join(parts[:index + 1], '.')
+        if index > 0:
+            path = getattr(module, '__path__', None)
+            if path is None:
+                if moduleDir is not None:
+                    raise ImportError, 'No module named %s' % name
+                return _stub(name, None)
+        module = _loadOne(fullname, parts[index], path, moduleDir is not None)
+    return module
+
+def _loadOne(fullname, part, path, required):
+    if not required:
+        module = sys.modules.get(fullname) or _byName.get(fullname)
+        if module is not None:
+            return module
+        # signatures builds its modules from ours, so it imports us
+        from pychecker import signatures
+        module = signatures.getModule(fullname)
+        if module is not None:
+            return module
+    if imp.is_builtin(fullname):
+        return _importReal(fullname)
+
+    try:
+        handle, filename, (suffix, mode, kind) = moduleindex.find(part, path)
+    except ImportError:
+        if required:
+            raise
+        return _stub(fullname, None)
+    if handle is not None:
+        handle.close()
+
+    packageDir = None
+    if kind == imp.PKG_DIRECTORY:
+        packageDir = filename
+        filename = os.path.join(filename, '__init__.py')
+        if not os.path.exists(filename):
+            return _stub(fullname, packageDir)
+    elif kind != imp.PY_SOURCE:
+        if _isStandard(filename):
+            return _importReal(fullname)
+        return _stub(fullname, filename)
+
+    if _isStandard(filename) and not required:
+        return _importReal(fullname)
+
+    try:
+        return _loadSource(fullname, filename, packageDir)
+    except (KeyboardInterrupt, SystemExit):
+        raise
+    except Exception:
+        if required:
+            raise
+        return _stub(fullname, filename)
+
+def _loadSource(name, filename, packageDir):
+    stamp = _stamp(filename)
+    entry = _modules.get(filename)
+    if entry is not None and entry[0] == name and entry[1] == stamp:
+        _byName[name] = entry[2]
+        return entry[2]
+
+    handle = open(filename)
+    try:
+        source = handle.read()
+    finally:
+        handle.close()
+    # like function.create_from_file
+    source = string.replace(source, "\r\n", "\n")
+    source = string.replace(source, "\r", "\n")
+    if source and source[-1] != '\n':
+        source = source + '\n'
+    code = compile(source, filename, 'exec')
+
+    module = imp.new_module(name)
+    module.__file__ = filename
+    module.__builtins__ = __builtin__.__dict__
+    if packageDir is not None:
+        module.__path__ = [packageDir]
+    # register it before walking it, so circular imports find it
+    _modules[filename] = (name, stamp, module)
+    _byName[name] = module
+    _walk(code, module.__dict__, module)
+    return module
+
+
+def _lookup(name, namespace, module):
+    for names in (namespace, module.__dict__, __builtin__.__dict__):
+        if names.has_key(name):
+            return names[name]
+    return UNKNOWN
+
+def _getattr(value, name):
+    if value is UNKNOWN or isinstance(value, _Call):
+        return UNKNOWN
+    try:
+        return getattr(value, name)
+    except (KeyboardInterrupt, SystemExit):
+        raise
+    except Exception:
+        return UNKNOWN
+
+def _resolve(value):
+    """
+    Turn what is on the stack into the value bound to a name.
+    """
+    if not isinstance(value, _Call):
+        return value
+
+    function = _resolve(value.function)
+    args = map(_resolve, value.args)
+    if function in (staticmethod, classmethod, property):
+        kwargs = {}
+        for key, item in value.kwargs.items():
+            kwargs[key] = _resolve(item)
+        try:
+            return apply(function, args, kwargs)
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception:
+            return UNKNOWN
+
+    # anything else called with just a function is taken to be a
+    # decorator returning the function
+    if len(args) == 1 and not value.kwargs and \
+       isinstance(args[0], types.FunctionType) and \
+       not isinstance(function, (types.ClassType, type)):
+        return args[0]
+    return UNKNOWN
+
+def _bind(namespace, name, value):
+    value = _resolve(value)
+    # keep what is known about a name over what isn't, like a module
+    # imported over a fallback that can't be found, or a builtin over
+    # the exception bound in an except clause
+    if namespace.has_key(name) and namespace[name] is not UNKNOWN and \
+       (value is UNKNOWN or isStub(value)):
+        return
+    if value is UNKNOWN and __builtin__.__dict__.has_key(name):
+        return
+    namespace[name] = value
+
+def _metaclass(namespace, bases, module):
+    metaclass = namespace.get('__metaclass__')
+    if metaclass is None:
+        if bases:
+            metaclass = type(bases[0])
+        else:
+            metaclass = module.__dict__.get('__metaclass__', types.ClassType)
+    if metaclass is types.ClassType:
+        return metaclass
+    if not isinstance(metaclass, type) or not issubclass(metaclass, type):
+        return type
+    # never run the code of a metaclass defined in the source checked
+    for metaclass in metaclass.__mro__:
+        if not _created.has_key(id(metaclass)):
+            return metaclass
+    return type
+
+def _makeClass(name, bases, body, module):
+    if not isinstance(body, _Call) or \
+       not isinstance(body.function, types.FunctionType) or \
+       type(name) is not types.StringType:
+        return UNKNOWN
+
+    namespace = {}
+    _walk(body.function.func_code, namespace, module)
+
+    if type(bases) is not types.TupleType:
+        bases = (UNKNOWN,)
+    known = []
+    for base in bases:
+        base = _resolve(base)
+        if not isinstance(base, (types.ClassType, type)):
+            base = UnknownBase
+        if base not in known:
+            known.append(base)
+
+    try:
+        c = _metaclass(namespace, known, module)(name, tuple(known), namespace)
+    except (KeyboardInterrupt, SystemExit):
+        raise
+    except Exception:
+        # conflicting bases or metaclasses, bad __slots__, ...
+        if namespace.has_key('__slots__'):
+            del namespace['__slots__']
+        try:
+            c = type(name, (UnknownBase,), namespace)
+        except TypeError:
+            return UNKNOWN
+    _created[id(c)] = c
+    return c
+
+def _makeFunction(code, defaults, closure, module):
+    if type(code) is not types.CodeType:
+        return UNKNOWN
+    if closure is not None:
+        # the cells are never read; they only have to be there
+        closure = tuple(map(_cell, code.co_freevars))
+    return types.FunctionType(code, module.__dict__, code.co_name,
+                              tuple(map(_resolve, defaults)) or None, closure)
+
+def _cell(unused_name):
+    value = None
+    return (lambda: value).func_closure[0]
+
+def _importName(name, fromlist, level, module):
+    """
+    @returns: what an IMPORT_NAME instruction in module pushes
+    """
+    if type(name) is not types.StringType:
+        return UNKNOWN
+
+    relative = 0
+    package = module.__name__
+    if not hasattr(module, '__path__'):
+        package = string.join(string.split(package, '.')[:-1], '.')
+    if level > 0:
+        # explicit relative import
+        parts = string.split(package, '.')
+        if level > 1:
+            parts = parts[:-(level - 1)]
+        package = string.join(parts, '.')
+        name = string.join(filter(None, [package, name]), '.')
+        relative = 1
+    elif level < 0 and package:
+        # implicit relative import, if there is such a module in the package
+        parent = _byName.get(package) or sys.modules.get(package)
+        first = string.split(name, '.')[0]
+        try:
+            handle, filename, smt = moduleindex.find(first,
+                getattr(parent, '__path__', None) or [])
+        except ImportError:
+            pass
+        else:
+            if handle is not None:
+                handle.close()
+            name = package + '.' + name
+            relative = 1
+
+    parts = string.split(name, '.')
+    start = 0
+    if relative:
+        start = len(string.split(package, '.'))
+    top = None
+    parent = None
+    for index in range(len(parts)):
+        fullname = string.join(parts[:index + 1], '.')
+        current = loadModule(fullname)
+        if parent is not None and _isLoaded(parent):
+            setattr(parent, parts[index], current)
+        if index == start:
+            top = current
+        parent = current
+    if fromlist:
+        return parent
+    return top
+
+def _isLoaded(module):
+    entry = _modules.get(getattr(module, '__file__', None))
+    return entry is not None and entry[2] is module
+
+def _importFrom(module, name):
+    if module is UNKNOWN:
+        return UNKNOWN
+    if hasattr(module, name):
+        return getattr(module, name)
+    if hasattr(module, '__path__'):
+        return loadModule(module.__name__ + '.' + name)
+    return UNKNOWN
+
+def _importStar(module, namespace):
+    if module is UNKNOWN:
+        return
+    names = getattr(module, '__all__', None)
+    if type(names) not in (types.ListType, types.TupleType):
+        names = filter(lambda name: name[:1] != '_', dir(module))
+    for name in names:
+        if type(name) is types.StringType and hasattr(module, name):
+            namespace[name] = getattr(module, name)
+
+_SIMPLE_TYPES = (types.StringType, types.UnicodeType, types.IntType,
+                 types.LongType, types.FloatType, types.TupleType,
+                 types.NoneType)
+
+def _compare(operation, left, right):
+    "@returns: the result of the comparison if it can be known, else UNKNOWN"
+    if not isinstance(left, _SIMPLE_TYPES) or \
+       not isinstance(right, _SIMPLE_TYPES):
+        return UNKNOWN
+    try:
+        if operation == '==':
+            return left == right
+        elif operation == '!=':
+            return left != right
+        elif operation == '<':
+            return left < right
+        elif operation == '<=':
+            return left <= right
+        elif operation == '>':
+            return left > right
+        elif operation == '>=':
+            return left >= right
+    except TypeError:
+        pass
+    return UNKNOWN
+
+# number of values popped by instructions which push nothing back
+_POPS = {
+    'POP_TOP': 1, 'PRINT_EXPR': 1, 'PRINT_ITEM': 1, 'PRINT_ITEM_TO': 2,
+    'PRINT_NEWLINE_TO': 1, 'STORE_SUBSCR': 3, 'DELETE_SUBSCR': 2,
+    'STORE_SLICE+0': 2, 'STORE_SLICE+1': 3, 'STORE_SLICE+2': 3,
+    'STORE_SLICE+3': 4, 'DELETE_SLICE+0': 1, 'DELETE_SLICE+1': 2,
+    'DELETE_SLICE+2': 2, 'DELETE_SLICE+3': 3, 'DELETE_ATTR': 1,
+    'EXEC_STMT': 3, 'LIST_APPEND': 1, 'SET_ADD': 1, 'MAP_ADD': 2,
+    'WITH_CLEANUP': 1, 'PRINT_NEWLINE': 0, 'NOP': 0, 'POP_BLOCK': 0,
+    'SETUP_LOOP': 0, 'SETUP_EXCEPT': 0, 'SETUP_FINALLY': 0,
+    'BREAK_LOOP': 0, 'CONTINUE_LOOP': 0, 'EXTENDED_ARG': 0,
+}
+
+# number of values popped by instructions which push one unknown value
+_UNKNOWN_RESULT = {
+    'UNARY_POSITIVE': 1, 'UNARY_NEGATIVE': 1, 'UNARY_NOT': 1,
+    'UNARY_CONVERT': 1, 'UNARY_INVERT': 1, 'GET_ITER': 1,
+    'BINARY_SUBSCR': 2, 'SLICE+0': 1, 'SLICE+1': 2, 'SLICE+2': 2,
+    'SLICE+3': 3, 'LOAD_LOCALS': 0, 'LOAD_CLOSURE': 0, 'LOAD_DEREF': 0,
+    'LOAD_FAST': 0,
+}
+
+def _walk(code, namespace, module):
+    """
+    Bind the names code binds in namespace, without running it.
+
+    The instructions are followed in order, except that a conditional
+    jump is taken when the condition is a comparison of constants (as in
+    if __name__ == '__main__').  Loops are walked once.
+    """
+    instructions = OP.getInstructions(code)
+    stack = []
+    def pop(count=1):
+        if count == 0:
+            return []
+        values = stack[-count:]
+        del stack[-count:]
+        return [UNKNOWN] * (count - len(values)) + values
+
+    position = 0
+    while position < len(instructions):
+        op = instructions.ops[position]
+        oparg = instructions.opargs[position]
+        operand = instructions.operands[position]
+        name = OP.name[op]
+        position = position + 1
+
+        if _POPS.has_key(name):
+            pop(_POPS[name])
+        elif _UNKNOWN_RESULT.has_key(name):
+            pop(_UNKNOWN_RESULT[name])
+            stack.append(UNKNOWN)
+        elif name[:7] == 'BINARY_' or name[:8] == 'INPLACE_':
+            pop(2)
+            stack.append(UNKNOWN)
+        elif name == 'LOAD_CONST':
+            stack.append(operand)
+        elif name in ('LOAD_NAME', 'LOAD_GLOBAL'):
+            if name == 'LOAD_GLOBAL':
+                stack.append(_lookup(operand, module.__dict__, module))
+            else:
+                stack.append(_lookup(operand, namespace, module))
+        elif name == 'LOAD_ATTR':
+            stack.append(_getattr(pop()[0], operand))
+        elif name == 'STORE_NAME':
+            _bind(namespace, operand, pop()[0])
+        elif name == 'STORE_GLOBAL':
+            _bind(module.__dict__, operand, pop()[0])
+        elif name in ('DELETE_NAME', 'DELETE_GLOBAL'):
+            names = namespace
+            if name == 'DELETE_GLOBAL':
+                names = module.__dict__
+            if names.has_key(operand):
+                del names[operand]
+        elif name == 'STORE_ATTR':
+            target, value = pop(2)
+            if _created.has_key(id(target)) or _isLoaded(target):
+                try:
+                    setattr(target, operand, _resolve(value))
+                except (TypeError, AttributeError):
+                    pass
+        elif name == 'ROT_TWO':
+            values = pop(2)
+            stack.extend([values[1], values[0]])
+        elif name == 'ROT_THREE':
+            values = pop(3)
+            stack.extend([values[2], values[0], values[1]])
+        elif name == 'ROT_FOUR':
+            values = pop(4)
+            stack.extend([values[3], values[0], values[1], values[2]])
+        elif name == 'DUP_TOP':
+            value = pop()[0]
+            stack.extend([value, value])
+        elif name == 'DUP_TOPX':
+            values = pop(oparg)
+            stack.extend(values + values)
+        elif name in ('BUILD_TUPLE', 'BUILD_LIST', 'BUILD_SET'):
+            values = pop(oparg)
+            if name == 'BUILD_TUPLE':
+                stack.append(tuple(values))
+            elif name == 'BUILD_LIST':
+                stack.append(values)
+            else:
+                try:
+                    stack.append(set(values))
+                except (NameError, TypeError):
+                    stack.append(UNKNOWN)
+        elif name == 'BUILD_MAP':
+            stack.append({})
+        elif name == 'STORE_MAP':
+            value, key = pop(2)
+            if stack and type(stack[-1]) is types.DictType:
+                try:
+                    stack[-1][key] = _resolve(value)
+                except TypeError:
+                    pass
+        elif name == 'BUILD_SLICE':
+            pop(oparg)
+            stack.append(UNKNOWN)
+        elif name == 'UNPACK_SEQUENCE':
+            value = pop()[0]
+            if type(value) in (types.TupleType, types.ListType) and \
+               len(value) == oparg:
+                values = list(value)
+                values.reverse()
+                stack.extend(values)
+            else:
+                stack.extend([UNKNOWN] * oparg)
+        elif name == 'COMPARE_OP':
+            left, right = pop(2)
+            stack.append(_compare(operand, left, right))
+        elif name in ('POP_JUMP_IF_FALSE', 'POP_JUMP_IF_TRUE'):
+            value = pop()[0]
+            target = instructions.positions.get(instructions.label(position - 1))
+            if isinstance(value, _SIMPLE_TYPES) and target is not None and \
+               target > position and \
+               (not value) == (name == 'POP_JUMP_IF_FALSE'):
+                position = target
+        elif name in ('JUMP_IF_FALSE_OR_POP', 'JUMP_IF_TRUE_OR_POP'):
+            pop()
+        elif name in ('JUMP_FORWARD', 'JUMP_ABSOLUTE'):
+            target = instructions.positions.get(instructions.label(position - 1))
+            # the end of a for loop: the iterator is exhausted
+            if target is not None and target < position and \
+               OP.FOR_ITER(instructions.ops[target]):
+                pop()
+        elif name == 'FOR_ITER':
+            stack.append(UNKNOWN)
+        elif name == 'SETUP_WITH':
+            pop()
+            stack.extend([UNKNOWN, UNKNOWN])
+        elif name == 'END_FINALLY':
+            del stack[:]
+        elif name == 'RAISE_VARARGS':
+            pop(oparg)
+        elif name in ('RETURN_VALUE', 'YIELD_VALUE'):
+            break
+        elif name in ('CALL_FUNCTION', 'CALL_FUNCTION_VAR',
+                      'CALL_FUNCTION_KW', 'CALL_FUNCTION_VAR_KW'):
+            extra = (name[-4:] == '_VAR') + (name[-3:] == '_KW') + \
+                    (name[-7:] == '_VAR_KW')
+            pop(extra)
+            kwargs = {}
+            for index in range((oparg >> 8) & 0xff):
+                key, value = pop(2)
+                if type(key) is types.StringType:
+                    kwargs[key] = value
+            args = pop(oparg & 0xff)
+            function = pop()[0]
+            if extra:
+                stack.append(UNKNOWN)
+            else:
+                stack.append(_Call(function, args, kwargs))
+        elif name in ('MAKE_FUNCTION', 'MAKE_CLOSURE'):
+            code = pop()[0]
+            closure = None
+            if name == 'MAKE_CLOSURE':
+                closure = pop()[0]
+            defaults = pop(oparg)
+            stack.append(_makeFunction(code, defaults, closure, module))
+        elif name == 'BUILD_CLASS':
+            className, bases, body = pop(3)
+            stack.append(_makeClass(className, bases, body, module))
+        elif name == 'IMPORT_NAME':
+            level, fromlist = pop(2)
+            if type(level) is not types.IntType:
+                level = -1
+            stack.append(_importName(operand, fromlist, level, module))
+        elif name == 'IMPORT_FROM':
+            if stack:
+                stack.append(_importFrom(stack[-1], operand))
+            else:
+                stack.append(UNKNOWN)
+        elif name == 'IMPORT_STAR':
+            _importStar(pop()[0], namespace)
+        else:
+            # not expected outside of functions; start over
+            del stack[:]
@@ -11,13 +11,13 @@ import re
 import sys
 import os
 import string
-import copy
 import imp
 import traceback
 import types
 
 from pychecker import msgs
 from pychecker import Config
+from pychecker import moduleindex
 from pychecker.Warning import Warning
 
 
@@ -42,8 +42,7 @@ def initConfig(cfg) :
     _cfg.append(cfg)
 
 def pushConfig() :
-    newCfg = copy.copy(cfg())
-    _cfg.append(newCfg)
+    _cfg.append(Config.Layer(cfg()))
 
 def popConfig() :
     del _cfg[-1]
@@ -141,6 +140,8 @@ def safestr(value):
       return unicode(value)
 
 
+_PTL_SUFFIXES = [('.ptl', 'U', 1)]
+
 def _q_file(f):
     # crude hack!!!
     # imp.load_module requires a real file object, so we can't just
@@ -160,15 +161,15 @@ def _q_file(f):
 
 def _q_find_module(p, path):
     if not cfg().quixote:
-        return imp.find_module(p, path)
+        return moduleindex.find(p, path)
     else:
         for direc in path:
             try:
-                return imp.find_module(p, [direc])
+                return moduleindex.find(p, [direc])
             except ImportError:
                 f = os.path.join(direc, p+".ptl")
-                if os.path.exists(f):
-                    return _q_file(file(f)), f, ('.ptl', 'U', 1)
+                if moduleindex.findIn(p, direc, _PTL_SUFFIXES):
+                    return _q_file(file(f)), f, _PTL_SUFFIXES[0]
 
 def findModule(name, moduleDir=None) :
     """Returns the result of an imp.find_module(), ie, (file, filename, smt)
@@ -179,33 +180,25 @@ def findModule(name, moduleDir=None) :
         path.insert(0, moduleDir)
 
     packages = string.split(name, '.')
-    for p in packages :
+    for index in range(len(packages)) :
+        p = packages[index]
         # smt = (suffix, mode, type)
         handle, filename, smt = _q_find_module(p, path)
         if smt[-1] == imp.PKG_DIRECTORY :
-            try :
-                # package found - read path info from init file
-                m = imp.load_module(p, handle, filename, smt)
-            finally :
-                if handle is not None :
-                    handle.close()
-
             # importing xml plays a trick, which replaces itself with _xmlplus
             # both have subdirs w/same name, but different modules in them
             # we need to choose the real (replaced) version
-            if m.__name__ != p :
-                try :
-                    handle, filename, smt = _q_find_module(m.__name__, path)
-                    m = imp.load_module(p, handle, filename, smt)
-                finally :
-                    if handle is not None :
-                        handle.close()
-
-            new_path = m.__path__
-            if type(new_path) == types.ListType :
-                new_path = filename
-            if new_path not in path :
-                path.insert(1, new_path)
+            prefix = string.join(packages[:index + 1], '.')
+            m = sys.modules.get(prefix)
+            realName = getattr(m, '__name__', prefix)
+            if realName != prefix :
+                realName = string.split(realName, '.')[-1]
+                handle, filename, smt = _q_find_module(realName, path)
+
+            # the package's modules are in its directory, so there is no
+            # need to load it to read its __path__
+            if filename not in path :
+                path.insert(1, filename)
         elif smt[-1] != imp.PY_COMPILED:
             if p is not packages[-1] :
                 if handle is not None :
@@ -15,16 +15,20 @@ import types
 import traceback
 import imp
 import re
+import heapq
 
 from pychecker import OP
 from pychecker import Stack
 from pychecker import function
 from pychecker import python
 from pychecker import pcmodules
+from pychecker import signatures
 
 from pychecker import msgs
 from pychecker import utils
 from pychecker import CodeChecks
+from pychecker import phases
+from pychecker import moduleindex
 from pychecker.Warning import Warning
 
 
@@ -145,6 +149,9 @@ def _checkComplex(code, maxValue, value, func, err) :
 
 
 def _checkCode(code, codeSource) :
+    if phases.enabled :
+        return _checkCodeTimed(code, codeSource)
+
     while code.index < code.maxCode :
         op, oparg, operand = code.popNextOp()
         dispatch_func = CodeChecks.DISPATCH[op]
@@ -154,6 +161,20 @@ def _checkCode(code, codeSource) :
             except NotImplementedError :
                 raise NotImplementedError('No DISPATCH member for op %r' % op)
 
+def _checkCodeTimed(code, codeSource) :
+    "Like _checkCode, but records the time spent in each dispatch handler"
+    clock = phases.clock
+    while code.index < code.maxCode :
+        op, oparg, operand = code.popNextOp()
+        dispatch_func = CodeChecks.DISPATCH[op]
+        if dispatch_func is not None :
+            start = clock()
+            try :
+                dispatch_func(oparg, operand, codeSource, code)
+            except NotImplementedError :
+                raise NotImplementedError('No DISPATCH member for op %r' % op)
+            phases.addOpcode(op, clock() - start)
+
 def _name_unused(var) :
     if var in cfg().unusedNames :
         return 0
@@ -228,7 +249,7 @@ def _findUnreachableCode(code) :
     if cfg().unreachableCode :
         for index in unreachable.keys() :
             try :
-                if not OP.JUMP_FORWARD(ord(code.bytes[index])) :
+                if not OP.JUMP_FORWARD(code.instructions.opAt(index)) :
                     code.addWarning(msgs.CODE_UNREACHABLE, unreachable[index])
             except IndexError :
                 pass
@@ -347,8 +368,6 @@ def _getUnused(module, globalRefs, dict, msg, filterPrefix = None) :
     @type  msg:        str from L{msgs}
     """
 
-    import pprint
-
     warnings = []
 
     for ref in dict.keys():
@@ -475,13 +494,22 @@ def _updateFunctionWarnings(module, func, classObject, warnings, globalRefs,
     return funcs, codeObjects, returnValues
 
 
+# dict of (blacklist, sys.path) -> paths of the blacklisted modules
+_blackLists = {}
+
 def getBlackList(moduleList) :
+    key = (tuple(moduleList), tuple(sys.path))
+    try:
+        return _blackLists[key]
+    except KeyError:
+        pass
+
     blacklist = []
     for badBoy in moduleList :
         if badBoy[-3:] == ".py":
             badBoy = badBoy[0:-3]
         try :
-            handle, path, flags = imp.find_module(badBoy)
+            handle, path, flags = moduleindex.find(badBoy)
             if handle:
                 handle.close()
             # apparently, imp.find_module can return None, path, (triple)
@@ -490,8 +518,11 @@ def getBlackList(moduleList) :
                 blacklist.append(normalize_path(path))
         except ImportError :
             pass
+    _blackLists[key] = blacklist
     return blacklist
 
+_standardLibraries = []
+
 def getStandardLibraries() :
     """
     Return a list of standard libraries.
@@ -499,6 +530,8 @@ def getStandardLibraries() :
     @rtype: list of str or None
     """
     if cfg().ignoreStandardLibrary :
+        if _standardLibraries:
+            return _standardLibraries[0]
         try :
             from distutils import sysconfig
 
@@ -511,74 +544,233 @@ def getStandardLibraries() :
                 path = os.path.split(std_lib)
                 if path[1] == 'site-packages' :
                     ret.append(path[0])
-            return ret
         except ImportError :
-            return None
+            ret = None
+        _standardLibraries.append(ret)
+        return ret
 
 def normalize_path(path):
     return os.path.normpath(os.path.normcase(path))
 
+class _PathIndex:
+    """
+    A set of files and directories, to look up whether files are one of
+    them or in one of them.
+
+    @ivar tree:    a dict per path element, of the next element -> dict;
+                   None is a key in the dicts where a path ends
+    @type tree:    dict
+    @ivar results: dict of file name -> whether it is in the index
+    @type results: dict of str -> int (used as bool)
+    """
+
+    def __init__(self, paths):
+        """
+        @type paths: list of str
+        """
+        self.tree = {}
+        self.results = {}
+        for path in paths:
+            node = self.tree
+            for part in string.split(normalize_path(path), os.sep):
+                if node.has_key(None):
+                    # a directory above it is in already
+                    break
+                node = node.setdefault(part, {})
+            else:
+                node.clear()
+                node[None] = 1
+
+    def contains(self, filename):
+        """
+        @rtype: int (used as bool)
+        """
+        try:
+            return self.results[filename]
+        except KeyError:
+            pass
+
+        result = 0
+        node = self.tree
+        for part in string.split(normalize_path(filename), os.sep):
+            node = node.get(part)
+            if node is None:
+                break
+            if node.has_key(None):
+                result = 1
+                break
+        self.results[filename] = result
+        return result
+
+# dict of paths -> L{_PathIndex} for them
+_pathIndexes = {}
+
+def _getPathIndex(paths):
+    key = tuple(paths)
+    index = _pathIndexes.get(key)
+    if index is None:
+        index = _pathIndexes[key] = _PathIndex(paths)
+    return index
+
+def _warningKey(warning):
+    """
+    @returns: a key equal for duplicate warnings, made without rendering
+              their messages
+    """
+    err = warning.err
+    if isinstance(err, msgs.Message):
+        err = (err.template, err.args)
+    elif isinstance(err, msgs.WarningClass):
+        err = (err.msg, ())
+    return (warning.file, warning.line, err)
+
+def uniqueWarnings(warnings):
+    """
+    Remove the duplicates from the warnings, keeping the first one found.
+
+    @type  warnings: list of L{Warning}
+
+    @rtype: list of L{Warning}
+    """
+    seen = {}
+    unique = []
+    for warning in warnings:
+        key = _warningKey(warning)
+        if not seen.has_key(key):
+            seen[key] = 1
+            unique.append(warning)
+    return unique
+
+class _TopWarnings:
+    """
+    I keep the most severe of the warnings added to me, up to a limit,
+    in a heap with the least severe warning on top.
+
+    Warnings can be added a module at a time; only the warnings kept and
+    the keys of the ones seen before are held on to.
+
+    @ivar count: the number of different warnings added
+    @type count: int
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.count = 0
+        self._heap = []
+        self._seen = {}
+
+    def add(self, warnings):
+        """
+        @type warnings: list of L{Warning}
+        """
+        heap = self._heap
+        for warning in warnings:
+            key = _warningKey(warning)
+            if self._seen.has_key(key):
+                continue
+            self._seen[key] = 1
+            self.count = self.count + 1
+
+            # sort by severity first, then normal sort (by file/line)
+            item = (warning.level, warning)
+            if len(heap) < self.limit:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+
+    def warnings(self):
+        """
+        @returns: the warnings kept, least severe first, followed by a
+                  warning saying how many were suppressed if any were
+        @rtype:   list of L{Warning}
+        """
+        items = self._heap[:]
+        items.sort()
+        warnings = [warning for level, warning in items]
+        num_ignored = self.count - len(warnings)
+        if num_ignored > 0:
+            msg = msgs.TOO_MANY_WARNINGS % num_ignored
+            warnings.append(Warning('', 0, msg))
+        return warnings
+
+def limitWarnings(warnings, limit):
+    """
+    Keep only the given number of most severe warnings, replacing the others
+    with a warning saying how many were suppressed.
+
+    @type  warnings: list of L{Warning}
+    @type  limit:    int
+
+    @rtype: list of L{Warning}
+    """
+    top = _TopWarnings(limit)
+    top.add(warnings)
+    warnings[:] = top.warnings()
+    return warnings
+
 def removeWarnings(warnings, blacklist, std_lib, cfg):
     """
+    Filter the warnings like L{filterWarnings}, and keep only the most
+    severe ones if there is a limit.
+
     @param blacklist: list of absolute paths not to warn for
     @type  blacklist: str
     @param std_lib:   list of standard library directories
     @type  std_lib:   list of str or None
     """
-    utils.debug('filtering %d warnings with blacklist', len(warnings))
+    filterWarnings(warnings, blacklist, std_lib, cfg)
 
-    if std_lib is not None:
-        std_lib = [normalize_path(p) for p in std_lib]
-    for index in range(len(warnings) - 1, -1, -1):
-        filename = normalize_path(warnings[index].file)
-        # the blacklist contains paths to packages and modules we do not
-        # want warnings for
-        # when we find a match, make sure we continue the warnings for loop
-        found = False
-        for path in blacklist:
-            if not found and filename.startswith(path):
-                found = True
-                del warnings[index]
-        if found:
-            continue
-        if std_lib:
-            found = False
-            for path in std_lib:
-                if not found and utils.startswith(filename, path) :
-                    found = True
-                    del warnings[index]
-            if found:
-                continue
-        elif cfg.only:
-            # ignore files not specified on the cmd line if requested
-            if os.path.abspath(filename) not in cfg.files:
-                del warnings[index]
-                continue
+    if cfg.limit:
+        limitWarnings(warnings, cfg.limit)
 
-        # filter by warning/error level if requested
-        if cfg.level and warnings[index].level < cfg.level:
-            del warnings[index]
+    return warnings
 
-    if cfg.limit:
-        # sort by severity first, then normal sort (by file/line)
-        warnings.sort(lambda a, b: cmp(a.level, b.level) or cmp(a, b))
+def filterWarnings(warnings, blacklist, std_lib, cfg):
+    """
+    Remove the warnings for blacklisted files, files from the standard
+    library or files not asked for, and the warnings below the level
+    asked for.
 
-        # strip duplicates
-        lastWarning = None
-        for index in range(len(warnings)-1, -1, -1):
-            warning = warnings[index]
+    @param blacklist: list of absolute paths not to warn for
+    @type  blacklist: str
+    @param std_lib:   list of standard library directories
+    @type  std_lib:   list of str or None
+    """
+    utils.debug('filtering %d warnings with blacklist', len(warnings))
 
-            # remove duplicate warnings
-            if lastWarning is not None and cmp(lastWarning, warning) == 0:
-                del warnings[index]
+    # the blacklist contains paths to packages and modules we do not
+    # want warnings for
+    blacklisted = _getPathIndex(blacklist)
+    standard = None
+    if std_lib:
+        standard = _getPathIndex(std_lib)
+
+    # dict of file name -> whether to keep its warnings
+    keepFile = {}
+    kept = []
+    for warning in warnings:
+        filename = warning.file
+        keep = keepFile.get(filename)
+        if keep is None:
+            if blacklisted.contains(filename):
+                keep = 0
+            elif standard is not None:
+                keep = not standard.contains(filename)
+            elif cfg.only:
+                # ignore files not specified on the cmd line if requested
+                path = os.path.abspath(normalize_path(filename))
+                keep = cfg.files.has_key(path)
             else:
-                lastWarning = warning
+                keep = 1
+            keepFile[filename] = keep
+        if not keep:
+            continue
 
-        num_ignored = len(warnings) - cfg.limit
-        if num_ignored > 0:
-            del warnings[:-cfg.limit]
-            msg = msgs.TOO_MANY_WARNINGS % num_ignored
-            warnings.append(Warning('', 0, msg))
+        # filter by warning/error level if requested
+        if cfg.level and warning.level < cfg.level:
+            continue
+        kept.append(warning)
+    warnings[:] = kept
 
     utils.debug('kept %d warnings with blacklist', len(warnings))
 
@@ -595,19 +787,65 @@ def _updateSuppressions(suppress, warnings) :
 
 _CLASS_NAME_RE = re.compile("<class '([A-Za-z0-9.]+)'>(\\..+)?")
 
-def getSuppression(name, suppressions, warnings):
-    """
-    @type  name:         str
-    @type  suppressions: tuple of (dict of str -> str,
-                                   dict of _sre.SRE_Pattern -> str)
-    @type  warnings:     list of L{Warning.Warning}
+# characters after which a regex is no longer a literal string
+_REGEX_SPECIAL = '.^$*+?{}[]\\|()'
 
-    @returns: the suppression options for the given name
+def _literalPrefix(regex):
+    """
+    @returns: the string every name the regex matches starts with
     @rtype:   str
     """
-    try:
-        utils.pushConfig()
+    pattern = regex.pattern
+    if regex.flags & re.IGNORECASE or '|' in pattern:
+        # the alternatives may start differently
+        return ''
+    index = 0
+    while index < len(pattern) and pattern[index] not in _REGEX_SPECIAL:
+        index = index + 1
+    if pattern[index:index + 1] in ('*', '?', '{'):
+        # the last literal character is optional
+        index = index - 1
+    return pattern[:max(index, 0)]
+
+class _SuppressionIndex:
+    """
+    The suppressions, prepared for looking up many names.
+
+    @ivar exact:   dict of name -> suppression options
+    @type exact:   dict of str -> str
+    @ivar regexs:  (literal prefix, regex, suppression options), sorted
+                   by pattern
+    @type regexs:  list of tuple of (str, _sre.SRE_Pattern, str)
+    @ivar matches: dict of name -> the suppression options matching it
+    @type matches: dict of str -> list of str
+    """
+
+    def __init__(self, suppressions):
+        """
+        @type  suppressions: tuple of (dict of str -> str,
+                                       dict of _sre.SRE_Pattern -> str)
+        """
+        self.exact = suppressions[0]
+        self.regexs = []
+        for regex, suppress in suppressions[1].items():
+            self.regexs.append((regex.pattern, _literalPrefix(regex),
+                                regex, suppress))
+        self.regexs.sort()
+        self.regexs = [entry[1:] for entry in self.regexs]
+        self.matches = {}
+
+    def lookup(self, name):
+        """
+        @returns: whether an exact suppression matched, and the
+                  suppression options to apply to the name, in order
+        @rtype:   tuple of (int, list of str)
+        """
+        try:
+            return self.matches[name]
+        except KeyError:
+            pass
 
+        key = name
         # cheesy hack to deal with new-style classes.  i don't see a
         # better way to get the name, '<' is an invalid identifier, so
         # we can reliably check it and extract name from:
@@ -617,25 +855,158 @@ def getSuppression(name, suppressions, warnings):
             # pull out the names and make a complete identifier (ignore None)
             name = string.join(filter(None, matches.groups()), '')
 
-        suppress = suppressions[0].get(name, None)
+        found = []
+        suppress = self.exact.get(name, None)
         if suppress is not None:
-            _updateSuppressions(suppress, warnings)
-
-        regexList = suppressions[1].keys()
-        regexList.sort()
-        for regex in regexList:
+            found.append(suppress)
+        for prefix, regex, suppress in self.regexs:
+            if name[:len(prefix)] != prefix:
+                continue
             match = regex.match(name)
             if match and match.group() == name:
-                suppress = 1
-                _updateSuppressions(suppressions[1][regex], warnings)
+                found.append(suppress)
+
+        result = self.matches[key] = (self.exact.has_key(name), found)
+        return result
+
+# dict of id(suppressions dict) -> (suppressions, L{_SuppressionIndex})
+_suppressionIndexes = {}
+
+def _getSuppressionIndex(suppressions):
+    entry = _suppressionIndexes.get(id(suppressions[1]))
+    if entry is not None:
+        old, index = entry
+        # the suppressions are only added to while loading config files
+        if old[0] is suppressions[0] and old[1] is suppressions[1] and \
+           len(index.exact) == len(suppressions[0]) and \
+           len(index.regexs) == len(suppressions[1]):
+            return index
+    index = _SuppressionIndex(suppressions)
+    _suppressionIndexes[id(suppressions[1])] = (suppressions, index)
+    return index
 
-        if not suppress :
-            utils.popConfig()
+def getSuppression(name, suppressions, warnings):
+    """
+    Push a config with the suppressions for the given name applied, if
+    there are any.
+
+    @type  name:         str
+    @type  suppressions: tuple of (dict of str -> str,
+                                   dict of _sre.SRE_Pattern -> str)
+    @type  warnings:     list of L{Warning.Warning}
 
-        return suppress
+    @returns: 1 if any regexs matched, else the exact suppression options
+              for the given name, or None if nothing matched and no config
+              was pushed
+    @rtype:   str or int
+    """
+    exact, found = _getSuppressionIndex(suppressions).lookup(name)
+    if not found:
+        return None
+
+    try:
+        utils.pushConfig()
+        for suppress in found:
+            _updateSuppressions(suppress, warnings)
     except _SuppressionError :
         return None
 
+    if exact and len(found) == 1:
+        return found[0]
+    return 1
+
+# dict of key -> (object checked, warnings, global references) for the
+# functions and classes checked so far
+_checked = {}
+
+# dict of file name -> 1 for the modules being checked
+_checkedFiles = {}
+
+def _normalizeFile(filename):
+    return normalize_path(os.path.abspath(filename))
+
+def _checkedElsewhere(filename, ownFile):
+    """
+    @param filename: the file an object was defined in, if known
+    @type  filename: str or None
+    @param ownFile:  the normalized file of the module being checked
+    @type  ownFile:  str
+
+    @returns: whether the object is checked with another module
+    @rtype:   int (used as bool)
+    """
+    if filename is None:
+        return 0
+    filename = _normalizeFile(filename)
+    return filename != ownFile and _checkedFiles.has_key(filename)
+
+def _elsewhereFiles(module):
+    """
+    @returns: the files of the functions and classes in the module that
+              are checked with other modules, so not with this one
+    @rtype:   dict of str -> 1
+    """
+    ownFile = _normalizeFile(module.filename())
+    filenames = [func.function.func_code.co_filename
+                 for func in module.functions.values()]
+    filenames.extend([_classFile(c) for c in module.classes.values()])
+    result = {}
+    for filename in filenames:
+        if _checkedElsewhere(filename, ownFile):
+            result[_normalizeFile(filename)] = 1
+    return result
+
+def _checkOnce(key, obj, warnings, globalRefs, check):
+    """
+    Check an object the first time it is found in any module; the other
+    times, add the warnings and global references found then.
+
+    Modules imported by several of the modules checked are loaded again
+    for each of them, so the key should identify the source of the object
+    rather than the object.
+
+    @param check: called with the lists to add warnings and global
+                  references to
+    @type  check: callable
+
+    @returns: the object checked for the key
+    """
+    entry = _checked.get(key)
+    if entry is None:
+        entry = (obj, [], {})
+        check(entry[1], entry[2])
+        _checked[key] = entry
+    warnings.extend(entry[1])
+    globalRefs.update(entry[2])
+    return entry[0]
+
+def _classFile(c):
+    """
+    @returns: the file the class was defined in, if one of its methods
+              tells
+    @rtype:   str or None
+    """
+    try:
+        values = c.classObject.__dict__.values()
+    except AttributeError:
+        return None
+    for value in values:
+        func_code = getattr(value, 'func_code', None)
+        if func_code is not None:
+            return func_code.co_filename
+    return None
+
+def _classKey(c, filename, class_code):
+    """
+    @returns: a key for the class, the same for each time its module is
+              loaded
+    """
+    if filename is None:
+        # nothing tells where the class was defined
+        return (c.classObject, class_code)
+    return (filename, c.classObject.__module__, c.classObject.__name__,
+            class_code)
+
 def _findFunctionWarnings(module, globalRefs, warnings, suppressions) :
     """
     @type  module:     L{pychecker.checker.PyCheckerModule}
@@ -643,21 +1014,39 @@ def _findFunctionWarnings(module, globalRefs, warnings, suppressions) :
                        that have been used ?
     @type  globalRefs: dict of str -> str
     """
+    ownFile = _normalizeFile(module.filename())
     for func in module.functions.values() :
         func_code = func.function.func_code
-        utils.debug("function:", func_code)
-
-        name = '%s.%s' % (module.moduleName, func.function.__name__)
-        suppress = getSuppression(name, suppressions, warnings)
-        if cfg().noDocFunc and func.function.__doc__ == None :
-            err = msgs.NO_FUNC_DOC % func.function.__name__
-            # FIXME: is there a good reason why this passes func_code as line ?
-            warnings.append(Warning(module.filename(), func_code, err))
-
-        _checkNoSelfArg(func, warnings)
-        _updateFunctionWarnings(module, func, None, warnings, globalRefs)
-        if suppress is not None :
-            utils.popConfig()
+        if _checkedElsewhere(func_code.co_filename, ownFile) or \
+           signatures.isStub(func.function):
+            continue
+        checked = _checkOnce((func_code.co_filename, func_code), func,
+            warnings, globalRefs,
+            lambda warnings, globalRefs, module=module, func=func,
+                   suppressions=suppressions:
+                _findOneFunctionWarnings(module, func, globalRefs, warnings,
+                                         suppressions))
+        if func.returnValues is None:
+            func.returnValues = checked.returnValues
+
+def _findOneFunctionWarnings(module, func, globalRefs, warnings,
+                             suppressions):
+    func_code = func.function.func_code
+    utils.debug("function:", func_code)
+
+    # imported functions are checked in the module defining them
+    module = _getModuleFromFilename(module, func_code.co_filename)
+    name = '%s.%s' % (module.moduleName, func.function.__name__)
+    suppress = getSuppression(name, suppressions, warnings)
+    if cfg().noDocFunc and func.function.__doc__ == None :
+        err = msgs.NO_FUNC_DOC % func.function.__name__
+        # FIXME: is there a good reason why this passes func_code as line ?
+        warnings.append(Warning(module.filename(), func_code, err))
+
+    _checkNoSelfArg(func, warnings)
+    _updateFunctionWarnings(module, func, None, warnings, globalRefs)
+    if suppress is not None :
+        utils.popConfig()
 
 def _getModuleFromFilename(module, filename):
     if module.filename() != filename:
@@ -712,7 +1101,8 @@ def _findClassWarnings(module, c, class_code,
     filename = module.filename()
     func_code = None
     for method in c.methods.values() :
-        if method == None :
+        # methods built from signatures have no code to check
+        if method == None or signatures.isStub(method.function):
             continue
         func_code = method.function.func_code
         utils.debug("class %s: method:" % className, func_code)
@@ -829,100 +1219,257 @@ def _findClassWarnings(module, c, class_code,
         utils.popConfig()
 
 
-def find(moduleList, initialCfg, suppressions=None):
-    "Return a list of warnings found in the module list"
-
-    if suppressions is None :
-        suppressions = {}, {}
-
-    utils.initConfig(initialCfg)
-    utils.debug('Finding warnings in %d modules' % len(moduleList))
+def _findModuleWarnings(module, suppressions):
+    """
+    Return a list of warnings found in the given module.
 
+    @type  module:       L{pychecker.checker.PyCheckerModule}
+    @type  suppressions: tuple of (dict of str -> str,
+                                   dict of _sre.SRE_Pattern -> str)
+    """
     warnings = []
     before = 0
+    if phases.enabled:
+        started = phases.clock()
+
+    modSuppress = getSuppression(module.moduleName, suppressions, warnings)
+    globalRefs, classCodes = {}, {}
 
-    for module in moduleList :
-        if module.moduleName in cfg().blacklist :
+    # mainCode can be null if there was a syntax error
+    if module.mainCode != None :
+        utils.debug("module:", module)
+        before = len(warnings)
+        phases.start('main code')
+        funcInfo = _updateFunctionWarnings(module, module.mainCode,
+                                           None, warnings, globalRefs, 1)
+        phases.stop('main code')
+
+        if before != len(warnings):
+            utils.debug("module: %r __main__ triggered %d warnings", module,
+                len(warnings) - before)
+
+        for code in funcInfo[1] :
+            classCodes[code.co_name] = code
+
+    before = len(warnings)
+    phases.start('functions')
+    _findFunctionWarnings(module, globalRefs, warnings, suppressions)
+    phases.stop('functions')
+    if before != len(warnings):
+        utils.debug("module: %r functions triggered %d warnings", module,
+            len(warnings) - before)
+
+    before = len(warnings)
+    phases.start('classes')
+    ownFile = _normalizeFile(module.filename())
+    for c in module.classes.values():
+        filename = _classFile(c)
+        if _checkedElsewhere(filename, ownFile):
             continue
+        # only the module defining the class has the code of its body
+        class_code = classCodes.get(c.name)
+        checked = _checkOnce(_classKey(c, filename, class_code), c, warnings,
+            globalRefs,
+            lambda warnings, globalRefs, module=module, c=c,
+                   class_code=class_code, suppressions=suppressions:
+                _findClassWarnings(module, c, class_code, globalRefs,
+                                   warnings, suppressions))
+        for name, method in c.methods.items():
+            if method is not None and method.returnValues is None:
+                other = checked.methods.get(name)
+                if other is not None:
+                    method.returnValues = other.returnValues
+    phases.stop('classes')
+    if before != len(warnings):
+        utils.debug("module: %r classes triggered %d warnings", module,
+            len(warnings) - before)
+
+    if cfg().noDocModule and \
+       module.module != None and module.module.__doc__ == None:
+        warnings.append(Warning(module.filename(), 1, msgs.NO_MODULE_DOC))
+        utils.debug("module: %r module doc triggered 1 warning")
+
+    before = len(warnings)
+    phases.start('unused')
+    if cfg().allVariablesUsed or cfg().privateVariableUsed:
+        prefix = None
+        if not cfg().allVariablesUsed:
+            prefix = "_"
+        for ignoreVar in cfg().variablesToIgnore + cfg().unusedNames:
+            globalRefs[ignoreVar] = ignoreVar
+        warnings.extend(_getUnused(module, globalRefs, module.variables,
+                                   msgs.VAR_NOT_USED, prefix))
+    if before != len(warnings):
+        utils.debug("module: %r unused variables triggered %d warnings",
+            module, len(warnings) - before)
+
+    before = len(warnings)
+    if cfg().importUsed:
+        if module.moduleName != utils.INIT or cfg().packageImportUsed:
+            # always ignore readline module, if [raw_]input() is used
+            if globalRefs.has_key('input') or \
+               globalRefs.has_key('raw_input'):
+                globalRefs['readline'] = 0
+            warnings.extend(_getUnused(module, globalRefs, module.modules,
+                                       msgs.IMPORT_NOT_USED))
+    phases.stop('unused')
+    if before != len(warnings):
+        utils.debug("module: %r unused imports triggered %d warnings",
+            module, len(warnings) - before)
+
+    # we have to do this here, b/c checkFunction doesn't popConfig for
+    # classes this allows us to have __pychecker__ apply to all methods
+    # when defined at class scope
+    if module.mainCode != None:
+        utils.popConfig()
+    if modSuppress is not None:
+        utils.popConfig()
 
-        modSuppress = getSuppression(module.moduleName, suppressions, warnings)
-        globalRefs, classCodes = {}, {}
+    if phases.enabled:
+        phases.addModule(module.moduleName, phases.clock() - started)
+    return warnings
 
-        # mainCode can be null if there was a syntax error
-        if module.mainCode != None :
-            utils.debug("module:", module)
-            before = len(warnings)
-            funcInfo = _updateFunctionWarnings(module, module.mainCode,
-                                               None, warnings, globalRefs, 1)
 
-            if before != len(warnings):
-                utils.debug("module: %r __main__ triggered %d warnings", module,
-                    len(warnings) - before)
+# (module list, suppressions) inherited by forked worker processes
+_parallelState = None
 
-            for code in funcInfo[1] :
-                classCodes[code.co_name] = code
+def _findModuleWarningsByIndex(index):
+    moduleList, suppressions = _parallelState
+    return _findModuleWarnings(moduleList[index], suppressions)
 
-        before = len(warnings)
-        _findFunctionWarnings(module, globalRefs, warnings, suppressions)
-        if before != len(warnings):
-            utils.debug("module: %r functions triggered %d warnings", module,
-                len(warnings) - before)
+def _findWarningsParallel(moduleList, suppressions, jobs):
+    """
+    Check the given modules in a pool of worker processes.
 
-        before = len(warnings)
-        for c in module.classes.values():
-            _findClassWarnings(module, c, classCodes.get(c.name),
-                               globalRefs, warnings, suppressions)
-        if before != len(warnings):
-            utils.debug("module: %r classes triggered %d warnings", module,
-                len(warnings) - before)
+    The workers are forked after all modules are loaded, so they share
+    the loaded modules with this process and only send back warnings.
 
-        if cfg().noDocModule and \
-           module.module != None and module.module.__doc__ == None:
-            warnings.append(Warning(module.filename(), 1, msgs.NO_MODULE_DOC))
-            utils.debug("module: %r module doc triggered 1 warning")
+    @returns: iterator over the warnings of each module, in the order of
+              moduleList, as the modules are checked
+    @rtype:   iterator of list of L{Warning}
+    """
+    global _parallelState
+    try:
+        import multiprocessing
+    except ImportError:
+        utils.debug('multiprocessing not available, checking serially')
+        for m in moduleList:
+            yield _findModuleWarnings(m, suppressions)
+        return
 
-        before = len(warnings)
-        if cfg().allVariablesUsed or cfg().privateVariableUsed:
-            prefix = None
-            if not cfg().allVariablesUsed:
-                prefix = "_"
-            for ignoreVar in cfg().variablesToIgnore + cfg().unusedNames:
-                globalRefs[ignoreVar] = ignoreVar
-            warnings.extend(_getUnused(module, globalRefs, module.variables,
-                                       msgs.VAR_NOT_USED, prefix))
-        if before != len(warnings):
-            utils.debug("module: %r unused variables triggered %d warnings",
-                module, len(warnings) - before)
+    utils.debug('Checking %d modules in %d processes', len(moduleList), jobs)
+    _parallelState = (moduleList, suppressions)
+    pool = multiprocessing.Pool(jobs)
+    results = pool.imap(_findModuleWarningsByIndex, range(len(moduleList)), 1)
+    try:
+        for index in range(len(moduleList)):
+            yield results.next()
+    finally:
+        # also when the caller stops early, so no workers are left running
+        pool.terminate()
+        pool.join()
+        _parallelState = None
 
-        before = len(warnings)
-        if cfg().importUsed:
-            if module.moduleName != utils.INIT or cfg().packageImportUsed:
-                # always ignore readline module, if [raw_]input() is used
-                if globalRefs.has_key('input') or \
-                   globalRefs.has_key('raw_input'):
-                    globalRefs['readline'] = 0
-                warnings.extend(_getUnused(module, globalRefs, module.modules,
-                                           msgs.IMPORT_NOT_USED))
-        if before != len(warnings):
-            utils.debug("module: %r unused imports triggered %d warnings",
-                module, len(warnings) - before)
 
-        # we have to do this here, b/c checkFunction doesn't popConfig for
-        # classes this allows us to have __pychecker__ apply to all methods
-        # when defined at class scope
-        if module.mainCode != None:
-            utils.popConfig()
-        if modSuppress is not None:
-            utils.popConfig()
+def findByModule(moduleList, initialCfg, suppressions=None):
+    """
+    Find the warnings in the module list a module at a time, so they can
+    be reported before all modules are checked.
+
+    The warnings are filtered with L{filterWarnings}, but not limited.
+
+    @returns: iterator over the warnings of each module, in the order of
+              moduleList
+    @rtype:   iterator of list of L{Warning}
+    """
+    if suppressions is None :
+        suppressions = {}, {}
+
+    utils.initConfig(initialCfg)
+    utils.debug('Finding warnings in %d modules' % len(moduleList))
+
+    warningCache = None
+    if cfg().cacheDir:
+        # the cache needs pickle, tempfile and md5, so only import it here
+        from pychecker import cache
+        warningCache = cache.WarningCache(cfg().cacheDir, initialCfg,
+                                          suppressions)
 
     std_lib = None
     if cfg().ignoreStandardLibrary:
         std_lib = getStandardLibraries()
+    blacklist = getBlackList(cfg().blacklist)
+
+    # modules are checked in order, but the cached ones can be reported
+    # without waiting for the ones before them to be checked
+    modules = []
+    for module in moduleList:
+        if module.moduleName not in cfg().blacklist :
+            modules.append(module)
+
+    # what is defined in the modules is only checked with them, and what
+    # they import only once
+    _checked.clear()
+    _checkedFiles.clear()
+    for module in modules:
+        _checkedFiles[_normalizeFile(module.filename())] = 1
+
+    cached = {}
+    checkModules = []
+    for module in modules:
+        if warningCache is not None:
+            moduleWarnings = warningCache.lookup(module,
+                                                 _elsewhereFiles(module))
+            if moduleWarnings is not None:
+                cached[id(module)] = moduleWarnings
+                continue
+        checkModules.append(module)
+
+    if cfg().jobs > 1 and len(checkModules) > 1:
+        results = _findWarningsParallel(checkModules, suppressions,
+                                        cfg().jobs)
+    else:
+        results = _findWarningsSerially(checkModules, suppressions)
+
+    count = 0
+    for module in modules:
+        moduleWarnings = cached.get(id(module))
+        if moduleWarnings is None:
+            moduleWarnings = results.next()
+            if warningCache is not None:
+                warningCache.store(module, moduleWarnings,
+                                   _elsewhereFiles(module))
+
+        phases.start('filter')
+        moduleWarnings = filterWarnings(moduleWarnings[:], blacklist, std_lib,
+                                        cfg())
+        phases.stop('filter')
+        count = count + len(moduleWarnings)
+        yield moduleWarnings
+
+    if warningCache is not None and cfg().cacheReport:
+        warningCache.report()
+    utils.debug('Found %d warnings in %d modules' % (count, len(moduleList)))
+
+def _findWarningsSerially(moduleList, suppressions):
+    for module in moduleList:
+        yield _findModuleWarnings(module, suppressions)
 
-    ret = removeWarnings(warnings, getBlackList(cfg().blacklist), std_lib,
-                          cfg())
-    utils.debug('Found %d warnings in %d modules' % (len(ret), len(moduleList)))
-    return ret
+def find(moduleList, initialCfg, suppressions=None):
+    "Return a list of warnings found in the module list"
+
+    results = findByModule(moduleList, initialCfg, suppressions)
+    if initialCfg.limit:
+        # only keep the most severe warnings while checking
+        top = _TopWarnings(initialCfg.limit)
+        for moduleWarnings in results:
+            top.add(moduleWarnings)
+        return top.warnings()
+
+    warnings = []
+    for moduleWarnings in results:
+        warnings.extend(moduleWarnings)
+    return warnings
 
 
 if 0:
@@ -0,0 +1,163 @@
+"""Content-addressed cache of the results of checking a file.
+
+An entry holds the parse tree, scopes and warnings of one file.  It is
+found by hashing the file's contents, its directory and the options in
+effect, and is only used while the sources of the modules the file
+imports are unchanged.  Entries are written to a temporary file and
+renamed into place, so concurrent runs can share a cache directory.
+"""
+
+from pychecker2.Warning import Warning
+
+import os
+import sys
+import tempfile
+import cPickle
+
+try:
+    from hashlib import md5 as _md5
+except ImportError:
+    from md5 import new as _md5
+
+# bump this when the format of the cached entries changes
+FORMAT = 1
+
+# options which do not change the results of checking a file
+_IGNORED_OPTIONS = ('cache', 'verbose', 'incremental', 'profile', 'jobs')
+
+def _hash(data):
+    return _md5(data).hexdigest()
+
+def _source_file(module):
+    import inspect
+    try:
+        return inspect.getsourcefile(module)
+    except TypeError:
+        return None
+
+class Cache:
+
+    def __init__(self, directory, options, checks):
+        self.directory = directory
+        self.hashes = {}
+
+        values = []
+        for opts in options.options.values():
+            for opt in opts:
+                if opt.longName not in _IGNORED_OPTIONS:
+                    values.append( (opt.longName, opt.get_value()) )
+        values.sort()
+        self.fingerprint = _hash(repr( (FORMAT, sys.version,
+                                        map(str, checks), values) ))
+
+        # warnings are stored by name, so cached results refer to the
+        # same objects (and option values) as the checks that are loaded
+        self.warning_ids = {}
+        self.warnings = {}
+        for c in checks:
+            for attr in vars(c.__class__):
+                object = getattr(c, attr)
+                if isinstance(object, Warning):
+                    name = '%s.%s' % (c.__class__.__name__, attr)
+                    self.warning_ids[id(object)] = name
+                    self.warnings[name] = object
+
+    def file_hash(self, fname):
+        "hash of the contents of a file, or None if it can't be read"
+        try:
+            return self.hashes[fname]
+        except KeyError:
+            pass
+        try:
+            fp = open(fname, 'rb')
+            try:
+                result = _hash(fp.read())
+            finally:
+                fp.close()
+        except (IOError, OSError):
+            result = None
+        self.hashes[fname] = result
+        return result
+
+    def entry_path(self, fname):
+        contents = self.file_hash(fname)
+        if contents is None:
+            return None
+        directory = os.path.dirname(os.path.realpath(fname))
+        key = _hash('%s\0%s\0%s' % (self.fingerprint, directory, contents))
+        return os.path.join(self.directory, key[:2], key)
+
+    def _persistent_id(self, object):
+        if isinstance(object, Warning):
+            return self.warning_ids.get(id(object))
+        return None
+
+    def _persistent_load(self, name):
+        return self.warnings[name]
+
+    def dependencies(self, f):
+        "the source files of the modules imported by a checked file"
+        result = {}
+        for scope in f.scopes.values():
+            for ref in getattr(scope, 'imports', {}).values():
+                fname = _source_file(ref.module)
+                if fname and fname != f.name:
+                    result[fname] = self.file_hash(fname)
+        return result
+
+    def load(self, f):
+        "fill in the results for a file from the cache, if they are there"
+        path = self.entry_path(f.name)
+        if path is None:
+            return None
+        try:
+            fp = open(path, 'rb')
+        except IOError:
+            return None
+        try:
+            try:
+                unpickler = cPickle.Unpickler(fp)
+                unpickler.persistent_load = self._persistent_load
+                dependencies, state = unpickler.load()
+            finally:
+                fp.close()
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception:
+            return None
+
+        for fname, contents in dependencies.items():
+            if self.file_hash(fname) != contents:
+                return None
+
+        f.parseTree, f.scopes, f.root_scope, f.warnings = state
+        return 1
+
+    def store(self, f):
+        "save the results of checking a file"
+        path = self.entry_path(f.name)
+        if path is None:
+            return
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # another run may have created it in the meantime
+                if not os.path.isdir(directory):
+                    return
+
+        state = (f.parseTree, f.scopes, f.root_scope, f.warnings)
+        fd, tmp = tempfile.mkstemp(dir=directory)
+        fp = os.fdopen(fd, 'wb')
+        try:
+            try:
+                pickler = cPickle.Pickler(fp, 1)
+                pickler.persistent_id = self._persistent_id
+                pickler.dump( (self.dependencies(f), state) )
+            finally:
+                fp.close()
+            os.rename(tmp, path)
+        except (cPickle.PicklingError, TypeError, RuntimeError):
+            # unpicklable or too deeply nested results are not cached
+            os.unlink(tmp)
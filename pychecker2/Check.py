@@ -2,10 +2,7 @@
 from pychecker2.Warning import Warning
 from pychecker2.File import File
 from pychecker2 import Options
-
-import time
-import os
-import stat
+from pychecker2 import util
 
 class WarningOpt(Options.BoolOpt):
     __pychecker__ = 'no-callinit'
@@ -29,13 +26,37 @@ class WarningOpt(Options.BoolOpt):
 
 class CheckList:
 
-    def __init__(self, checks):
+    def __init__(self, checks, cache = None):
         self.checks = checks
         self.modules = {}
+        self.cache = cache
+        # set in the worker processes of a run with --jobs
+        self.claims = None
 
     def check_file(self, f):
+        if self.claims is not None:
+            self.claims.check_file(self, f)
+        else:
+            self.analyse_file(f)
+
+    def analyse_file(self, f):
+        if self.cache is not None and self.cache.load(f):
+            return
+        # the visitors of neighbouring checks share one walk of the tree
+        visitors = []
         for c in self.checks:
+            visitor = c.get_visitor(f, self)
+            if visitor is not None:
+                visitors.append(visitor)
+                continue
+            if visitors:
+                util.walk_together(f.parseTree, visitors)
+                visitors = []
             c.check(f, self)
+        if visitors:
+            util.walk_together(f.parseTree, visitors)
+        if self.cache is not None:
+            self.cache.store(f)
 
     def check_module(self, m):
         f = None
@@ -54,28 +75,6 @@ class CheckList:
                 self.check_file(f)
         return f
 
-    def __getstate__(self):
-        modules = []
-        for k, v in self.modules.items():
-            modules.append( (k.__name__, v) )
-        return (time.time(), self.checks, modules)
-
-    def __setstate__(self, data):
-        import inspect
-        cache_time, self.checks, modules = data
-        self.modules = {}
-        for k, v in modules:
-            module = __import__(k, globals(), {}, [''])
-            # Don't recover files that are newer than the save time
-            try:
-                fname = inspect.getsourcefile(module)
-                last_modified = os.stat(fname)[stat.ST_MTIME]
-            except TypeError:
-                last_modified = 0
-
-            if last_modified < cache_time:
-                self.modules[module] = v
-                
 class Check:
 
     def __str__(self):
@@ -90,6 +89,12 @@ class Check:
     def get_options(self, options):
         pass
     
+    def get_visitor(self, file, checker):
+        """return a visitor to walk the whole parse tree with, instead
+        of calling check(); it shares the walk with the visitors of
+        the checks next to it in the list"""
+        return None
+
     def check(self, file, checker):
         pass
 
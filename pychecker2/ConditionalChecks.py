@@ -19,15 +19,17 @@ class ConstantFinder(BaseVisitor):
 
 class GetConditionalConstants(BaseVisitor):
 
-    def __init__(self):
-        self.result = []
+    def __init__(self, found):
+        self.found = found
 
     def visitIf(self, node):
         for test, code in node.tests:
-            self.result.extend(walk(test, ConstantFinder()).result)
+            for n, value in walk(test, ConstantFinder()).result:
+                self.found(n, value)
 
     def visitWhile(self, node):
-        self.result.extend(walk(node.test, ConstantFinder()).result)
+        for n, value in walk(node.test, ConstantFinder()).result:
+            self.found(n, value)
     visitListCompIf = visitWhile
     visitAssert = visitWhile
 
@@ -37,8 +39,9 @@ class ConstantCheck(Check):
                           Warning('Report constants used in conditionals',
                                   'Constant used in conditional %s')
 
-    def check(self, file, unused_checker):
+    def get_visitor(self, file, unused_checker):
         if file.parseTree:
-            v = GetConditionalConstants()
-            for n, value in walk(file.parseTree, v).result:
+            def found(n, value):
                 file.warning(n, self.constantInConditional, value)
+            return GetConditionalConstants(found)
+        return None
@@ -2,7 +2,6 @@ from pychecker2.Check import Check
 from pychecker2.Check import Warning
 from pychecker2 import util
 
-from compiler import walk
 
 class ModuleReference:
     def __init__(self, localname, remotename, module, nodes):
@@ -12,12 +11,21 @@ class ModuleReference:
         self.nodes = nodes
 
     def __getstate__(self):
-        return (self.localname, self.remotename, self.module.__name__, 
-                self.nodes)
+        try:
+            name = self.__dict__['module'].__name__
+        except KeyError:
+            name = self.modname
+        return (self.localname, self.remotename, name, self.nodes)
 
     def __setstate__(self, data):
-        (self.localname, self.remotename, module, self.nodes) = data
-        self.module = __import__(module, globals(), {}, [''])
+        (self.localname, self.remotename, self.modname, self.nodes) = data
+
+    def __getattr__(self, name):
+        # references restored from the cache import their module on first use
+        if name == 'module':
+            self.module = __import__(self.modname, globals(), {}, [''])
+            return self.module
+        raise AttributeError(name)
 
 class ImportCheck(Check):
     '''
@@ -34,7 +42,7 @@ Figure out which names come from 'import name'.
                            'Import of "%s" duplicates import from '
                            'module %s at %d')
 
-    def check(self, file, checker):
+    def get_visitor(self, file, checker):
         def try_import(name, node):
             try:
                 return __import__(name, globals(), {}, [''])
@@ -90,4 +98,5 @@ Figure out which names come from 'import name'.
 
 
         if file.root_scope:
-            walk(file.root_scope.node, FromImportVisitor())
+            return FromImportVisitor()
+        return None
@@ -0,0 +1,125 @@
+"""Check files in a pool of worker processes.
+
+The workers are forked once the checks are set up, so they share the
+checks and options with the parent, and only send back the warnings of
+each file.  The files and modules analysed are shared through the cache:
+the first worker to claim a file analyses it and stores the result, and
+the others wait for it and load the entry.  A worker does not wait for a
+worker that is waiting for it, directly or through others, but analyses
+the file itself.  Without a cache directory, a temporary one is used for
+the run.
+"""
+
+from pychecker2.Cache import Cache
+
+import os
+import time
+import shutil
+import tempfile
+
+# seconds to wait for another worker to analyse a file, and to sleep
+# between looking
+_WAIT = 60.0
+_POLL = 0.01
+
+# (checklist, files) inherited by the forked workers
+_state = None
+
+class Claims:
+    "I make sure each file is analysed by one worker"
+
+    def __init__(self, table, waiting, lock):
+        # shared dict of real file name -> pid of the worker analysing it,
+        # or 0 once it is done
+        self.table = table
+        # shared dict of pid -> pid of the worker it waits for
+        self.waiting = waiting
+        self.lock = lock
+
+    def check_file(self, checklist, f):
+        name = os.path.realpath(f.name)
+        pid = os.getpid()
+        owner = self.table.setdefault(name, pid)
+        if owner != pid:
+            # loaded from the cache after waiting, unless the other
+            # worker could not store it
+            if owner:
+                self.wait(name, owner, pid)
+            checklist.analyse_file(f)
+            return
+
+        try:
+            checklist.analyse_file(f)
+        finally:
+            self.table[name] = 0
+
+    def wait(self, name, owner, pid):
+        "wait for the owner to analyse a file, unless it waits for us"
+        self.lock.acquire()
+        try:
+            other = owner
+            while other:
+                if other == pid:
+                    return
+                other = self.waiting.get(other)
+            self.waiting[pid] = owner
+        finally:
+            self.lock.release()
+
+        try:
+            deadline = time.time() + _WAIT
+            while self.table.get(name) and time.time() < deadline:
+                time.sleep(_POLL)
+        finally:
+            del self.waiting[pid]
+
+def _check_one(index):
+    checklist, files = _state
+    f = files[index]
+    checklist.check_file(f)
+    ids = checklist.cache.warning_ids
+    return [ (line, ids[id(warning)], args)
+             for line, warning, args in f.warnings ]
+
+def check_files(checklist, files, options, jobs, report=None):
+    """Check the files in jobs worker processes, and call report with
+    each file in order once its warnings are known"""
+    global _state
+    try:
+        import multiprocessing
+    except ImportError:
+        multiprocessing = None
+    if multiprocessing is None or jobs < 2 or len(files) < 2:
+        for f in files:
+            checklist.check_file(f)
+            if report is not None:
+                report(f)
+        return
+
+    cache, directory = checklist.cache, None
+    if cache is None:
+        directory = tempfile.mkdtemp(prefix='pychecker2-')
+        checklist.cache = Cache(directory, options, checklist.checks)
+    manager = multiprocessing.Manager()
+    checklist.claims = Claims(manager.dict(), manager.dict(),
+                              multiprocessing.Lock())
+    _state = checklist, files
+    pool = multiprocessing.Pool(jobs)
+    try:
+        results = pool.imap(_check_one, range(len(files)), 1)
+        warnings = checklist.cache.warnings
+        for f in files:
+            f.warnings = [ (line, warnings[name], args)
+                           for line, name, args in results.next() ]
+            if report is not None:
+                report(f)
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+        manager.shutdown()
+        _state = None
+        checklist.claims = None
+        checklist.cache = cache
+        if directory is not None:
+            shutil.rmtree(directory, ignore_errors=1)
@@ -16,7 +16,7 @@ class OpCheck(Check):
         "Operator (+) normally has no effect"
         )
 
-    def check(self, file, unused_checklist):
+    def get_visitor(self, file, unused_checklist):
         class OpVisitor:
             def visitUnaryAdd(s, n):
                 if n.getChildren()[0].__class__ == compiler.ast.UnaryAdd:
@@ -28,13 +28,14 @@ class OpCheck(Check):
                 if n.getChildren()[0].__class__ == compiler.ast.UnarySub:
                     file.warning(n, self.operator, '--')
         if file.parseTree:        
-            compiler.walk(file.parseTree, OpVisitor())
+            return OpVisitor()
+        return None
 
 class ExceptCheck(Check):
     emptyExcept = Warning('Warn about "except:"',
                           'Empty except clauses can hide unexpected errors')
     
-    def check(self, file, unused_checklist):
+    def get_visitor(self, file, unused_checklist):
         class ExceptVisitor(BaseVisitor):
             def visitTryExcept(s, node):
                 for exc, det, code in node.handlers:
@@ -42,13 +43,14 @@ class ExceptCheck(Check):
                         file.warning(code.nodes[0], self.emptyExcept)
                 s.visitChildren(node)
         if file.parseTree:
-            compiler.walk(file.parseTree, ExceptVisitor())
+            return ExceptVisitor()
+        return None
 
 class CompareCheck(Check):
     useIs = Warning('warn about "== None"',
                     'use "is" when comparing with None')
 
-    def check(self, file, unused_checklist):
+    def get_visitor(self, file, unused_checklist):
         def checkEqualNone(node, expr, op):
             if (op == '==' and 
                 expr.__class__ == compiler.ast.Name and
@@ -65,4 +67,5 @@ class CompareCheck(Check):
                 checkEqualNone(node, right, op)
 
         if file.parseTree:
-            compiler.walk(file.parseTree, CompareVisitor())
+            return CompareVisitor()
+        return None
@@ -1,3 +1,5 @@
+import os
+
 class Error(Exception): pass
 
 class Opt:
@@ -50,6 +52,11 @@ class Options:
         self.add(BoolOpt(self, 'verbose', 'turn on verbose messages'), MISC)
         self.add(BoolOpt(self, 'incremental', 'print warnings as they are created'), MISC)
         self.add(BoolOpt(self, 'profile', 'print a profile of pychecker', 0), MISC)
+        self.add(Opt(self, 'cache', 'directory to cache results in',
+                     os.path.join(os.path.expanduser('~'), '.pychecker2')),
+                 MISC)
+        self.add(Opt(self, 'jobs', 'number of processes to check files in', 1),
+                 MISC)
 
     def add(self, option, category=ERROR):
         self.options[category].append(option)
@@ -2,14 +2,19 @@ from pychecker2.Check import Check
 from pychecker2.Warning import Warning
 from pychecker2.Options import BoolOpt
 from pychecker2 import symbols
+from pychecker2 import fastparse
 
 from compiler import parseFile, walk
 import parser
 
 def _parent_link(node):
-    for c in node.getChildNodes():
-        c.parent = node
-        _parent_link(c)
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        children = node.getChildNodes()
+        for c in children:
+            c.parent = node
+        stack.extend(children)
 
 class ParseCheck(Check):
 
@@ -18,14 +23,20 @@ class ParseCheck(Check):
 
     def __init__(self):
         self.main = None
+        self.fastParse = None
     
     def get_options(self, options):
         desc = 'Ignore module-level code protected by __name__ == "__main__"'
         options.add(BoolOpt(self, 'main', desc, 1))
+        desc = 'Parse with the builtin _ast module, which is faster'
+        options.add(BoolOpt(self, 'fastParse', desc, 0))
     
     def check(self, file, unused_checker):
+        parse = parseFile
+        if self.fastParse and fastparse.available():
+            parse = fastparse.parseFile
         try:
-            file.parseTree = parseFile(file.name)
+            file.parseTree = parse(file.name)
             # link each node to it's parent
             _parent_link(file.parseTree)
             file.parseTree.parent = None
@@ -259,9 +259,9 @@ class UnpackCheck(Check):
         desc = 'Do not treat variables used in tuple assignment as used'
         options.add(BoolOpt(self, 'unpackedUsed', desc, 1))
 
-    def check(self, file, unused_checker):
+    def get_visitor(self, file, unused_checker):
         if not self.unpackedUsed:
-            return
+            return None
 
         class Visitor:
             def visitAssTuple(self, node):
@@ -281,7 +281,8 @@ class UnpackCheck(Check):
                     scope.uses[unpacked] = scope.uses.get(unpacked, scope_node)
 
         if file.root_scope:
-            walk(file.root_scope.node, Visitor())
+            return Visitor()
+        return None
 
 def intersect2(a, b):
     return [i for i in a if i in b]
@@ -0,0 +1,605 @@
+"""Parse files with the builtin _ast module into compiler.ast nodes.
+
+compiler.parseFile turns the concrete syntax tree of the parser module
+into compiler.ast nodes in Python, walking a dozen levels of grammar
+rules for every expression.  Here the interpreter builds the abstract
+syntax tree in C, and only its nodes are turned into the compiler.ast
+nodes the checks know.
+
+compiler numbers many nodes after one of their tokens, like the first
+operator of a sum or the first comma of a tuple, which _ast does not
+record; those are found by reading back from the next operand in the
+source.  The trees match those of compiler.parseFile, but for the line
+of attribute names on a line of their own, the nodes compiler makes up
+for stray semicolons, bitwise operations nested in parentheses, which
+compiler keeps apart, and strings under unicode_literals, which
+compiler leaves as str.
+"""
+
+from compiler import ast
+from compiler.consts import CO_VARARGS, CO_VARKEYWORDS
+from compiler.consts import OP_ASSIGN, OP_DELETE, OP_APPLY
+
+try:
+    import _ast
+except ImportError:
+    _ast = None
+
+_BINARY = { 'Add': ast.Add, 'Sub': ast.Sub, 'Mult': ast.Mul,
+            'Div': ast.Div, 'Mod': ast.Mod, 'Pow': ast.Power,
+            'LShift': ast.LeftShift, 'RShift': ast.RightShift,
+            'FloorDiv': ast.FloorDiv }
+# compiler keeps a run of these in one node
+_BITWISE = { 'BitOr': ast.Bitor, 'BitXor': ast.Bitxor,
+             'BitAnd': ast.Bitand }
+# compiler numbers a run of these after its first operator
+_GROUPS = { 'Add': 1, 'Sub': 1, 'Mult': 2, 'Div': 2, 'Mod': 2,
+            'FloorDiv': 2, 'LShift': 3, 'RShift': 3 }
+_UNARY = { 'UAdd': ast.UnaryAdd, 'USub': ast.UnarySub,
+           'Invert': ast.Invert, 'Not': ast.Not }
+_BOOLEAN = { 'And': ast.And, 'Or': ast.Or }
+_COMPARE = { 'Eq': '==', 'NotEq': '!=', 'Lt': '<', 'LtE': '<=',
+             'Gt': '>', 'GtE': '>=', 'Is': 'is', 'IsNot': 'is not',
+             'In': 'in', 'NotIn': 'not in' }
+_AUGMENTED = { 'Add': '+=', 'Sub': '-=', 'Mult': '*=', 'Div': '/=',
+               'Mod': '%=', 'Pow': '**=', 'LShift': '<<=',
+               'RShift': '>>=', 'BitOr': '|=', 'BitXor': '^=',
+               'BitAnd': '&=', 'FloorDiv': '//=' }
+
+def available():
+    return _ast is not None
+
+def parseFile(path):
+    f = open(path, 'U')
+    try:
+        source = f.read() + '\n'
+    finally:
+        f.close()
+    return parse(source, path)
+
+def parse(source, filename='<string>'):
+    tree = compile(source, filename, 'exec', _ast.PyCF_ONLY_AST)
+    return Transformer(source).node(tree)
+
+def _docstring(body):
+    if body and isinstance(body[0], _ast.Expr) and \
+       isinstance(body[0].value, _ast.Str):
+        return body[0].value.s, body[1:]
+    return None, body
+
+def _start(node):
+    "the node holding the first token of an expression"
+    while isinstance(node, _ast.BinOp):
+        node = node.left
+    return node
+
+def _argname(arg):
+    if isinstance(arg, _ast.Tuple):
+        return tuple([_argname(a) for a in arg.elts])
+    return arg.id
+
+class Transformer:
+    "I turn _ast nodes into compiler.ast nodes"
+
+    def __init__(self, source):
+        self.source = source
+        self.lines = None
+        self._dispatch = {}
+
+    def node(self, node):
+        klass = node.__class__
+        try:
+            method = self._dispatch[klass]
+        except KeyError:
+            method = self._dispatch[klass] = getattr(self, klass.__name__)
+        return method(node)
+
+    def optional(self, node):
+        if node is None:
+            return None
+        return self.node(node)
+
+    def nodes(self, nodes):
+        return [self.node(n) for n in nodes]
+
+    def stmts(self, body):
+        return ast.Stmt(self.nodes(body))
+
+    def else_(self, body):
+        if not body:
+            return None
+        return self.stmts(body)
+
+    def line(self, lineno):
+        if self.lines is None:
+            self.lines = self.source.split('\n')
+        return self.lines[lineno - 1]
+
+    def before(self, node):
+        "the source character before the one a node starts at"
+        text = self.line(node.lineno)[:node.col_offset].rstrip()
+        return text[-1:]
+
+    def string_start(self, node):
+        """the line and column a string spanning lines starts at, for _ast
+        gives the line it ends on and no column"""
+        # the first quotes on the last line close the string
+        text = self.line(node.lineno)
+        double, single = text.find('"""'), text.find("'''")
+        if single >= 0 and not 0 <= double < single:
+            quote = "'''"
+        else:
+            quote = '"""'
+        lineno = node.lineno - 1
+        while lineno > 0:
+            text = self.line(lineno)
+            col = text.rfind(quote)
+            if col >= 0:
+                while col > 0 and text[col - 1] in 'uUrRbB':
+                    col = col - 1
+                return lineno, col
+            lineno = lineno - 1
+        return node.lineno, -1
+
+    def token_line(self, node, skip=' \t\f\\([{'):
+        """the line of the token before the first one of an expression,
+        passing over opening brackets"""
+        node = _start(node)
+        lineno, col = node.lineno, node.col_offset
+        if col < 0 and isinstance(node, _ast.Tuple) and node.elts:
+            # starting with a string spanning lines
+            return self.token_line(node.elts[0], skip)
+        if col < 0 and isinstance(node, _ast.Str):
+            lineno, col = self.string_start(node)
+        if col < 0:
+            return lineno
+        text = self.line(lineno)[:col].rstrip(skip)
+        while not text or text.lstrip().startswith('#'):
+            if lineno == 1:
+                return node.lineno
+            lineno = lineno - 1
+            text = self.line(lineno).rstrip(skip)
+        return lineno
+
+    def first_line(self, node):
+        "the line of the first token of an expression"
+        node = _start(node)
+        if isinstance(node, _ast.GeneratorExp):
+            return self.first_line(node.elt)
+        # _ast starts these after their opening bracket
+        if isinstance(node, (_ast.ListComp, _ast.SetComp, _ast.DictComp,
+                             _ast.Tuple)):
+            return self.token_line(node, ' \t\f\\')
+        return node.lineno
+
+    # --------------------------------------------------------------
+    # definitions
+
+    def Module(self, node):
+        doc, body = _docstring(node.body)
+        return ast.Module(doc, self.stmts(body))
+
+    def arguments(self, args):
+        if not (args.args or args.vararg or args.kwarg):
+            return (), (), 0
+        names = [_argname(a) for a in args.args]
+        flags = 0
+        if args.vararg:
+            names.append(args.vararg)
+            flags = flags | CO_VARARGS
+        if args.kwarg:
+            names.append(args.kwarg)
+            flags = flags | CO_VARKEYWORDS
+        return names, self.nodes(args.defaults), flags
+
+    def decorated(self, node):
+        "the decorators, and the line of the def or class they decorate"
+        if not node.decorator_list:
+            return None, node.lineno
+        decorators = ast.Decorators([self.decorator(d)
+                                     for d in node.decorator_list])
+        # _ast puts the definition on the line of its first decorator
+        lineno = node.decorator_list[-1].lineno
+        while 1:
+            words = self.line(lineno).split(None, 1)
+            if words and words[0] in ('def', 'class'):
+                return decorators, lineno
+            lineno = lineno + 1
+
+    def decorator(self, node):
+        if isinstance(node, _ast.Call):
+            return self.call(node, self.decorator(node.func))
+        if isinstance(node, _ast.Attribute):
+            return ast.Getattr(self.decorator(node.value), node.attr)
+        return ast.Name(node.id, lineno=node.lineno)
+
+    def FunctionDef(self, node):
+        decorators, lineno = self.decorated(node)
+        names, defaults, flags = self.arguments(node.args)
+        doc, body = _docstring(node.body)
+        return ast.Function(decorators, node.name, names, defaults, flags,
+                            doc, self.stmts(body), lineno=lineno)
+
+    def ClassDef(self, node):
+        decorators, lineno = self.decorated(node)
+        doc, body = _docstring(node.body)
+        return ast.Class(node.name, self.nodes(node.bases), doc,
+                         self.stmts(body), decorators, lineno=lineno)
+
+    def Lambda(self, node):
+        names, defaults, flags = self.arguments(node.args)
+        return ast.Lambda(names, defaults, flags, self.node(node.body),
+                          lineno=node.lineno)
+
+    # --------------------------------------------------------------
+    # statements
+
+    def Return(self, node):
+        if node.value is None:
+            return ast.Return(ast.Const(None), lineno=node.lineno)
+        return ast.Return(self.node(node.value), lineno=node.lineno)
+
+    def Delete(self, node):
+        targets = [self.assign(t, OP_DELETE) for t in node.targets]
+        if len(targets) == 1:
+            return targets[0]
+        return ast.AssTuple(targets, lineno=targets[0].lineno)
+
+    def Assign(self, node):
+        # numbered after the first =
+        after = (node.targets[1:] or [node.value])[0]
+        return ast.Assign([self.assign(t, OP_ASSIGN) for t in node.targets],
+                          self.node(node.value),
+                          lineno=self.token_line(after))
+
+    def AugAssign(self, node):
+        return ast.AugAssign(self.node(node.target),
+                             _AUGMENTED[node.op.__class__.__name__],
+                             self.node(node.value),
+                             lineno=self.token_line(node.value))
+
+    def Print(self, node):
+        if node.nl:
+            klass = ast.Printnl
+        else:
+            klass = ast.Print
+        return klass(self.nodes(node.values), self.optional(node.dest),
+                     lineno=node.lineno)
+
+    def For(self, node):
+        return ast.For(self.assign(node.target, OP_ASSIGN),
+                       self.node(node.iter), self.stmts(node.body),
+                       self.else_(node.orelse), lineno=node.lineno)
+
+    def While(self, node):
+        return ast.While(self.node(node.test), self.stmts(node.body),
+                         self.else_(node.orelse), lineno=node.lineno)
+
+    def If(self, node):
+        lineno = node.lineno
+        tests = []
+        while 1:
+            tests.append((self.node(node.test), self.stmts(node.body)))
+            orelse = node.orelse
+            # compiler keeps elif clauses in the same node
+            if len(orelse) == 1 and isinstance(orelse[0], _ast.If) and \
+               self.line(orelse[0].lineno).lstrip().startswith('elif'):
+                node = orelse[0]
+            else:
+                break
+        return ast.If(tests, self.else_(orelse), lineno=lineno)
+
+    def With(self, node, lineno=None):
+        if lineno is None:
+            lineno = node.lineno
+        body = node.body
+        # with a, b: nests a node for b in the one for a
+        if len(body) == 1 and isinstance(body[0], _ast.With) and \
+           (body[0].lineno == node.lineno or
+            not self.line(body[0].lineno).lstrip().startswith('with')):
+            code = self.With(body[0], lineno)
+        else:
+            code = self.stmts(body)
+        return ast.With(self.node(node.context_expr),
+                        self.optional_assign(node.optional_vars), code,
+                        lineno=lineno)
+
+    def Raise(self, node):
+        return ast.Raise(self.optional(node.type), self.optional(node.inst),
+                         self.optional(node.tback), lineno=node.lineno)
+
+    def TryExcept(self, node):
+        handlers = []
+        for h in node.handlers:
+            handlers.append((self.optional(h.type),
+                             self.optional_assign(h.name),
+                             self.stmts(h.body)))
+        return ast.TryExcept(self.stmts(node.body), handlers,
+                             self.else_(node.orelse), lineno=node.lineno)
+
+    def TryFinally(self, node):
+        body = node.body
+        # try: except: finally: puts the node for the except in this one
+        if len(body) == 1 and isinstance(body[0], _ast.TryExcept) and \
+           body[0].lineno == node.lineno:
+            code = self.node(body[0])
+        else:
+            code = self.stmts(body)
+        return ast.TryFinally(code, self.stmts(node.finalbody),
+                              lineno=node.lineno)
+
+    def Assert(self, node):
+        return ast.Assert(self.node(node.test), self.optional(node.msg),
+                          lineno=node.lineno)
+
+    def Import(self, node):
+        return ast.Import([(a.name, a.asname) for a in node.names],
+                          lineno=node.lineno)
+
+    def ImportFrom(self, node):
+        return ast.From(node.module or '',
+                        [(a.name, a.asname) for a in node.names],
+                        node.level, lineno=node.lineno)
+
+    def Exec(self, node):
+        # compiler keeps the tuple of exec (code, globals)
+        if node.globals is not None and node.globals.col_offset >= 0 and \
+           self.before(node.globals) == ',':
+            items = [node.body, node.globals]
+            if node.locals is not None:
+                items.append(node.locals)
+            tuple = ast.Tuple(self.nodes(items),
+                              lineno=self.token_line(node.globals))
+            return ast.Exec(tuple, None, None, lineno=node.lineno)
+        return ast.Exec(self.node(node.body), self.optional(node.globals),
+                        self.optional(node.locals), lineno=node.lineno)
+
+    def Global(self, node):
+        return ast.Global(node.names, lineno=node.lineno)
+
+    def Expr(self, node):
+        expr = self.node(node.value)
+        return ast.Discard(expr, lineno=expr.lineno)
+
+    def Pass(self, node):
+        return ast.Pass(lineno=node.lineno)
+
+    def Break(self, node):
+        return ast.Break(lineno=node.lineno)
+
+    def Continue(self, node):
+        return ast.Continue(lineno=node.lineno)
+
+    # --------------------------------------------------------------
+    # targets of assignments
+
+    def optional_assign(self, node):
+        if node is None:
+            return None
+        return self.assign(node, OP_ASSIGN)
+
+    def assign(self, node, flags):
+        if isinstance(node, _ast.Name):
+            return ast.AssName(node.id, flags, lineno=node.lineno)
+        if isinstance(node, _ast.Attribute):
+            return ast.AssAttr(self.node(node.value), node.attr, flags,
+                               lineno=node.lineno)
+        if isinstance(node, _ast.Subscript):
+            return self.subscript(node, flags)
+        targets = [self.assign(e, flags) for e in node.elts]
+        if isinstance(node, _ast.List):
+            return ast.AssList(targets, lineno=node.lineno)
+        return ast.AssTuple(targets, lineno=node.lineno)
+
+    # --------------------------------------------------------------
+    # expressions
+
+    def BoolOp(self, node):
+        return _BOOLEAN[node.op.__class__.__name__](
+            self.nodes(node.values),
+            lineno=self.token_line(node.values[1]))
+
+    def BinOp(self, node):
+        name = node.op.__class__.__name__
+        try:
+            klass = _BITWISE[name]
+        except KeyError:
+            left = self.node(node.left)
+            group = _GROUPS.get(name)
+            if group and isinstance(node.left, _ast.BinOp) and \
+               _GROUPS.get(node.left.op.__class__.__name__) == group:
+                lineno = left.lineno
+            else:
+                lineno = self.token_line(node.right)
+            return _BINARY[name]([left, self.node(node.right)],
+                                 lineno=lineno)
+        right = [node.right]
+        left = node.left
+        while isinstance(left, _ast.BinOp) and \
+              left.op.__class__ is node.op.__class__:
+            right.append(left.right)
+            left = left.left
+        right.append(left)
+        right.reverse()
+        return klass(self.nodes(right), lineno=self.token_line(right[1]))
+
+    def UnaryOp(self, node):
+        return _UNARY[node.op.__class__.__name__](self.node(node.operand),
+                                                 lineno=node.lineno)
+
+    def IfExp(self, node):
+        return ast.IfExp(self.node(node.test), self.node(node.body),
+                         self.node(node.orelse),
+                         lineno=self.token_line(node.test))
+
+    def Dict(self, node):
+        items = zip(self.nodes(node.keys), self.nodes(node.values))
+        if items:
+            return ast.Dict(items, lineno=items[0][0].lineno)
+        return ast.Dict((), lineno=node.lineno)
+
+    def Set(self, node):
+        items = self.nodes(node.elts)
+        return ast.Set(items, lineno=items[0].lineno)
+
+    def comprehension(self, generators):
+        quals = []
+        for g in generators:
+            assign = self.assign(g.target, OP_ASSIGN)
+            ifs = [ast.ListCompIf(self.node(test),
+                                  lineno=self.token_line(test))
+                   for test in g.ifs]
+            qual = ast.ListCompFor(assign, self.node(g.iter), ifs)
+            qual.lineno = self.token_line(g.target)
+            quals.append(qual)
+        return quals
+
+    def ListComp(self, node):
+        quals = self.comprehension(node.generators)
+        return ast.ListComp(self.node(node.elt), quals,
+                            lineno=quals[0].lineno)
+
+    def SetComp(self, node):
+        quals = self.comprehension(node.generators)
+        return ast.SetComp(self.node(node.elt), quals,
+                           lineno=quals[0].lineno)
+
+    def DictComp(self, node):
+        quals = self.comprehension(node.generators)
+        return ast.DictComp(self.node(node.key), self.node(node.value),
+                            quals, lineno=quals[0].lineno)
+
+    def GeneratorExp(self, node):
+        fors = []
+        for g in node.generators:
+            assign = self.assign(g.target, OP_ASSIGN)
+            ifs = [ast.GenExprIf(self.node(test),
+                                 lineno=self.token_line(test))
+                   for test in g.ifs]
+            fors.append(ast.GenExprFor(assign, self.node(g.iter), ifs,
+                                       lineno=self.token_line(g.target)))
+        fors[0].is_outmost = True
+        return ast.GenExpr(ast.GenExprInner(self.node(node.elt), fors),
+                           lineno=fors[0].lineno)
+
+    def Yield(self, node):
+        if node.value is None:
+            return ast.Yield(ast.Const(None), lineno=node.lineno)
+        return ast.Yield(self.node(node.value), lineno=node.lineno)
+
+    def Compare(self, node):
+        ops = [_COMPARE[op.__class__.__name__] for op in node.ops]
+        # numbered after the last operator
+        return ast.Compare(self.node(node.left),
+                           zip(ops, self.nodes(node.comparators)),
+                           lineno=self.token_line(node.comparators[-1]))
+
+    def call(self, node, func):
+        args = self.nodes(node.args)
+        for k in node.keywords:
+            args.append(ast.Keyword(k.arg, self.node(k.value),
+                                    lineno=self.token_line(k.value)))
+        # numbered after the first token of the arguments
+        if node.args:
+            lineno = self.first_line(node.args[0])
+        elif args:
+            lineno = args[0].lineno
+        elif node.starargs or node.kwargs:
+            lineno = self.token_line(node.starargs or node.kwargs)
+        else:
+            lineno = node.lineno
+        return ast.CallFunc(func, args, self.optional(node.starargs),
+                            self.optional(node.kwargs), lineno=lineno)
+
+    def Call(self, node):
+        return self.call(node, self.node(node.func))
+
+    def Repr(self, node):
+        return ast.Backquote(self.node(node.value))
+
+    def Num(self, node):
+        # _ast folds the sign into negative numbers
+        if self.line(node.lineno)[node.col_offset] == '-':
+            value = -node.n
+            if isinstance(value, complex):
+                # the literal is imaginary, without the -0 real part
+                value = complex(0, value.imag)
+            return ast.UnarySub(ast.Const(value, lineno=node.lineno),
+                                lineno=node.lineno)
+        return ast.Const(node.n, lineno=node.lineno)
+
+    def Str(self, node):
+        return ast.Const(node.s, lineno=node.lineno)
+
+    def Attribute(self, node):
+        return ast.Getattr(self.node(node.value), node.attr,
+                           lineno=node.lineno)
+
+    def Subscript(self, node):
+        return self.subscript(node, OP_APPLY)
+
+    def Name(self, node):
+        return ast.Name(node.id, lineno=node.lineno)
+
+    def List(self, node):
+        items = self.nodes(node.elts)
+        if items:
+            return ast.List(items, lineno=items[0].lineno)
+        return ast.List((), lineno=node.lineno)
+
+    def Tuple(self, node):
+        # numbered after the first comma
+        lineno = node.lineno
+        if len(node.elts) > 1:
+            lineno = self.token_line(node.elts[1])
+        return ast.Tuple(self.nodes(node.elts) or (), lineno=lineno)
+
+    # --------------------------------------------------------------
+    # subscripts
+
+    def subscript(self, node, flags):
+        expr = self.node(node.value)
+        s = node.slice
+        # numbered after the first token of the subscript
+        lineno = self.slice_line(s, node.lineno)
+        if isinstance(s, _ast.Slice) and s.step is None:
+            return ast.Slice(expr, flags, self.optional(s.lower),
+                             self.optional(s.upper), lineno=lineno)
+        if isinstance(s, _ast.ExtSlice):
+            subs = [self.slice_item(d, lineno) for d in s.dims]
+        elif isinstance(s, _ast.Index) and \
+             isinstance(s.value, _ast.Tuple) and s.value.elts and \
+             self.before(s.value) != '(':
+            subs = self.nodes(s.value.elts)
+        else:
+            subs = [self.slice_item(s, lineno)]
+        return ast.Subscript(expr, flags, subs, lineno=lineno)
+
+    def slice_line(self, node, lineno):
+        if isinstance(node, _ast.ExtSlice):
+            node = node.dims[0]
+        if isinstance(node, _ast.Index):
+            return _start(node.value).lineno
+        if isinstance(node, _ast.Slice):
+            if node.lower is not None:
+                return _start(node.lower).lineno
+            if node.upper is not None:
+                return self.token_line(node.upper)
+        return lineno
+
+    def slice_item(self, node, lineno):
+        if isinstance(node, _ast.Index):
+            return self.node(node.value)
+        if isinstance(node, _ast.Ellipsis):
+            return ast.Ellipsis()
+        items = [self.optional(node.lower) or ast.Const(None),
+                 self.optional(node.upper) or ast.Const(None)]
+        step = node.step
+        if step is not None:
+            # a[i:j:] has a step made up by _ast, at the second colon
+            if isinstance(step, _ast.Name) and step.id == 'None' and \
+               self.line(step.lineno)[step.col_offset] == ':':
+                items.append(ast.Const(None))
+            else:
+                items.append(self.node(step))
+        return ast.Sliceobj(items, lineno=self.slice_line(node, lineno))
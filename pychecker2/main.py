@@ -3,8 +3,10 @@ from os.path import dirname, realpath
 sys.path.append(dirname(dirname(realpath(sys.argv[0]))))
 
 from pychecker2.Check import CheckList
+from pychecker2.Cache import Cache
 
 from pychecker2 import Options
+from pychecker2 import Jobs
 from pychecker2 import ParseChecks
 from pychecker2 import OpChecks
 from pychecker2 import VariableChecks
@@ -16,8 +18,6 @@ from pychecker2 import ReturnChecks
 from pychecker2 import ConditionalChecks
 from pychecker2 import FormatStringChecks
 
-CACHE_FILE = '/tmp/t'
-
 def print_warnings(f, out):
     if not f.warnings:
         return 0
@@ -37,17 +37,18 @@ def print_warnings(f, out):
 
 def create_checklist(options):
 
+    # the checks walking the whole tree come first, to share one walk
     checks = [ ParseChecks.ParseCheck(),
                OpChecks.OpCheck(),
                OpChecks.ExceptCheck(),
                OpChecks.CompareCheck(),
-               ReachableChecks.ReachableCheck(),
                ConditionalChecks.ConstantCheck(),
-               ClassChecks.ReprCheck(),
                ImportChecks.ImportCheck(),
+               VariableChecks.UnpackCheck(),
+               ReachableChecks.ReachableCheck(),
+               ClassChecks.ReprCheck(),
                FormatStringChecks.FormatStringCheck(),
                VariableChecks.ShadowCheck(),
-               VariableChecks.UnpackCheck(),
                VariableChecks.UnusedCheck(),
                VariableChecks.UnknownCheck(),
                VariableChecks.SelfCheck(),
@@ -64,13 +65,8 @@ def create_checklist(options):
     return CheckList(checks)
 
 def main():
-    import cPickle
-    
     options = Options.Options()
-    try:
-        checker = cPickle.load(open(CACHE_FILE, 'rb'))
-    except (EOFError, IOError):
-        checker = create_checklist(options)
+    checker = create_checklist(options)
 
     try:
         files = options.process_options(sys.argv[1:])
@@ -79,10 +75,20 @@ def main():
         options.usage(sys.argv[0], sys.stderr)
         return 1
 
-    for f in files:
-        checker.check_file(f)
-        if options.incremental and not options.profile:
-            print_warnings(f, sys.stdout)
+    if options.cache:
+        checker.cache = Cache(options.cache, options, checker.checks)
+
+    try:
+        jobs = int(options.jobs)
+    except ValueError:
+        print >> sys.stderr, "Error: --jobs takes a number, not %s" % \
+              options.jobs
+        return 1
+
+    report = None
+    if options.incremental and not options.profile:
+        report = lambda f: print_warnings(f, sys.stdout)
+    Jobs.check_files(checker, files, options, jobs, report)
 
     result = 0
     if not options.incremental and not options.profile:
@@ -93,10 +99,6 @@ def main():
         if not result and options.verbose:
             print >>sys.stdout, None
 
-    fp = open(CACHE_FILE, 'wb')
-    cPickle.dump(checker, fp, 1)
-    fp.close()
-
     return result
 
 if __name__ == "__main__":
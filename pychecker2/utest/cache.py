@@ -0,0 +1,42 @@
+from pychecker2.TestSupport import WarningTester
+from pychecker2.Cache import Cache
+from pychecker2.File import File
+from pychecker2 import VariableChecks
+
+import os
+import shutil
+import tempfile
+
+class CacheTestCase(WarningTester):
+    def setUp(self):
+        WarningTester.setUp(self)
+        self.directory = tempfile.mkdtemp()
+        self.fname = os.path.join(self.directory, 'cached.py')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def check(self, data):
+        fp = open(self.fname, 'w')
+        fp.write(data)
+        fp.close()
+        cache = Cache(os.path.join(self.directory, 'cache'),
+                      self.options, self.checklist.checks)
+        self.checklist.cache = cache
+        f = File(self.fname)
+        self.checklist.check_file(f)
+        return f, cache
+
+    def testReplay(self):
+        f, cache = self.check('def f(i, j): return i * 2\n')
+        self.warning_file(f, 1, VariableChecks.UnusedCheck.unused, 'j')
+
+        f, cache = self.check('def f(i, j): return i * 2\n')
+        self.assert_(cache.load(File(self.fname)))
+        self.warning_file(f, 1, VariableChecks.UnusedCheck.unused, 'j')
+        self.assert_(f.warnings[0][1] is VariableChecks.UnusedCheck.unused)
+
+    def testChanged(self):
+        self.check('def f(i, j): return i * 2\n')
+        f, cache = self.check('def f(i, j): return i * j\n')
+        self.assertEqual(len(f.warnings), 0)
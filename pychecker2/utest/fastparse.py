@@ -0,0 +1,65 @@
+from pychecker2 import fastparse
+
+import compiler
+import unittest
+
+_SOURCE = '''"""doc"""
+import os, sys as system
+from os.path import join as j, split
+@staticmethod
+@property
+def f(a, (b, c)=(1, 2), *args, **kw):
+    "f"
+    global g
+    x = y = a + b - c * -1 ** 2
+    x += a | b | c
+    del x[1:2], y.z
+    print >> sys.stderr, a, b,
+    return [i for i in args if i if not i] or \\
+           (a and
+            b)
+class C(object, os.Base):
+    def m(self): yield self
+lambda x, y=1: (x, y)
+for i, k in {1: 2}.items():
+    if i < k <= 3 is not None: pass
+    elif i in []: break
+    else: continue
+else:
+    exec "x" in {}, {}
+while 1:
+    try:
+        raise ValueError, "v"
+    except (ValueError, TypeError), e:
+        assert e, `e`
+    finally:
+        pass
+with open(__file__) as h, open(__file__):
+    h.read()[::2]
+    h[1, ...]
+x = dict(
+    (a, b) for a, b in []
+)
+s = ("""a
+""" % (1,), u'b' 'c')
+'''
+
+def _flatten(node, result):
+    result.append((node.__class__.__name__, node.lineno))
+    for child in node.getChildNodes():
+        _flatten(child, result)
+    return result
+
+class FastParseTestCase(unittest.TestCase):
+    def testSameAsCompiler(self):
+        if not fastparse.available():
+            return
+        expected = compiler.parse(_SOURCE)
+        tree = fastparse.parse(_SOURCE)
+        self.assertEqual(repr(tree), repr(expected))
+        self.assertEqual(_flatten(tree, []), _flatten(expected, []))
+
+    def testSyntaxError(self):
+        if not fastparse.available():
+            return
+        self.assertRaises(SyntaxError, fastparse.parse, '===\n')
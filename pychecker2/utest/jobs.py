@@ -0,0 +1,44 @@
+from pychecker2.TestSupport import WarningTester
+from pychecker2.File import File
+from pychecker2 import Jobs
+from pychecker2 import VariableChecks
+
+import os
+import shutil
+import tempfile
+
+class JobsTestCase(WarningTester):
+    def setUp(self):
+        WarningTester.setUp(self)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, data):
+        fname = os.path.join(self.directory, name)
+        fp = open(fname, 'w')
+        fp.write(data)
+        fp.close()
+        return fname
+
+    def check(self, jobs):
+        names = [self.write('jobs%d.py' % i,
+                            'def f(i, j%d): return i * 2\n' % i)
+                 for i in range(3)]
+        files = [File(name) for name in names]
+        reported = []
+        Jobs.check_files(self.checklist, files, self.options, jobs,
+                         reported.append)
+        self.assertEqual(reported, files)
+        return files
+
+    def testSameAsSerial(self):
+        serial = self.check(1)
+        parallel = self.check(2)
+        self.assert_(self.checklist.cache is None)
+        for s, p in zip(serial, parallel):
+            self.assertEqual(s.warnings, p.warnings)
+        for i in range(3):
+            self.warning_file(parallel[i], 1,
+                              VariableChecks.UnusedCheck.unused, 'j%d' % i)
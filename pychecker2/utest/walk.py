@@ -0,0 +1,35 @@
+from pychecker2.util import BaseVisitor, walk_together
+
+import compiler
+import unittest
+
+class Names(BaseVisitor):
+    def __init__(self):
+        self.result = []
+
+    def visitName(self, node):
+        self.result.append(node.name)
+
+    # don't descend into other scopes
+    def visitFunction(self, node): pass
+
+class Calls(BaseVisitor):
+    def __init__(self):
+        self.result = []
+
+    def visitCallFunc(self, node):
+        self.result.append(node.node.name)
+        self.visitChildren(node)
+
+class WalkTestCase(unittest.TestCase):
+    def testSameAsWalk(self):
+        tree = compiler.parse('a = b(c(d))\n'
+                              'def f(x): return e(x)\n'
+                              'g(f)\n')
+        fused = [Names(), Calls()]
+        walk_together(tree, fused)
+        for visitor in fused:
+            alone = compiler.walk(tree, visitor.__class__())
+            self.assertEqual(visitor.result, alone.result)
+        self.assertEqual(fused[0].result, ['b', 'c', 'd', 'g', 'f'])
+        self.assertEqual(fused[1].result, ['b', 'c', 'e', 'g'])
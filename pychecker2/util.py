@@ -9,6 +9,41 @@ class BaseVisitor:
         for c in n.getChildNodes():
             self.visit(c)     
 
+def walk_together(tree, visitors):
+    """walk tree once for all the visitors, calling each one as
+    compiler.walk would: a node with a visit method for its class is
+    passed to it, and its children are left to the method, others are
+    descended into"""
+    from compiler.visitor import ASTVisitor
+
+    # visit methods by visitor, by node class
+    methods = []
+    for visitor in visitors:
+        # the methods walk the nodes they descend into on their own
+        walker = ASTVisitor()
+        walker.visitor = visitor
+        visitor.visit = walker.dispatch
+        methods.append((visitor, {}))
+
+    def visit(node, methods):
+        klass = node.__class__
+        descend = []
+        for visitor, cache in methods:
+            try:
+                method = cache[klass]
+            except KeyError:
+                method = cache[klass] = \
+                         getattr(visitor, 'visit' + klass.__name__, None)
+            if method is None:
+                descend.append((visitor, cache))
+            else:
+                method(node)
+        if descend:
+            for child in node.getChildNodes():
+                visit(child, descend)
+
+    visit(tree, methods)
+
 def try_if_exclusive(stmt_node1, stmt_node2):
     from compiler import ast as ast
     
@@ -0,0 +1,441 @@
+# -*- Mode: Python -*-
+# vi:si:et:sw=4:sts=4:ts=4
+
+"""
+Benchmark pychecker and pychecker2.
+
+Run this from the main directory as python scripts/benchmark.py
+
+Each checker is run over each corpus in a separate process, so the peak
+RSS reported is that of a single run.  pychecker2-fastparse is
+pychecker2 run with --fastParse, parsing with the builtin _ast module.
+The corpora are the files in test_input/, the files in pychecker2/tests/
+and a generated corpus of modules importing each other.
+
+For every run the wall time, the peak RSS, the number of bytecode
+instructions checked per second and the time spent in each phase are
+reported.  Time spent in a phase does not include the time spent in the
+phases it calls; the time spent outside all phases is reported as other.
+Use --json to write the results out so they can be compared over time.
+
+A file the checker raises an exception for is counted as an error and
+the run goes on with the next one; a run with errors is marked as failed,
+since its timings do not cover the whole corpus.
+
+The start-up latency is reported too: how much longer than the bare
+interpreter it takes to import pychecker and to print its usage.
+"""
+
+import os
+import sys
+import glob
+import time
+import shutil
+import tempfile
+import optparse
+import subprocess
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHECKERS = ('pychecker', 'pychecker2', 'pychecker2-fastparse')
+CORPORA = ('test_input', 'pychecker2_tests', 'generated')
+
+_MODULE_TEMPLATE = '''"""Generated benchmark module %(index)d."""
+
+import os
+%(imports)s
+CONSTANT_%(index)d = %(index)d
+
+def function_%(index)d(a, b=None, *args):
+    total = 0
+    for item in range(a):
+        if item %% 3 == 0:
+            total = total + item
+        elif b is not None:
+            total = total - len(args)
+    unused = os.path.join('a', 'b')
+    return %(result)s
+
+class Base%(index)d:
+    def __init__(self, value):
+        self.value = value
+
+    def method(self, other):
+        return self.value + other
+
+class Derived%(index)d(Base%(index)d):
+    def __init__(self, value):
+        Base%(index)d.__init__(self, value)
+        self.extra = [x * 2 for x in range(value)]
+
+    def method(self, other):
+        try:
+            return Base%(index)d.method(self, other) / self.missing
+        except ZeroDivisionError:
+            return None
+'''
+
+def generateCorpus(directory, count):
+    """
+    Write count modules to the given directory, each but the first
+    importing one written before it.
+
+    @rtype: list of str
+    """
+    files = []
+    for index in range(count):
+        values = { 'index': index, 'imports': '', 'result': 'total' }
+        if index:
+            # import along a binary tree, to keep the import chains short
+            parent = (index - 1) / 2
+            values['imports'] = 'import corpus_%05d\n' % parent
+            values['result'] = 'corpus_%05d.function_%d(total)' % (
+                parent, parent)
+        filename = os.path.join(directory, 'corpus_%05d.py' % index)
+        handle = open(filename, 'w')
+        handle.write(_MODULE_TEMPLATE % values)
+        handle.close()
+        files.append(filename)
+    return files
+
+def _corpusFiles(corpus, count):
+    """
+    @returns: the files in the corpus, and the directory to remove after
+              the run, if any
+    @rtype:   tuple of (list of str, str or None)
+    """
+    if corpus == 'test_input':
+        files = glob.glob(os.path.join(ROOT, 'test_input', '*.py'))
+    elif corpus == 'pychecker2_tests':
+        files = glob.glob(os.path.join(ROOT, 'pychecker2', 'tests', '*.py'))
+        # badparse.py is there to fail parsing
+        files = [f for f in files
+                 if os.path.basename(f) not in ('__init__.py', 'badparse.py')]
+    else:
+        directory = tempfile.mkdtemp(prefix='pychecker-benchmark-')
+        return generateCorpus(directory, count), directory
+    files.sort()
+    return files, None
+
+
+class _PhaseTimer:
+    """
+    I time calls to functions, charging the time spent in a nested call
+    to the phase of the innermost function only.
+    """
+
+    def __init__(self):
+        self.seconds = {}
+        self.calls = {}
+        self.ops = 0
+        self._stack = []
+
+    def _enter(self, phase):
+        now = time.time()
+        if self._stack:
+            parent, start = self._stack[-1]
+            self.seconds[parent] = self.seconds.get(parent, 0.0) + now - start
+        self._stack.append([phase, now])
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+
+    def _leave(self):
+        now = time.time()
+        phase, start = self._stack.pop()
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + now - start
+        if self._stack:
+            self._stack[-1][1] = now
+
+    def wrap(self, owner, name, phase, countOps=None):
+        """
+        Time calls to the given attribute of owner as the given phase.
+
+        @param countOps: called with the arguments of every call, returns
+                         the number of instructions the call checks
+        """
+        original = getattr(owner, name)
+        def timed(*args, **kwargs):
+            if countOps is not None:
+                self.ops = self.ops + countOps(*args, **kwargs)
+            self._enter(phase)
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self._leave()
+        setattr(owner, name, timed)
+
+    def phases(self):
+        result = {}
+        for phase, seconds in self.seconds.items():
+            result[phase] = { 'seconds': seconds,
+                              'calls': self.calls.get(phase, 0) }
+        return result
+
+
+def _checkEach(files, check, errors):
+    """
+    Call check with each file, adding the error for each file it raises
+    an exception for to errors.
+
+    @type  files: list of str or of L{pychecker2.File.File}
+
+    @rtype: int
+    @returns: the number of warnings check returned
+    """
+    count = 0
+    for f in files:
+        try:
+            count = count + check(f)
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception, e:
+            errors.append('%s: %s: %s' % (
+                os.path.basename(getattr(f, 'name', f)),
+                e.__class__.__name__, e))
+    return count
+
+def _runPychecker(files, timer, errors):
+    from pychecker import Config
+    from pychecker import check
+    from pychecker import warn
+
+    timer.wrap(check, 'processFiles', 'load')
+    timer.wrap(check, 'fixupBuiltinModules', 'builtins')
+    timer.wrap(warn, '_checkCode', 'dispatch',
+        lambda code, codeSource: len(code.instructions))
+    timer.wrap(warn, '_findClassWarnings', 'classes')
+    timer.wrap(warn, 'filterWarnings', 'filter')
+
+    cfg = Config.Config()
+    cfg.quiet = 1
+    cfg.limit = 0
+    return _checkEach(files,
+        lambda filename, check=check, cfg=cfg:
+            len(check._check([filename], cfg=cfg)),
+        errors)
+
+def _runPychecker2(files, timer, errors, args=()):
+    from pychecker2 import main
+    from pychecker2 import Options
+    from pychecker2 import util
+
+    options = Options.Options()
+    checklist = main.create_checklist(options)
+    for checker in checklist.checks:
+        timer.wrap(checker, 'check', str(checker))
+    # the checks walking the tree together do not call check
+    timer.wrap(util, 'walk_together', 'walk')
+
+    def check(f, checklist=checklist):
+        checklist.check_file(f)
+        return len(f.warnings)
+    return _checkEach(
+        options.process_options(['--cache', ''] + list(args) + files),
+        check, errors)
+
+def _peakRSS():
+    "peak resident set size of this process in kB, or None"
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        # reported in bytes instead of kB
+        rss = rss / 1024
+    return rss
+
+def runOne(checker, corpus, count):
+    """
+    Run a checker over a corpus in this process.
+
+    @rtype: dict
+    """
+    files, directory = _corpusFiles(corpus, count)
+    result = { 'checker': checker, 'corpus': corpus, 'files': len(files) }
+
+    sys.path.insert(0, ROOT)
+    timer = _PhaseTimer()
+    # the modules checked can print when they are imported
+    stdout = sys.stdout
+    devnull = open(os.devnull, 'w')
+    sys.stdout = devnull
+    errors = []
+    start = time.time()
+    try:
+        try:
+            if checker == 'pychecker':
+                result['warnings'] = _runPychecker(files, timer, errors)
+            elif checker == 'pychecker2':
+                result['warnings'] = _runPychecker2(files, timer, errors)
+            else:
+                result['warnings'] = _runPychecker2(files, timer, errors,
+                                                    ['--fastParse'])
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception, e:
+            result['error'] = '%s: %s' % (e.__class__.__name__, e)
+    finally:
+        wall = time.time() - start
+        sys.stdout = stdout
+        devnull.close()
+        if directory is not None:
+            shutil.rmtree(directory)
+
+    result['errors'] = errors
+    result['failed'] = bool(errors) or 'error' in result
+    result['wall'] = wall
+    result['peak_rss_kb'] = _peakRSS()
+    result['phases'] = timer.phases()
+    result['phases']['other'] = { 'seconds': wall - sum(timer.seconds.values()),
+                                  'calls': 1 }
+    result['ops'] = timer.ops
+    dispatch = timer.seconds.get('dispatch')
+    if dispatch:
+        result['ops_per_sec'] = timer.ops / dispatch
+    else:
+        result['ops_per_sec'] = None
+    return result
+
+def runAll(checkers, corpora, count):
+    results = []
+    for checker in checkers:
+        for corpus in corpora:
+            command = [sys.executable, os.path.abspath(__file__),
+                       '--run-one', '--checker', checker,
+                       '--corpus', corpus, '--modules', str(count)]
+            process = subprocess.Popen(command, stdout=subprocess.PIPE,
+                cwd=ROOT)
+            output = process.communicate()[0]
+            try:
+                results.append(json.loads(output))
+            except ValueError:
+                results.append({ 'checker': checker, 'corpus': corpus,
+                                 'error': 'exit status %d' % process.returncode,
+                                 'failed': True })
+    return results
+
+# what is started to measure the start-up latency, with the arguments
+# to python
+_STARTUP_COMMANDS = (
+    ('import', ['-c', 'import pychecker.checker']),
+    ('help', [os.path.join('pychecker', 'checker.py'), '--help']),
+)
+
+def _fastestStart(args, env, runs=3):
+    devnull = open(os.devnull, 'w')
+    best = None
+    try:
+        for i in range(runs):
+            start = time.time()
+            subprocess.call([sys.executable] + args, env=env, cwd=ROOT,
+                            stdout=devnull, stderr=devnull)
+            seconds = time.time() - start
+            if best is None or seconds < best:
+                best = seconds
+    finally:
+        devnull.close()
+    return best
+
+def measureStartup():
+    """
+    Time starting python bare, and importing pychecker or printing its
+    usage, taking the fastest of a few starts of each.
+
+    @returns: the seconds each took longer than starting python bare, and
+              the seconds that took as bare
+    @rtype:   dict of str -> float
+    """
+    env = os.environ.copy()
+    env['PYTHONPATH'] = ROOT
+    env.pop('PYCHECKER', None)
+    env.pop('PYCHECKER_DISABLED', None)
+    bare = _fastestStart(['-c', 'pass'], env)
+    result = { 'bare': bare }
+    for name, args in _STARTUP_COMMANDS:
+        result[name] = _fastestStart(args, env) - bare
+    return result
+
+def printStartup(startup, stream):
+    stream.write('start-up: bare python %.3fs' % startup['bare'])
+    for name, args in _STARTUP_COMMANDS:
+        stream.write(', %s +%.3fs' % (name, startup[name]))
+    stream.write('\n')
+
+def printResults(results, stream):
+    for result in results:
+        stream.write('%s on %s (%s files)' % (
+            result['checker'], result['corpus'], result.get('files', '?')))
+        if result.get('failed'):
+            stream.write(' FAILED')
+        stream.write('\n')
+        if 'error' in result:
+            stream.write('  error: %s\n' % result['error'])
+        errors = result.get('errors', [])
+        if errors:
+            stream.write('  %d files raised errors, the timings do not '
+                         'cover them:\n' % len(errors))
+            for error in errors:
+                stream.write('    %s\n' % error)
+        if 'wall' not in result:
+            continue
+        stream.write('  wall %.3fs, peak rss %s kB' % (
+            result['wall'], result['peak_rss_kb']))
+        if result['ops_per_sec']:
+            stream.write(', %d instructions/s' % result['ops_per_sec'])
+        stream.write('\n')
+        phases = result['phases'].items()
+        phases.sort(lambda a, b: cmp(b[1]['seconds'], a[1]['seconds']))
+        for phase, info in phases:
+            stream.write('  %-20s %8.3fs %8d calls\n' % (
+                phase, info['seconds'], info['calls']))
+
+def main(argv):
+    parser = optparse.OptionParser(usage='%prog [options]')
+    parser.add_option('--checker', action='append', choices=CHECKERS,
+        help='checker to run; can be repeated (default: all)')
+    parser.add_option('--corpus', action='append', choices=CORPORA,
+        help='corpus to check; can be repeated (default: all)')
+    parser.add_option('--modules', type='int', default=2000,
+        help='number of modules in the generated corpus')
+    parser.add_option('--json', metavar='FILE',
+        help='write the results as JSON to FILE ("-" for stdout)')
+    parser.add_option('--run-one', action='store_true',
+        help=optparse.SUPPRESS_HELP)
+    options, args = parser.parse_args(argv[1:])
+
+    checkers = options.checker or list(CHECKERS)
+    corpora = options.corpus or list(CORPORA)
+
+    if options.run_one:
+        result = runOne(checkers[0], corpora[0], options.modules)
+        sys.stdout.write(json.dumps(result))
+        return 0
+
+    results = runAll(checkers, corpora, options.modules)
+    startup = measureStartup()
+    report = {
+        'time': time.time(),
+        'python': sys.version,
+        'startup': startup,
+        'results': results,
+    }
+
+    if options.json == '-':
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        printStartup(startup, sys.stdout)
+        printResults(results, sys.stdout)
+        if options.json:
+            handle = open(options.json, 'w')
+            json.dump(report, handle, indent=2)
+            handle.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,58 @@
+# -*- Mode: Python -*-
+# vi:si:et:sw=4:sts=4:ts=4
+
+"""
+Write a database of library signatures for pychecker's --signatures.
+
+Run this from the main directory as
+    python scripts/signatures.py --stdlib -o stdlib.sig [module ...]
+
+The database describes the modules given, and with --stdlib the builtin
+modules and the standard library too.  Every module described is
+imported, so only name modules that are safe to import.  The database
+can only be used with the version of Python that wrote it.
+"""
+
+import os
+import sys
+import optparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def main(argv):
+    parser = optparse.OptionParser(usage='%prog [options] [module ...]')
+    parser.add_option('-o', '--output', metavar='FILE',
+        help='file to write the database to')
+    parser.add_option('--stdlib', action='store_true',
+        help='describe the builtin modules and the standard library')
+    options, args = parser.parse_args(argv[1:])
+    if not options.output:
+        parser.error('no output file given')
+
+    sys.path.insert(0, ROOT)
+    from pychecker import signatures
+
+    names = args[:]
+    if options.stdlib:
+        names.extend(signatures.stdlibModules())
+    if not names:
+        parser.error('no modules given')
+
+    # the modules described can print when they are imported
+    stdout = sys.stdout
+    devnull = open(os.devnull, 'w')
+    sys.stdout = devnull
+    try:
+        failed = signatures.generate(names, options.output)
+    finally:
+        sys.stdout = stdout
+        devnull.close()
+
+    sys.stdout.write('%d modules described in %s\n' % (
+        len(names) - len(failed), options.output))
+    if failed:
+        sys.stdout.write('could not import: %s\n' % ' '.join(failed))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
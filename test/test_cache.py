@@ -0,0 +1,94 @@
+# -*- Mode: Python; test-case-name: test.test_cache -*-
+# vi:si:et:sw=4:sts=4:ts=4
+
+'''
+Tests related to pychecker.cache
+'''
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import common
+
+from pychecker import Config
+from pychecker import cache
+from pychecker import pcmodules
+
+class WarningCacheTestCase(common.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        os.chdir(os.path.dirname(__file__))
+        self.directory = tempfile.mkdtemp()
+
+        self.config = Config.Config()
+        from pychecker.check import _check
+        self.warnings = _check(['input/nested.py', ], cfg=self.config)
+        self.module = pcmodules.getPCModule("nested", moduleDir="input")
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory)
+
+    def testReplay(self):
+        warningCache = cache.WarningCache(self.directory, self.config)
+        self.assertEquals(warningCache.lookup(self.module), None)
+        self.assertEquals(warningCache.reasons, [('nested', 'not cached')])
+        warningCache.store(self.module, self.warnings)
+
+        warningCache = cache.WarningCache(self.directory, self.config)
+        cached = warningCache.lookup(self.module)
+        self.assertEquals([w.format() for w in cached],
+            [w.format() for w in self.warnings])
+        self.assertEquals(warningCache.hits, 1)
+        self.assertEquals(warningCache.reasons, [])
+
+    def testConfigChanged(self):
+        warningCache = cache.WarningCache(self.directory, self.config)
+        warningCache.store(self.module, self.warnings)
+
+        self.config.maxArgs = self.config.maxArgs + 1
+        warningCache = cache.WarningCache(self.directory, self.config)
+        self.assertEquals(warningCache.lookup(self.module), None)
+        self.assertEquals(warningCache.reasons,
+            [('nested', 'configuration or suppressions changed')])
+
+class CheckedElsewhereTestCase(common.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+        os.chdir(self.directory)
+        sys.path.insert(0, self.directory)
+        self.write('cachedd.py', 'def helper(a):\n    value = 1\n')
+        self.write('cacheaa.py', 'from cachedd import helper\n')
+
+        self.config = Config.Config()
+        self.config.cacheDir = os.path.join(self.directory, 'cache')
+
+    def tearDown(self):
+        sys.path.remove(self.directory)
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory)
+
+    def write(self, name, source):
+        handle = open(os.path.join(self.directory, name), 'w')
+        handle.write(source)
+        handle.close()
+
+    def check(self, files):
+        from pychecker.check import _check
+        warnings = [w.format() for w in _check(files, cfg=self.config)]
+        warnings.sort()
+        return warnings
+
+    def testImportedWithoutOwner(self):
+        # the entry of cacheaa stored while cachedd was checked with it
+        # lacks the warnings of helper
+        both = self.check(['cacheaa.py', 'cachedd.py'])
+        self.assertEquals(len(both), 2)
+        self.assertEquals(self.check(['cacheaa.py']), both)
+        self.assertEquals(self.check(['cacheaa.py']), both)
+
+if __name__ == '__main__':
+    unittest.main()
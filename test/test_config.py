@@ -0,0 +1,41 @@
+# -*- Mode: Python; test-case-name: test.test_config -*-
+# vi:si:et:sw=4:sts=4:ts=4
+
+'''
+Tests related to pychecker.Config
+'''
+
+import unittest
+import common
+
+from pychecker import Config
+from pychecker import utils
+
+class LayerTestCase(common.TestCase):
+    def setUp(self):
+        self.config = Config.Config()
+        utils.initConfig(self.config)
+
+    def tearDown(self):
+        utils.popConfig()
+
+    def testOverride(self):
+        utils.pushConfig()
+        layer = utils.cfg()
+        self.failIf(layer is self.config)
+        self.assertEquals(layer.shadows, self.config.shadows)
+
+        layer.processArgs(['--no-shadow', '--maxlines=5'])
+        self.assertEquals(layer.shadows, 0)
+        self.assertEquals(layer.maxLines, 5)
+        self.assertEquals(self.config.shadows, 1)
+        self.assertEquals(self.config.maxLines, 200)
+
+        utils.pushConfig()
+        self.assertEquals(utils.cfg().maxLines, 5)
+        utils.popConfig()
+        utils.popConfig()
+        self.failUnless(utils.cfg() is self.config)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+# -*- Mode: Python; test-case-name: test.test_daemon -*-
+# vi:si:et:sw=4:sts=4:ts=4
+
+'''
+Tests related to pychecker.daemon
+'''
+
+import os
+import socket
+import shutil
+import tempfile
+import unittest
+import common
+
+from pychecker import Config
+from pychecker import daemon
+from pychecker import utils
+
+class ServerTestCase(common.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.config = Config.Config()
+        self.config.quiet = 1
+        utils.initConfig(self.config)
+        self.server = daemon.Server(
+            os.path.join(self.directory, 'socket'), self.config)
+
+    def tearDown(self):
+        utils.popConfig()
+        shutil.rmtree(self.directory)
+
+    def _write(self, name, source):
+        handle = open(os.path.join(self.directory, name), 'w')
+        handle.write(source)
+        handle.close()
+
+    def testReplay(self):
+        self._write('daemonmain.py', 'def f():\n    return g()\n')
+        status, output = self.server.check(self.directory, ['daemonmain.py'])
+        self.assertEquals(status, 1)
+        self.assertEquals(self.server.checked, ['daemonmain.py'])
+        self.failUnless('No global (g) found' in output)
+
+        self.assertEquals(
+            self.server.check(self.directory, ['daemonmain.py']),
+            (status, output))
+        self.assertEquals(self.server.checked, [])
+
+    def testDependencyChanged(self):
+        self._write('daemondep.py', 'def g(a):\n    return a\n')
+        self._write('daemonuser.py',
+            'import daemondep\n\ndef f():\n    return daemondep.g(1)\n')
+        status, output = self.server.check(self.directory, ['daemonuser.py'])
+        self.assertEquals(status, 0)
+
+        self._write('daemondep.py', 'def g(a, b):\n    return a + b\n')
+        status, output = self.server.check(self.directory, ['daemonuser.py'])
+        self.assertEquals(self.server.checked, ['daemonuser.py'])
+        self.assertEquals(status, 1)
+        self.failUnless('Invalid arguments to (g)' in output)
+
+    def testImportedWarningsReplayed(self):
+        self._write('daemonlib.py', 'def h(b):\n    x = 1\n    return x\n')
+        self._write('daemonapp.py',
+            'from daemonlib import h\n\ndef f():\n    return h(1)\n')
+        status, output = self.server.check(self.directory, ['daemonapp.py'])
+        self.failUnless('Parameter (b) not used' in output)
+
+        self.assertEquals(
+            self.server.check(self.directory, ['daemonapp.py']),
+            (status, output))
+        self.assertEquals(self.server.checked, [])
+
+    def testFromImportChanged(self):
+        self._write('daemonfrom.py', 'def h(a):\n    return a\n')
+        self._write('daemonto.py',
+            'from daemonfrom import h\n\ndef f():\n    return h(1)\n')
+        status, output = self.server.check(self.directory, ['daemonto.py'])
+        self.assertEquals(status, 0)
+
+        self._write('daemonfrom.py', 'def h(a, b):\n    return a + b\n')
+        status, output = self.server.check(self.directory, ['daemonto.py'])
+        self.assertEquals(self.server.checked, ['daemonto.py'])
+        self.failUnless('Invalid arguments to (h)' in output)
+
+    def testOutputReturned(self):
+        self.config.quiet = 0
+        self._write('daemonbroken.py', 'import daemonmissing\n')
+        status, output = self.server.check(self.directory,
+                                           ['daemonbroken.py'])
+        self.failUnless('Processing module daemonbroken' in output, output)
+        self.failUnless('daemonmissing' in output, output)
+
+class ClearPathTestCase(common.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'socket')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _bind(self):
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.path)
+        return listener
+
+    def testMissing(self):
+        self.assertEquals(daemon._clearPath(self.path), None)
+
+    def testNotSocket(self):
+        open(self.path, 'w').close()
+        self.failUnless(daemon._clearPath(self.path))
+        self.failUnless(os.path.isfile(self.path))
+
+    def testStale(self):
+        self._bind().close()
+        self.assertEquals(daemon._clearPath(self.path), None)
+        self.failIf(os.path.exists(self.path))
+
+    def testListening(self):
+        listener = self._bind()
+        try:
+            listener.listen(1)
+            self.failUnless(daemon._clearPath(self.path))
+            self.failUnless(os.path.exists(self.path))
+        finally:
+            listener.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+# -*- Mode: Python; test-case-name: test.test_moduleindex -*-
+# vi:si:et:sw=4:sts=4:ts=4
+
+'''
+Tests related to pychecker.moduleindex
+'''
+
+import os
+import sys
+import imp
+import shutil
+import tempfile
+import unittest
+import common
+
+from pychecker import Config
+from pychecker import moduleindex
+from pychecker import utils
+
+class ModuleIndexTestCase(common.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        moduleindex.reset()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        moduleindex.reset()
+
+    def _write(self, name, source=''):
+        filename = os.path.join(self.directory, name)
+        handle = open(filename, 'w')
+        handle.write(source)
+        handle.close()
+        return filename
+
+    def testFind(self):
+        filename = self._write('indexed.py')
+        handle, found, smt = moduleindex.find('indexed', [self.directory])
+        handle.close()
+        self.assertEquals(found, filename)
+        self.assertEquals(smt[-1], imp.PY_SOURCE)
+        self.assertRaises(ImportError,
+                          moduleindex.find, 'missing', [self.directory])
+
+    def testChanged(self):
+        self.assertRaises(ImportError,
+                          moduleindex.find, 'later', [self.directory])
+        self._write('later.py')
+        # make sure the change is seen even on coarse file systems
+        mtime = os.stat(self.directory).st_mtime + 2
+        os.utime(self.directory, (mtime, mtime))
+        handle, found, smt = moduleindex.find('later', [self.directory])
+        handle.close()
+        self.assertEquals(smt[-1], imp.PY_SOURCE)
+
+    def testBuiltin(self):
+        handle, found, smt = moduleindex.find('sys')
+        self.assertEquals((handle, found, smt[-1]),
+                          (None, 'sys', imp.C_BUILTIN))
+
+    def testPackageNotLoaded(self):
+        os.mkdir(os.path.join(self.directory, 'indexedpkg'))
+        self._write(os.path.join('indexedpkg', '__init__.py'),
+                    'raise RuntimeError("loaded indexedpkg")\n')
+        filename = self._write(os.path.join('indexedpkg', 'mod.py'))
+
+        utils.initConfig(Config.Config())
+        try:
+            handle, found, smt = utils.findModule('indexedpkg.mod',
+                                                  self.directory)
+        finally:
+            utils.popConfig()
+        handle.close()
+        self.assertEquals(found, filename)
+        self.failIf('indexedpkg' in sys.modules)
+
+    def testSubpackageNameInModules(self):
+        os.mkdir(os.path.join(self.directory, 'indexedtop'))
+        os.mkdir(os.path.join(self.directory, 'indexedtop', 'indexedsub'))
+        self._write(os.path.join('indexedtop', '__init__.py'))
+        self._write(os.path.join('indexedtop', 'indexedsub', '__init__.py'))
+        filename = self._write(
+            os.path.join('indexedtop', 'indexedsub', 'mod.py'))
+
+        # an unrelated top level module with the name of the subpackage
+        sys.modules['indexedsub'] = os
+        utils.initConfig(Config.Config())
+        try:
+            handle, found, smt = utils.findModule(
+                'indexedtop.indexedsub.mod', self.directory)
+        finally:
+            utils.popConfig()
+            del sys.modules['indexedsub']
+        handle.close()
+        self.assertEquals(found, filename)
+
+if __name__ == '__main__':
+    unittest.main()
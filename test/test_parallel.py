@@ -0,0 +1,60 @@
+# -*- Mode: Python; test-case-name: test.test_parallel -*-
+# vi:si:et:sw=4:sts=4:ts=4
+
+'''
+Tests related to checking modules in parallel with --jobs
+'''
+
+import os
+import unittest
+import common
+
+from pychecker import Config
+from pychecker import utils
+
+class JobsTestCase(common.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        os.chdir(os.path.dirname(__file__))
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+
+    def format(self, jobs, report=None):
+        config = Config.Config()
+        config.jobs = jobs
+        config.ignoreStandardLibrary = 1
+        from pychecker.check import _check
+        warnings = _check(['input/nested.py', 'input/unused_import.py',
+                           'input/test_global.py', ], cfg=config,
+                          report=report)
+        return [w.format() for w in warnings]
+
+    def testSameAsSerial(self):
+        if not common.canImport('multiprocessing'):
+            return
+
+        serial = self.format(1)
+        self.failUnless(serial)
+        self.assertEquals(self.format(3), serial)
+
+    def testStoppedEarly(self):
+        if not common.canImport('multiprocessing'):
+            return
+        import multiprocessing
+
+        reported = []
+        def report(warnings):
+            # the first call has the import warnings
+            reported.append(warnings)
+            if len(reported) > 1:
+                raise KeyboardInterrupt
+        depth = len(utils._cfg)
+        try:
+            self.assertRaises(KeyboardInterrupt, self.format, 3, report)
+        finally:
+            del utils._cfg[depth:]
+        self.assertEquals(multiprocessing.active_children(), [])
+
+if __name__ == '__main__':
+    unittest.main()
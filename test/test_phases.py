@@ -0,0 +1,63 @@
+# -*- Mode: Python; test-case-name: test.test_phases -*-
+# vi:si:et:sw=4:sts=4:ts=4
+
+'''
+Tests related to pychecker.phases
+'''
+
+import os
+import unittest
+import common
+
+from pychecker import Config
+from pychecker import phases
+
+try:
+    from cStringIO import StringIO
+except ImportError:
+    from StringIO import StringIO
+
+class PhasesTestCase(common.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        os.chdir(os.path.dirname(__file__))
+        phases.reset()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        phases.disable()
+        phases.reset()
+
+    def testNested(self):
+        phases.enable()
+        phases.start('outer')
+        phases.start('inner')
+        phases.stop('inner')
+        phases.stop('outer')
+        self.assertEquals(phases._phases['outer'][0], 1)
+        self.assertEquals(phases._phases['inner'][0], 1)
+        self.assertEquals(phases._stack, [])
+
+    def testDisabled(self):
+        phases.start('outer')
+        phases.stop('outer')
+        self.assertEquals(phases._phases, {})
+
+    def testCheck(self):
+        from pychecker.check import _check
+        config = Config.Config()
+        config.profilePhases = 1
+        _check(['input/nested.py', ], cfg=config)
+
+        for phase in ('load', 'main code', 'functions', 'classes', 'unused',
+                      'filter'):
+            self.failUnless(phase in phases._phases, phase)
+        self.failUnless(phases._opcodes)
+        self.failUnless('nested' in phases._modules)
+
+        stream = StringIO()
+        phases.report(stream)
+        self.failUnless('Time per opcode dispatch' in stream.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+# -*- Mode: Python; test-case-name: test.test_pychecker_OP -*-
+# vi:si:et:sw=4:sts=4:ts=4
+
+'''
+Tests related to pychecker.OP
+'''
+
+import unittest
+import common
+
+from pychecker import OP
+
+def _sample(x, y=1):
+    while x:
+        if x > y:
+            return x.attr
+        x = x - 1
+    return None
+
+class InstructionsTestCase(common.TestCase):
+    '''
+    Test that the decoded instructions match decoding the bytecode by hand.
+    '''
+    def testDecode(self):
+        func_code = _sample.func_code
+        instructions = OP.getInstructions(func_code)
+
+        i, extended_arg, position = 0, 0, 0
+        while i < len(func_code.co_code):
+            self.assertEquals(instructions.offsets[position], i)
+            op, oparg, i, extended_arg = OP.getInfo(func_code.co_code, i,
+                                                    extended_arg)
+            self.assertEquals(instructions.ops[position], op)
+            self.assertEquals(instructions.nexts[position], i)
+            if op >= OP.HAVE_ARGUMENT:
+                self.assertEquals(instructions.opargs[position], oparg)
+                self.assertEquals(instructions.operands[position],
+                                  OP.getOperand(op, func_code, oparg))
+                self.assertEquals(instructions.label(position),
+                                  OP.getLabel(op, oparg, i))
+            position = position + 1
+        self.assertEquals(len(instructions), position)
+
+    def testCached(self):
+        self.failUnless(OP.getInstructions(_sample.func_code) is
+                        OP.getInstructions(_sample.func_code))
+
+    def testBounded(self):
+        limit = OP._MAX_INSTRUCTIONS
+        OP._MAX_INSTRUCTIONS = 4
+        try:
+            OP.clearInstructions()
+            codes = [compile('x = %d' % i, '<test>', 'exec')
+                     for i in range(5)]
+            for code in codes:
+                OP.getInstructions(code)
+            # the oldest half went when the fifth came in
+            self.assertEquals(len(OP._instructions), 3)
+            self.failIf(OP._instructions.has_key(id(codes[0])))
+            self.failUnless(OP._instructions.has_key(id(codes[4])))
+        finally:
+            OP._MAX_INSTRUCTIONS = limit
+
+class LineNumbersTestCase(common.TestCase):
+    '''
+    Test that the line number index matches scanning co_lnotab.
+    '''
+    def _scan(self, co, instr_index):
+        co_lnotab = co.co_lnotab
+        lineno = co.co_firstlineno
+        addr = 0
+        for lnotab_index in range(0, len(co_lnotab), 2):
+            addr = addr + ord(co_lnotab[lnotab_index])
+            if addr > instr_index:
+                return lineno
+            lineno = lineno + ord(co_lnotab[lnotab_index+1])
+        return lineno
+
+    def testLineNum(self):
+        func_code = _sample.func_code
+        instructions = OP.getInstructions(func_code)
+        for index in range(-1, len(func_code.co_code) + 1):
+            self.assertEquals(instructions.getLineNum(index),
+                              self._scan(func_code, index))
+
+if __name__ == '__main__':
+    unittest.main()
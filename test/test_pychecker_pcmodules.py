@@ -0,0 +1,97 @@
+# -*- Mode: Python; test-case-name: test.test_pychecker_pcmodules -*-
+# vi:si:et:sw=4:sts=4:ts=4
+
+'''
+Tests related to pychecker.pcmodules
+'''
+
+import unittest
+import common
+
+from pychecker import Config
+from pychecker import pcmodules
+from pychecker import utils
+from pychecker import static
+
+class Base:
+    inherited = 1
+
+class Classic(Base):
+    def __getattr__(self, name):
+        raise RuntimeError('__getattr__ called for %s' % name)
+
+class NewBase(object):
+    def method(self):
+        pass
+
+class New(NewBase):
+    __slots__ = ('slot', )
+
+class Meta(type):
+    def __getattr__(cls, name):
+        return name
+
+class Dynamic(object):
+    __metaclass__ = Meta
+
+class ClassAttributesTestCase(common.TestCase):
+    def testClassic(self):
+        attributes = pcmodules.getClassAttributes(Classic)
+        self.failUnless(attributes is pcmodules.getClassAttributes(Classic))
+        for name in ('inherited', '__getattr__', '__name__', '__bases__'):
+            self.failUnless(name in attributes, name)
+        self.failIf('missing' in attributes)
+
+    def testNew(self):
+        attributes = pcmodules.getClassAttributes(New)
+        for name in ('method', 'slot', '__mro__', 'mro', '__init__'):
+            self.failUnless(name in attributes, name)
+        self.failIf('missing' in attributes)
+
+    def testMetaclassGetattr(self):
+        attributes = pcmodules.getClassAttributes(Dynamic)
+        self.failUnless(isinstance(attributes, static.AllNames))
+        self.failUnless('missing' in attributes)
+
+class Model:
+    def __init__(self):
+        self.key = None
+
+    def save(self):
+        self.saved = 1
+
+class User(Model):
+    save = 0
+
+    def __init__(self):
+        Model.__init__(self)
+        self.name = ''
+
+class ClassTablesTestCase(common.TestCase):
+    def setUp(self):
+        utils.initConfig(Config.Config())
+
+    def tearDown(self):
+        utils.popConfig()
+
+    def testShared(self):
+        tables = pcmodules.getClassTables(User)
+        self.failUnless(tables is pcmodules.getClassTables(User))
+        self.failUnless(pcmodules.getClassTables(Model).methods['save'])
+        self.assertEquals(tables.members['save'], type(0))
+        for name in ('key', 'saved', 'name'):
+            self.failUnless(tables.members.has_key(name), name)
+
+    def testBaseClasses(self):
+        bases = pcmodules._allBaseClasses(New)
+        self.assertEquals(bases, [NewBase, object])
+        self.failUnless(bases is pcmodules._allBaseClasses(New))
+
+    def testClear(self):
+        tables = pcmodules.getClassTables(User)
+        pcmodules.clearTables()
+        self.failIf(pcmodules._classTables)
+        self.failIf(tables is pcmodules.getClassTables(User))
+
+if __name__ == '__main__':
+    unittest.main()
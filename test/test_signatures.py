@@ -0,0 +1,126 @@
+# -*- Mode: Python; test-case-name: test.test_signatures -*-
+# vi:si:et:sw=4:sts=4:ts=4
+
+'''
+Tests related to pychecker.signatures
+'''
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import common
+
+from pychecker import Config
+from pychecker import check
+from pychecker import msgs
+from pychecker import pcmodules
+from pychecker import signatures
+from pychecker import static
+from pychecker import utils
+
+_LIBRARY = '''
+import os
+
+LIMIT = 3
+
+def fetch(url, timeout=10, *args, **kwargs):
+    "fetch the url"
+    return url
+
+class Client(object):
+    def __init__(self, host):
+        self.host = host
+
+    def get(self, path):
+        return path
+
+    def make(cls):
+        return cls()
+    make = classmethod(make)
+
+class Error(ValueError):
+    pass
+'''
+
+class SignaturesTestCase(common.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.directory)
+        sys.path.insert(0, self.directory)
+        self.write('siglib.py', _LIBRARY)
+        self.database = os.path.join(self.directory, 'siglib.sig')
+        self.assertEquals(signatures.generate(['siglib'], self.database), [])
+        # the module is served from the database from now on
+        del sys.modules['siglib']
+        os.remove('siglib.py')
+        signatures.reset()
+
+        self.config = Config.Config()
+        self.config.signatures = self.database
+        utils.initConfig(self.config)
+
+    def tearDown(self):
+        utils.popConfig()
+        sys.path.remove(self.directory)
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory)
+        signatures.reset()
+
+    def write(self, name, source):
+        handle = open(os.path.join(self.directory, name), 'w')
+        handle.write(source)
+        handle.close()
+
+    def testModule(self):
+        module = signatures.getModule('siglib')
+        self.failUnless(module is signatures.getModule('siglib'))
+        self.failIf(signatures.getModule('missing'))
+        self.assertEquals(module.LIMIT, 0)
+        # os is not in the database, and is not imported
+        self.failUnless(module.os is static.UNKNOWN)
+
+        code = module.fetch.func_code
+        self.failUnless(signatures.isStub(module.fetch))
+        self.assertEquals(code.co_argcount, 2)
+        self.assertEquals(code.co_varnames,
+                          ('url', 'timeout', 'args', 'kwargs'))
+        self.assertEquals(module.fetch.func_defaults, (10, ))
+        self.assertEquals(module.fetch.__doc__, '')
+
+        self.failUnless(issubclass(module.Error, ValueError))
+        self.assertEquals(module.Client.get.im_func.func_code.co_varnames,
+                          ('self', 'path'))
+        self.failUnless(module.Client.make.im_self is module.Client)
+        self.failUnless(hasattr(module.Client, 'host'))
+
+    def testPCModule(self):
+        pcmodule = pcmodules.PyCheckerModule('sigimporter', 0)
+        pcmodule.addModule('siglib', 'siglib')
+        self.failIf(sys.modules.has_key('siglib'))
+
+        library = pcmodule.modules['siglib']
+        self.assertEquals(library.functions['fetch'].maxArgs, None)
+        self.assertEquals(library.functions['fetch'].minArgs, 1)
+        client = library.classes['Client']
+        for name in ('get', 'make', '__init__'):
+            self.failUnless(client.methods.has_key(name), name)
+        self.failUnless(client.members.has_key('host'))
+
+    def testCheck(self):
+        self.write('sigcaller.py',
+            'import siglib\n'
+            'def call():\n'
+            '    return siglib.fetch()\n')
+        self.config.sourceOnly = 1
+        self.config.limit = 0
+        warnings = check._check(['sigcaller.py'], cfg=self.config)
+        self.failIf(sys.modules.has_key('siglib'))
+        errors = [str(w.err) for w in warnings]
+        self.assertEquals(errors,
+            [str(msgs.INVALID_ARG_COUNT2 % ('fetch', 0, 1))])
+
+if __name__ == '__main__':
+    unittest.main()
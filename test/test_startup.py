@@ -0,0 +1,69 @@
+# -*- Mode: Python; test-case-name: test.test_startup -*-
+# vi:si:et:sw=4:sts=4:ts=4
+
+'''
+Tests related to what pychecker imports when it starts
+'''
+
+import os
+import sys
+import unittest
+import subprocess
+import common
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules only checking needs, which starting should not import
+_CHECKING_MODULES = ('pychecker.warn', 'pychecker.CodeChecks',
+                     'pychecker.python', 'pychecker.Stack',
+                     'pychecker.printer', 'pychecker.pcmodules',
+                     'pychecker.cache', )
+
+_IMPORT = 'import pychecker.checker'
+
+_HELP = '''
+from pychecker import checker, Config
+try:
+    checker.main(['checker.py', '--help'])
+except Config.UsageError:
+    pass
+'''
+
+_PRINT_MODULES = '''
+import sys
+sys.stderr.write(' '.join([name for name, module in sys.modules.items()
+                           if module is not None]))
+'''
+
+class StartupTestCase(common.TestCase):
+    def run_python(self, args, disabled=0):
+        """
+        @returns: what it wrote to stderr
+        @rtype:   str
+        """
+        env = os.environ.copy()
+        env['PYTHONPATH'] = ROOT
+        env.pop('PYCHECKER', None)
+        env.pop('PYCHECKER_DISABLED', None)
+        if disabled:
+            env['PYCHECKER_DISABLED'] = '1'
+        process = subprocess.Popen([sys.executable] + args, env=env,
+            cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        stderr = process.communicate()[1]
+        self.assertEquals(process.returncode, 0, stderr)
+        return stderr
+
+    def assertLazy(self, source, disabled=0):
+        modules = self.run_python(['-c', source + _PRINT_MODULES],
+                                  disabled).split()
+        for name in _CHECKING_MODULES:
+            self.failIf(name in modules, '%s was imported' % name)
+
+    def testImportLazy(self):
+        self.assertLazy(_IMPORT)
+
+    def testHelpLazy(self):
+        self.assertLazy(_HELP, disabled=1)
+
+if __name__ == '__main__':
+    unittest.main()
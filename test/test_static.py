@@ -0,0 +1,94 @@
+# -*- Mode: Python; test-case-name: test.test_static -*-
+# vi:si:et:sw=4:sts=4:ts=4
+
+'''
+Tests related to pychecker.static and --sourceonly
+'''
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import common
+
+from pychecker import Config
+from pychecker import static
+
+class SourceOnlyTestCase(common.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.directory)
+        static.reset()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory)
+        static.reset()
+
+    def _write(self, name, source):
+        handle = open(os.path.join(self.directory, name), 'w')
+        handle.write(source)
+        handle.close()
+
+    def _check(self, name):
+        from pychecker.check import _check
+        config = Config.Config()
+        config.sourceOnly = 1
+        config.limit = 0
+        return [w.format() for w in _check([name], cfg=config)]
+
+    def testNotRun(self):
+        self._write('staticdep.py',
+            'raise RuntimeError("ran staticdep")\n'
+            'class Base(object):\n'
+            '    def __init__(self):\n'
+            '        self.value = 1\n'
+            'def g(a):\n'
+            '    return a\n')
+        self._write('staticmain.py',
+            'import staticmissing\n'
+            'from staticdep import Base, g\n'
+            'raise RuntimeError("ran staticmain")\n'
+            'class C(Base):\n'
+            '    def m(self):\n'
+            '        return self.value + self.other\n'
+            'def f():\n'
+            '    return g(1, 2), staticmissing.anything\n')
+        warnings = self._check('staticmain.py')
+
+        self.failIf('staticmain' in sys.modules)
+        self.failIf('staticdep' in sys.modules)
+        self.assertEquals(len(warnings), 2, warnings)
+        warnings.sort()
+        self.failUnless('No class attribute (other) found' in warnings[0])
+        self.failUnless('Invalid arguments to (g)' in warnings[1])
+
+    def testBindings(self):
+        self._write('staticbind.py',
+            'import os\n'
+            'DEBUG = 0\n'
+            'if DEBUG:\n'
+            '    skipped = 1\n'
+            'def deco(f):\n'
+            '    return f\n'
+            'class C:\n'
+            '    @deco\n'
+            '    def m(self):\n'
+            '        return 1\n'
+            '    @staticmethod\n'
+            '    def s():\n'
+            '        return 2\n'
+            'x = C()\n')
+        module = static.loadModule('staticbind', self.directory)
+
+        self.failUnless(module.os is os)
+        self.assertEquals(module.DEBUG, 0)
+        self.failIf(hasattr(module, 'skipped'))
+        self.failUnless(isinstance(module.C.__dict__['s'], staticmethod))
+        self.assertEquals(module.C.m.im_func.func_name, 'm')
+        self.failUnless(module.x is static.UNKNOWN)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,9 +5,14 @@
 Tests related to suppressions.
 '''
 
+import re
 import unittest
 import common
 
+from pychecker import Config
+from pychecker import utils
+from pychecker import warn
+
 class NestedTestCase(common.TestCase):
     '''
     Test that suppressions inside nested code stay inside their
@@ -15,6 +20,53 @@ class NestedTestCase(common.TestCase):
     '''
     def test_getmodule(self):
         self.check('test_nestedsuppression', '--objattrs')
-    
+
+class GetSuppressionTestCase(unittest.TestCase):
+    def setUp(self):
+        utils.initConfig(Config.Config())
+        self.depth = len(utils._cfg)
+        self.suppressions = ({ 'mod.f': 'no-argsused', },
+                             { re.compile('mod\\.g.*'): 'no-shadow',
+                               re.compile('x|mod\\.gh'): 'no-local', })
+
+    def tearDown(self):
+        del utils._cfg[self.depth - 1:]
+
+    def testNoMatch(self):
+        warnings = []
+        self.assertEquals(
+            warn.getSuppression('mod.h', self.suppressions, warnings), None)
+        self.assertEquals(len(utils._cfg), self.depth)
+
+    def testExact(self):
+        warnings = []
+        self.assertEquals(
+            warn.getSuppression('mod.f', self.suppressions, warnings),
+            'no-argsused')
+        self.assertEquals(len(utils._cfg), self.depth + 1)
+        self.failIf(utils.cfg().argumentsUsed)
+
+    def testRegexs(self):
+        warnings = []
+        self.assertEquals(
+            warn.getSuppression('mod.gh', self.suppressions, warnings), 1)
+        self.failIf(utils.cfg().shadows)
+        self.failIf(utils.cfg().localVariablesUsed)
+        utils.popConfig()
+
+        # memoised, and still pushes a config of its own
+        self.assertEquals(
+            warn.getSuppression('mod.gh', self.suppressions, warnings), 1)
+        self.assertEquals(len(utils._cfg), self.depth + 1)
+        self.assertEquals(warnings, [])
+
+    def testExactAndRegexs(self):
+        self.suppressions[0]['mod.gh'] = 'no-argsused'
+        warnings = []
+        self.assertEquals(
+            warn.getSuppression('mod.gh', self.suppressions, warnings), 1)
+        self.failIf(utils.cfg().argumentsUsed)
+        self.failIf(utils.cfg().shadows)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,260 @@
+# -*- Mode: Python; test-case-name: test.test_warn -*-
+# vi:si:et:sw=4:sts=4:ts=4
+
+'''
+Tests related to filtering warnings in pychecker.warn
+'''
+
+import os
+import sys
+import pickle
+import shutil
+import tempfile
+import unittest
+import common
+
+try:
+    from cStringIO import StringIO
+except ImportError:
+    from StringIO import StringIO
+
+from pychecker import Config
+from pychecker import check
+from pychecker import msgs
+from pychecker import warn
+from pychecker.Warning import Warning
+
+class RemoveWarningsTestCase(common.TestCase):
+    def setUp(self):
+        self.config = Config.Config()
+        self.config.limit = 0
+
+    def _files(self, warnings):
+        return [w.file for w in warnings]
+
+    def testPathIndex(self):
+        index = warn._PathIndex([os.path.join('/a', 'b'),
+                                 os.path.join('/a', 'b', 'c'),
+                                 os.path.join('/x', 'y.py')])
+        self.failUnless(index.contains(os.path.join('/a', 'b', 'd.py')))
+        self.failUnless(index.contains(os.path.join('/x', 'y.py')))
+        self.failIf(index.contains(os.path.join('/a', 'bc.py')))
+        self.failIf(index.contains(os.path.join('/x', 'y.pyc')))
+        self.failIf(index.contains('y.py'))
+
+    def testRemove(self):
+        message = msgs.Warning('test')
+        warnings = [Warning(os.path.join('/lib', 'std.py'), 1, message),
+                    Warning(os.path.join('/bad', 'mod.py'), 2, message),
+                    Warning(os.path.join('/src', 'mod.py'), 3, message)]
+        result = warn.removeWarnings(warnings,
+            [os.path.join('/bad', 'mod.py')], ['/lib'], self.config)
+        self.failUnless(result is warnings)
+        self.assertEquals(self._files(result),
+                          [os.path.join('/src', 'mod.py')])
+
+    def testOnly(self):
+        self.config.only = 1
+        self.config.files[os.path.abspath('kept.py')] = 1
+        message = msgs.Warning('test')
+        warnings = [Warning('kept.py', 1, message),
+                    Warning('other.py', 1, message)]
+        self.assertEquals(
+            self._files(warn.removeWarnings(warnings, [], None, self.config)),
+            ['kept.py'])
+
+class LimitWarningsTestCase(common.TestCase):
+    def _warnings(self):
+        return [Warning('a.py', 3, msgs.Style('style')),
+                Warning('b.py', 1, msgs.Error('error')),
+                Warning('a.py', 1, msgs.Warning('warning')),
+                Warning('a.py', 2, msgs.Error('error %s') % 'x'),
+                Warning('a.py', 2, msgs.Error('error %s') % 'x')]
+
+    def testUnique(self):
+        warnings = self._warnings()
+        unique = warn.uniqueWarnings(warnings)
+        self.assertEquals(len(unique), 4)
+        self.failUnless(unique[3] is warnings[3])
+
+    def testUniqueNotRendered(self):
+        warnings = self._warnings()
+        warn.uniqueWarnings(warnings)
+        warn.limitWarnings(warnings[:], 1)
+        self.assertEquals([w.err._text for w in warnings
+                           if isinstance(w.err, msgs.Message)], [None, None])
+
+    def testLimit(self):
+        warnings = warn.limitWarnings(self._warnings(), 2)
+        self.assertEquals([(w.file, w.line) for w in warnings[:2]],
+                          [('a.py', 2), ('b.py', 1)])
+        self.assertEquals(str(warnings[2].err),
+                          str(msgs.TOO_MANY_WARNINGS % 2))
+
+    def testUnderLimit(self):
+        warnings = warn.limitWarnings(self._warnings(), 10)
+        self.assertEquals([w.line for w in warnings], [3, 1, 2, 1])
+
+class FormatTestCase(common.TestCase):
+    def setUp(self):
+        self.path = sys.path[:]
+
+    def tearDown(self):
+        sys.path[:] = self.path
+
+    def testPickled(self):
+        lib = os.path.join('/nonexistent', 'lib')
+        sys.path.insert(0, lib)
+        w = Warning(os.path.join(lib, 'mod.py'), 3, msgs.Warning('test'))
+        w.format()
+        loaded = pickle.loads(pickle.dumps(w))
+        self.failIf(loaded.__dict__.has_key('_formatted'))
+        self.assertEquals(loaded.format(), w.format())
+
+    def testSystemPath(self):
+        lib = os.path.join('/nonexistent', 'lib')
+        site = os.path.join(lib, 'site-packages')
+        sys.path[:0] = [lib, site]
+        w = Warning(os.path.join(site, 'mod.py'), 3, msgs.Warning('test'))
+        expected = '[system path]%smod.py:3: test' % os.sep
+        self.assertEquals(w.format(), expected)
+        self.failUnless(w.format() is w.format())
+        self.assertEquals(w.format(removeSysPath=False),
+                          '%s:3: test' % os.path.join(site, 'mod.py'))
+
+        sys.path.remove(site)
+        self.assertEquals(w.format(),
+            '[system path]%s:3: test' % os.path.join(os.sep + 'site-packages',
+                                                     'mod.py'))
+
+class MessageTestCase(common.TestCase):
+    def testFrozen(self):
+        class Arg:
+            rendered = 0
+            def __str__(self):
+                self.rendered = self.rendered + 1
+                return 'arg'
+
+        arg = Arg()
+        message = msgs.VAR_NOT_USED % arg
+        self.assertEquals(arg.rendered, 1)
+        self.assertEquals(message.args, ('arg', ))
+        self.assertEquals(message.level, msgs.VAR_NOT_USED.level)
+        self.assertEquals(str(message), 'Variable (arg) not used')
+
+    def testCompare(self):
+        a = msgs.VAR_NOT_USED % 'a'
+        self.assertEquals(a, msgs.VAR_NOT_USED % 'a')
+        self.assertEquals(hash(a), hash(msgs.VAR_NOT_USED % 'a'))
+        self.failUnless(a < msgs.VAR_NOT_USED % 'b')
+        # different templates compare by their text
+        self.failUnless(msgs.NO_CLASS_DOC % 'X' <
+                        msgs.SELF_NOT_FIRST_ARG % ('s', ''))
+        # numbers too, like the text they are printed as
+        self.failUnless(msgs.REDEFINING_ATTR % ('x', 10) <
+                        msgs.REDEFINING_ATTR % ('x', 9))
+        # equal to the same text, with the same hash
+        self.assertEquals(a, 'Variable (a) not used')
+        self.assertEquals(hash(a), hash('Variable (a) not used'))
+        # and to a bare warning with that text
+        self.assertEquals(msgs.NO_MODULE_DOC % (), msgs.NO_MODULE_DOC)
+
+    def testCompareBare(self):
+        # both kinds of err on the same line sort by their text
+        bare = Warning('a.py', 1, msgs.POSSIBLE_STMT_WITH_NO_EFFECT)
+        message = Warning('a.py', 1, msgs.LOCAL_SHADOWS_GLOBAL % ('x', 1))
+        for warnings in [bare, message], [message, bare]:
+            warnings.sort()
+            self.failUnless(warnings[0] is message)
+
+class StreamTestCase(common.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        os.chdir(os.path.dirname(__file__))
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+
+    def testSameAsCollected(self):
+        files = ['input/nested.py', 'input/unused_import.py',
+                 'input/test_global.py', ]
+        config = Config.Config()
+        config.ignoreStandardLibrary = 1
+        config.limit = 0
+        collected = check._check(files, cfg=config)
+        collected.sort()
+
+        streamed = []
+        self.assertEquals(
+            check._check(files, cfg=config, report=streamed.extend), [])
+        streamed.sort()
+        self.assertEquals([w.format() for w in streamed],
+                          [w.format() for w in collected])
+
+    def testPrinterLimit(self):
+        stream = StringIO()
+        printer = check.StreamPrinter(stream, limit=2, header='Warnings:\n')
+        message = msgs.Warning('test')
+        printer([Warning('b.py', 1, message), Warning('a.py', 2, message)])
+        printer([Warning('a.py', 2, message), Warning('c.py', 3, message)])
+        printer.finish()
+        self.assertEquals(printer.printed, 2)
+        self.assertEquals(printer.suppressed, 1)
+        self.assertEquals(stream.getvalue().split('\n')[:4],
+                          ['Warnings:', 'a.py:2: test', '', 'b.py:1: test'])
+
+    def testPrinterUnique(self):
+        # the same duplicates as uniqueWarnings
+        warnings = [Warning('a.py', 1, msgs.VAR_NOT_USED % 'x'),
+                    Warning('a.py', 1, msgs.VAR_NOT_USED % 'x'),
+                    Warning('a.py', 1, msgs.VAR_NOT_USED % 'y')]
+        printer = check.StreamPrinter(StringIO())
+        printer(warnings[:])
+        self.assertEquals(printer.printed,
+                          len(warn.uniqueWarnings(warnings)))
+
+class CheckOnceTestCase(common.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.directory)
+        self.checkFunction = warn._checkFunction
+
+    def tearDown(self):
+        warn._checkFunction = self.checkFunction
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory)
+
+    def _write(self, name, source):
+        handle = open(os.path.join(self.directory, name), 'w')
+        handle.write(source)
+        handle.close()
+
+    def testImported(self):
+        self._write('oncedef.py',
+            'def helper():\n'
+            '    value = 1\n'
+            'class Base:\n'
+            '    def method(self):\n'
+            '        value = 2\n')
+        for name in ('onceuse1.py', 'onceuse2.py'):
+            self._write(name, 'from oncedef import helper, Base\n')
+
+        checked = []
+        def checkFunction(module, func, *args):
+            checked.append(func.function.__name__)
+            return self.checkFunction(module, func, *args)
+        warn._checkFunction = checkFunction
+
+        config = Config.Config()
+        config.limit = 0
+        warnings = check._check(['onceuse1.py', 'oncedef.py', 'onceuse2.py'],
+                                cfg=config)
+        self.assertEquals(checked.count('helper'), 1, checked)
+        self.assertEquals(checked.count('method'), 1, checked)
+        lines = [(w.file, w.line) for w in warn.uniqueWarnings(warnings)]
+        lines.sort()
+        self.assertEquals(lines, [('oncedef.py', 2), ('oncedef.py', 5)])
+
+if __name__ == '__main__':
+    unittest.main()